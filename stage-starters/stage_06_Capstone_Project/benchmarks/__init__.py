@@ -0,0 +1 @@
+"""Performance benchmarks for SecureSIEM (not part of the test suite)."""
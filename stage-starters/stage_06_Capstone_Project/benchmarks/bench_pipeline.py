@@ -0,0 +1,233 @@
+"""Benchmark suite: parsing, detection rules, cache and report writing.
+
+Run from the project root:
+
+    python -m benchmarks.bench_pipeline --sizes 1e4 1e5 1e6 --output bench.json
+    python -m benchmarks.bench_pipeline --sizes 1e4 1e5 1e6 --baseline bench.json
+
+Input files come from :mod:`benchmarks.generate` (deterministic for a given
+seed) and are kept in ``--workdir`` when one is given, so large sizes are
+generated only once. Every case is run ``--repeat`` times and the fastest
+run is reported.
+
+Per size:
+- ``parse_file[text]`` / ``parse_file[mmap]``: parse the whole file
+- ``detect_*`` and ``run_all_detections`` over a materialized entry list
+  (skipped above ``--materialize-limit`` lines, which would not fit in RAM)
+- ``analyze_stream``: parse + fused detection without materializing
+- ``save_json_report``: write the resulting findings
+
+Independent of size, ``cache_*`` cases time ``--cache-keys`` writes and
+reads against each disk backend and the in-memory tier.
+
+With ``--baseline``, results are compared against an earlier ``--output``
+file; a case slower than the baseline by more than ``--tolerance`` is a
+regression and the exit status is 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.generate import FORMATS, line_count, write_log
+from src.cache import BACKENDS, TieredCache, get_backend
+from src.detection import (
+    DetectionEngine,
+    detect_admin_probe,
+    detect_brute_force,
+    detect_brute_force_window,
+    detect_directory_traversal,
+    detect_sql_injection,
+    run_all_detections,
+)
+from src.log_parser import parse_file
+from src.models import AnalysisReport
+from src.reports import save_json_report
+from src.timestamps import clear_timestamp_caches
+
+DEFAULT_SIZES = (10_000, 100_000)
+DEFAULT_TOLERANCE = 0.25  # fractional slowdown that counts as a regression
+MATERIALIZE_LIMIT = 2_000_000
+
+Result = Dict[str, Any]
+
+
+def _best_of(fn: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    best = float("inf")
+    value = None
+    for _ in range(repeat):
+        clear_timestamp_caches()
+        start = time.perf_counter()
+        value = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+def _result(case: str, size: int, seconds: float, items: int) -> Result:
+    return {
+        "case": case,
+        "size": size,
+        "seconds": round(seconds, 6),
+        "items_per_s": round(items / seconds, 1) if seconds > 0 else None,
+    }
+
+
+def _log_path(workdir: Path, fmt: str, size: int, seed: int, density: float) -> Path:
+    path = workdir / f"{fmt}-{size}-seed{seed}-density{density}.log"
+    if not path.exists():
+        write_log(str(path), size, fmt=fmt, seed=seed, attack_density=density)
+    return path
+
+
+def bench_size(
+    path: Path, size: int, workdir: Path, repeat: int, materialize_limit: int, report: Callable[[Result], None]
+) -> None:
+    def count(engine: str) -> int:
+        return sum(1 for _ in parse_file(str(path), engine=engine))
+
+    for engine in ("text", "mmap"):
+        seconds, _ = _best_of(lambda: count(engine), repeat)
+        report(_result(f"parse_file[{engine}]", size, seconds, size))
+
+    seconds, engine = _best_of(lambda: DetectionEngine().feed_all(parse_file(str(path))), repeat)
+    report(_result("analyze_stream", size, seconds, size))
+    findings = engine.findings()
+
+    if size <= materialize_limit:
+        entries = list(parse_file(str(path)))
+        cases: List[Tuple[str, Callable[[], Any]]] = [
+            ("detect_brute_force", lambda: detect_brute_force(entries)),
+            ("detect_brute_force_window", lambda: detect_brute_force_window(entries)),
+            ("detect_sql_injection", lambda: detect_sql_injection(entries)),
+            ("detect_directory_traversal", lambda: detect_directory_traversal(entries)),
+            ("detect_admin_probe", lambda: detect_admin_probe(entries)),
+            ("run_all_detections", lambda: run_all_detections(entries)),
+        ]
+        for name, fn in cases:
+            seconds, _ = _best_of(fn, repeat)
+            report(_result(name, size, seconds, len(entries)))
+        del entries
+
+    summary = {s: sum(1 for f in findings if f.severity.value == s) for s in ("critical", "high", "medium", "low")}
+    out = workdir / "report.json"
+    doc = AnalysisReport(total_entries=size, findings=findings, summary=summary)
+    seconds, _ = _best_of(lambda: save_json_report(doc, str(out)), repeat)
+    report(_result("save_json_report", size, seconds, len(findings)))
+
+
+def bench_cache(workdir: Path, keys: int, repeat: int, report: Callable[[Result], None]) -> None:
+    items = {f"geo:198.18.{i >> 8 & 255}.{i & 255}-{i}": {"country": "Testland", "n": i} for i in range(keys)}
+    names = list(items)
+    for backend_name in BACKENDS:
+        disk = get_backend(workdir / f"cache-{backend_name}", backend=backend_name)
+        disk.clear()
+        seconds, _ = _best_of(lambda: disk.set_many(items), repeat)
+        report(_result(f"cache_set_many[{backend_name}]", keys, seconds, keys))
+        seconds, _ = _best_of(lambda: disk.get_many(names), repeat)
+        report(_result(f"cache_get_many[{backend_name}]", keys, seconds, keys))
+        tier = TieredCache(disk, memory_size=keys)
+        tier.get_many(names)  # warm the memory tier
+        seconds, _ = _best_of(lambda: tier.get_many(names), repeat)
+        report(_result(f"cache_get_many[{backend_name}+memory]", keys, seconds, keys))
+        disk.clear()
+
+
+def compare(results: List[Result], baseline: List[Result], tolerance: float) -> List[Dict[str, Any]]:
+    """Pair results with baseline rows by (case, size); return the comparison rows."""
+    base = {(r["case"], r["size"]): r["seconds"] for r in baseline}
+    rows = []
+    for r in results:
+        before = base.get((r["case"], r["size"]))
+        if not before:
+            continue
+        ratio = r["seconds"] / before
+        rows.append({**r, "baseline_seconds": before, "ratio": round(ratio, 3), "regression": ratio > 1 + tolerance})
+    return rows
+
+
+def _print_row(r: Result) -> None:
+    rate = f"{r['items_per_s']:,.0f}/s" if r["items_per_s"] else "-"
+    print(f"{r['case']:<34}{r['size']:>12,}{r['seconds']:>12.4f}{rate:>16}", flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SecureSIEM benchmark suite")
+    parser.add_argument(
+        "--sizes", nargs="+", type=line_count, default=list(DEFAULT_SIZES), help="Line counts, e.g. 1e4 1e6 1e8"
+    )
+    parser.add_argument("--format", choices=FORMATS, default="apache", help="Generated log format")
+    parser.add_argument("--attack-density", type=float, default=0.01, help="Fraction of attack lines")
+    parser.add_argument("--seed", type=int, default=1, help="Generator seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (fastest is kept)")
+    parser.add_argument("--cache-keys", type=int, default=10_000, help="Keys for the cache cases (0 to skip)")
+    parser.add_argument(
+        "--materialize-limit",
+        type=int,
+        default=MATERIALIZE_LIMIT,
+        help="Largest size for which per-rule detection runs on an in-memory entry list",
+    )
+    parser.add_argument("--workdir", help="Keep generated logs here for reuse (default: a temporary directory)")
+    parser.add_argument("--output", "-o", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    results: List[Result] = []
+
+    def report(r: Result) -> None:
+        results.append(r)
+        _print_row(r)
+
+    print(f"{'case':<34}{'size':>12}{'seconds':>12}{'throughput':>16}")
+    with tempfile.TemporaryDirectory(prefix="securesiem-bench-") as tmp:
+        workdir = Path(args.workdir) if args.workdir else Path(tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        for size in sizes:
+            path = _log_path(workdir, args.format, size, args.seed, args.attack_density)
+            bench_size(path, size, workdir, args.repeat, args.materialize_limit, report)
+        if args.cache_keys:
+            bench_cache(workdir, args.cache_keys, args.repeat, report)
+
+    payload = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "format": args.format,
+            "seed": args.seed,
+            "attack_density": args.attack_density,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+
+    if not args.baseline:
+        return 0
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+    rows = compare(results, baseline, args.tolerance)
+    print(f"\n{'case':<34}{'size':>12}{'baseline':>12}{'now':>12}{'ratio':>8}")
+    for r in rows:
+        flag = "  REGRESSION" if r["regression"] else ""
+        print(f"{r['case']:<34}{r['size']:>12,}{r['baseline_seconds']:>12.4f}{r['seconds']:>12.4f}{r['ratio']:>7.2f}x{flag}")
+    regressions = sum(r["regression"] for r in rows)
+    print(f"\n{regressions} regression(s) beyond {args.tolerance:.0%} across {len(rows)} compared case(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
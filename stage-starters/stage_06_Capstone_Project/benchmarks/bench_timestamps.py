@@ -0,0 +1,86 @@
+"""Benchmark: cached fixed-format timestamp decoding vs ``datetime.strptime``.
+
+Run from the project root:
+
+    python -m benchmarks.bench_timestamps --lines 200000
+
+Lines are generated so that each second repeats a few times, which is what
+real access logs look like under load.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from src.timestamps import clear_timestamp_caches, decode_apache, decode_auth, decode_ssh
+
+
+def _strptime_apache(ts: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(ts.split()[0], "%d/%b/%Y:%H:%M:%S")
+    except ValueError:
+        return None
+
+
+def _strptime_ssh(ts: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(ts, "%b %d %H:%M:%S").replace(year=datetime.now().year)
+    except ValueError:
+        return None
+
+
+def _strptime_auth(ts: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+
+
+def _samples(layout: str, lines: int, repeats: int) -> List[str]:
+    out = []
+    for i in range(lines):
+        sec = i // repeats
+        h, m, s = (sec // 3600) % 24, (sec // 60) % 60, sec % 60
+        if layout == "apache":
+            out.append(f"25/Dec/2024:{h:02d}:{m:02d}:{s:02d} +0000")
+        elif layout == "ssh":
+            out.append(f"Dec 25 {h:02d}:{m:02d}:{s:02d}")
+        else:
+            out.append(f"2024-12-25 {h:02d}:{m:02d}:{s:02d}")
+    return out
+
+
+def _time_per_line(fn: Callable[[str], object], samples: List[str]) -> float:
+    start = time.perf_counter()
+    for ts in samples:
+        fn(ts)
+    return (time.perf_counter() - start) / len(samples) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Timestamp decoding benchmark")
+    parser.add_argument("--lines", type=int, default=200_000, help="Timestamps per layout")
+    parser.add_argument("--repeats", type=int, default=20, help="Lines sharing the same second")
+    args = parser.parse_args()
+
+    year = datetime.now().year
+    cases = [
+        ("apache", _strptime_apache, decode_apache),
+        ("ssh", _strptime_ssh, lambda ts: decode_ssh(ts, year)),
+        ("auth", _strptime_auth, decode_auth),
+    ]
+
+    print(f"{'layout':<8}{'strptime ns/line':>18}{'cached ns/line':>16}{'speedup':>10}")
+    for layout, baseline, fast in cases:
+        samples = _samples(layout, args.lines, args.repeats)
+        clear_timestamp_caches()
+        base_ns = _time_per_line(baseline, samples)
+        fast_ns = _time_per_line(fast, samples)
+        print(f"{layout:<8}{base_ns:>18.0f}{fast_ns:>16.0f}{base_ns / fast_ns:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
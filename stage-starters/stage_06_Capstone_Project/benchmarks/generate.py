@@ -0,0 +1,204 @@
+"""Deterministic synthetic log generator for SecureSIEM benchmarks.
+
+Run from the project root:
+
+    python -m benchmarks.generate --format apache --lines 1000000 -o /tmp/access.log
+
+The same arguments (including ``--seed``) always produce byte-identical
+output, so timings from different runs and machines are comparable.
+
+Knobs:
+- ``--format``: apache, ssh, auth, or mixed (lines of all three interleaved)
+- ``--ips``: number of distinct benign client IPs (IP cardinality)
+- ``--attackers``: number of distinct attacker IPs
+- ``--attack-density``: fraction of lines that are attacks
+- ``--attack-mix``: relative weight of each attack kind for Apache lines,
+  e.g. ``sqli=2,traversal=1,admin=1,bruteforce=1`` (SSH and AUTH attacks
+  are always password guessing)
+
+Lines are generated one at a time and written through a large buffer, so
+memory stays flat at any size.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+FORMATS = ("apache", "ssh", "auth", "mixed")
+ATTACK_KINDS = ("sqli", "traversal", "admin", "bruteforce")
+DEFAULT_ATTACK_MIX = {"sqli": 1.0, "traversal": 1.0, "admin": 1.0, "bruteforce": 1.0}
+
+START = datetime(2024, 12, 25)
+LINES_PER_SECOND = 50
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+_BENIGN_IP_BASE = 0x0B000000  # 11.0.0.0
+_ATTACKER_IP_BASE = 0xC6120000  # 198.18.0.0
+
+BENIGN_PATHS = [
+    "/", "/index.html", "/about", "/products?id=42", "/static/app.js", "/static/site.css",
+    "/images/logo.png", "/api/v1/items", "/api/v1/items/17", "/blog/2024/12/welcome", "/contact",
+]
+BENIGN_USERS = ["alice", "bob", "carol", "dave", "erin", "frank", "grace", "heidi"]
+SQLI_PATHS = [
+    "/item?id=1%27%20OR%201=1--", "/search?q=x%27;--", "/news?id=1/**/UNION/**/SELECT", "/q?id=SLEEP(5)",
+]
+TRAVERSAL_PATHS = ["/../../etc/passwd", "/static/../../../etc/shadow", "/download?f=%2e%2e/%2e%2e/boot.ini"]
+ADMIN_PROBE_PATHS = ["/admin", "/wp-admin/", "/phpmyadmin/", "/administrator/index.php", "/.env"]
+GUESSED_USERS = ["root", "admin", "test", "oracle", "ubuntu"]
+
+
+def _ip(base: int, n: int) -> str:
+    v = base + n
+    return f"{v >> 24 & 255}.{v >> 16 & 255}.{v >> 8 & 255}.{v & 255}"
+
+
+def line_count(value: str) -> int:
+    """Parse a line count that may use scientific notation (``1e6``)."""
+    try:
+        n = int(float(value))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number: {value}") from None
+    if n < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return n
+
+
+def parse_attack_mix(spec: str) -> Dict[str, float]:
+    """Parse ``kind=weight,...`` into a weight per attack kind."""
+    mix = dict.fromkeys(ATTACK_KINDS, 0.0)
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        kind, _, weight = part.partition("=")
+        if kind not in mix:
+            raise ValueError(f"Unknown attack kind: {kind} (expected one of {', '.join(ATTACK_KINDS)})")
+        mix[kind] = float(weight or 1)
+    if sum(mix.values()) <= 0:
+        raise ValueError("attack mix needs at least one positive weight")
+    return mix
+
+
+class LogGenerator:
+    """Produce synthetic log lines from a seeded random stream."""
+
+    def __init__(
+        self,
+        fmt: str = "apache",
+        ips: int = 5000,
+        attackers: int = 20,
+        attack_density: float = 0.01,
+        attack_mix: Optional[Dict[str, float]] = None,
+        seed: int = 1,
+    ) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format: {fmt}")
+        if ips < 1 or attackers < 1:
+            raise ValueError("ips and attackers must be at least 1")
+        if not 0.0 <= attack_density <= 1.0:
+            raise ValueError("attack_density must be between 0 and 1")
+        self.fmt = fmt
+        self.ips = ips
+        self.attackers = attackers
+        self.attack_density = attack_density
+        mix = attack_mix or DEFAULT_ATTACK_MIX
+        self._kinds: List[str] = [k for k in ATTACK_KINDS if mix.get(k, 0) > 0]
+        self._weights: List[float] = [mix[k] for k in self._kinds]
+        self.rng = random.Random(seed)
+
+    def lines(self, count: int) -> Iterator[str]:
+        """Yield *count* newline-terminated lines."""
+        rng = self.rng
+        formats = ("apache", "ssh", "auth")
+        for i in range(count):
+            ts = START + timedelta(seconds=i // LINES_PER_SECOND)
+            fmt = self.fmt if self.fmt != "mixed" else formats[rng.randrange(3)]
+            attack = rng.random() < self.attack_density
+            if attack:
+                ip = _ip(_ATTACKER_IP_BASE, rng.randrange(self.attackers))
+            else:
+                ip = _ip(_BENIGN_IP_BASE, rng.randrange(self.ips))
+            if fmt == "apache":
+                yield self._apache(ts, ip, attack)
+            elif fmt == "ssh":
+                yield self._ssh(ts, ip, attack)
+            else:
+                yield self._auth(ts, ip, attack)
+
+    def _apache(self, ts: datetime, ip: str, attack: bool) -> str:
+        rng = self.rng
+        method, status = "GET", 200
+        if attack:
+            kind = rng.choices(self._kinds, self._weights)[0]
+            if kind == "sqli":
+                path, status = rng.choice(SQLI_PATHS), 500
+            elif kind == "traversal":
+                path, status = rng.choice(TRAVERSAL_PATHS), 400
+            elif kind == "admin":
+                path, status = rng.choice(ADMIN_PROBE_PATHS), 403
+            else:
+                method, path, status = "POST", "/login", 401
+        else:
+            path = rng.choice(BENIGN_PATHS)
+            r = rng.random()
+            status = 200 if r < 0.9 else 304 if r < 0.96 else 404
+        stamp = ts.strftime("%d/%b/%Y:%H:%M:%S")
+        return f'{ip} - - [{stamp} +0000] "{method} {path} HTTP/1.1" {status} {rng.randrange(200, 20000)}\n'
+
+    def _ssh(self, ts: datetime, ip: str, attack: bool) -> str:
+        rng = self.rng
+        if attack:
+            status, user = "Failed", rng.choice(GUESSED_USERS)
+        else:
+            status, user = ("Accepted" if rng.random() < 0.97 else "Failed"), rng.choice(BENIGN_USERS)
+        stamp = f"{ts:%b} {ts.day:2d} {ts:%H:%M:%S}"
+        return f"{stamp} bastion sshd[{rng.randrange(1000, 65000)}]: {status} password for {user} from {ip} port {rng.randrange(1024, 65535)} ssh2\n"
+
+    def _auth(self, ts: datetime, ip: str, attack: bool) -> str:
+        rng = self.rng
+        if attack or rng.random() < 0.03:
+            user = rng.choice(GUESSED_USERS if attack else BENIGN_USERS)
+            return f"{ts:%Y-%m-%d %H:%M:%S} AUTH FAILURE user={user} ip={ip} reason=invalid_password\n"
+        return f"{ts:%Y-%m-%d %H:%M:%S} AUTH SUCCESS user={rng.choice(BENIGN_USERS)} ip={ip}\n"
+
+
+def write_log(path: str, lines: int, **options) -> str:
+    """Write *lines* generated lines to *path* (options as for :class:`LogGenerator`)."""
+    gen = LogGenerator(**options)
+    with open(path, "w", encoding="utf-8", newline="\n", buffering=WRITE_BUFFER_SIZE) as f:
+        f.writelines(gen.lines(lines))
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic log file")
+    parser.add_argument("--format", choices=FORMATS, default="apache", help="Log format (default: apache)")
+    parser.add_argument("--lines", type=line_count, default=100_000, help="Number of lines to write (1e6 works)")
+    parser.add_argument("--ips", type=int, default=5000, help="Distinct benign client IPs")
+    parser.add_argument("--attackers", type=int, default=20, help="Distinct attacker IPs")
+    parser.add_argument("--attack-density", type=float, default=0.01, help="Fraction of lines that are attacks")
+    parser.add_argument("--attack-mix", default="", help="Apache attack weights, e.g. sqli=2,admin=1")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("--output", "-o", required=True, help="File to write")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_attack_mix(args.attack_mix) if args.attack_mix else None
+        write_log(
+            args.output,
+            args.lines,
+            fmt=args.format,
+            ips=args.ips,
+            attackers=args.attackers,
+            attack_density=args.attack_density,
+            attack_mix=mix,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Wrote {args.lines} {args.format} lines to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,50 @@
-"""File-based caching for SecureSIEM.
+"""Caching for SecureSIEM.
 
 Caching is used to reduce repeated API calls for enrichment (e.g., IP geolocation)
 and avoid rate limiting.
 
 Implementation notes:
 - Cache stored under ~/.securesiem/cache by default
-- Each key becomes a JSON file containing:
-    - _cached_at (epoch seconds)
-    - value (JSON-serializable payload)
+- Two pluggable backends:
+    - ``file`` (default): each key becomes a JSON file containing
+      ``_cached_at`` (epoch seconds) and ``value`` (JSON-serializable payload)
+    - ``sqlite``: a single ``cache.sqlite3`` file in WAL mode with an index on
+      ``cached_at`` for TTL expiry; safe to share between analyzer processes
+- The backend is chosen by :func:`configure_cache`, else the
+  ``SECURESIEM_CACHE_BACKEND`` environment variable, else ``file``
+- The module-level API goes through a :class:`TieredCache`: a bounded
+  in-memory LRU (``SECURESIEM_CACHE_MEMORY_SIZE`` entries, 0 disables it) in
+  front of the disk backend, with hit/miss/eviction counters and latency
+  histograms. Counters are accumulated across runs in ``cache.stats``.
 """
 
 from __future__ import annotations
 
 import json
 import os
+import sqlite3
+import threading
 import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 
 DEFAULT_TTL = 86400  # 24 hours (seconds)
+BACKENDS = ("file", "sqlite")
+MEMORY_CACHE_SIZE = 10_000  # entries kept in the in-process LRU tier
+STATS_FILE = "cache.stats"  # not *.json, so FileCache never treats it as an entry
+# Upper bounds (microseconds) of the latency histogram buckets; the last
+# bucket collects everything slower.
+LATENCY_BUCKETS_US = (1, 10, 100, 1_000, 10_000, 100_000)
 
 
 def _default_cache_dir() -> Path:
@@ -37,51 +62,617 @@ def ensure_cache_dir(cache_dir: Optional[Path] = None) -> Path:
     return d
 
 
+def _safe_key(key: str) -> str:
+    return key.replace(":", "_").replace("/", "_")
+
+
 def get_cache_path(key: str, cache_dir: Optional[Path] = None) -> Path:
     """Map a cache key to a safe filename."""
-    safe_key = key.replace(":", "_").replace("/", "_")
-    return ensure_cache_dir(cache_dir) / f"{safe_key}.json"
+    return ensure_cache_dir(cache_dir) / f"{_safe_key(key)}.json"
 
 
-def cache_get(key: str, ttl: int = DEFAULT_TTL, cache_dir: Optional[Path] = None) -> Optional[Any]:
-    """Return cached value if present and not expired; else None."""
-    p = get_cache_path(key, cache_dir=cache_dir)
-    if not p.exists():
-        return None
+# =============================================================================
+# BACKENDS
+# =============================================================================
 
-    try:
-        data = json.loads(p.read_text(encoding="utf-8"))
-        cached_at = float(data.get("_cached_at", 0))
-        if (time.time() - cached_at) > ttl:
+class CacheBackend(ABC):
+    """Interface shared by the cache stores.
+
+    Subclasses implement the batch methods; the single-key ``get``/``set``
+    are derived from them.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def get_entries(self, keys: Iterable[str], ttl: int = DEFAULT_TTL) -> Dict[str, Tuple[Any, float]]:
+        """Return ``{key: (value, cached_at)}`` for the keys that are present and fresh."""
+
+    def get(self, key: str, ttl: int = DEFAULT_TTL) -> Optional[Any]:
+        entry = self.get_entries([key], ttl).get(key)
+        return None if entry is None else entry[0]
+
+    def set(self, key: str, value: Any) -> bool:
+        return self.set_many({key: value}) == 1
+
+    def get_many(self, keys: Iterable[str], ttl: int = DEFAULT_TTL) -> Dict[str, Any]:
+        """Return ``{key: value}`` for the keys that are present and fresh."""
+        return {k: v for k, (v, _) in self.get_entries(keys, ttl).items()}
+
+    @abstractmethod
+    def set_many(self, items: Dict[str, Any]) -> int:
+        """Store several values; return how many were written."""
+
+    @abstractmethod
+    def clear(self) -> int:
+        """Remove every entry; return how many were removed."""
+
+    @abstractmethod
+    def purge_expired(self, ttl: int = DEFAULT_TTL) -> int:
+        """Remove entries older than *ttl* seconds; return how many were removed."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored entries (fresh or not)."""
+
+
+class FileCache(CacheBackend):
+    """One JSON file per key (the original SecureSIEM layout)."""
+
+    name = "file"
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = ensure_cache_dir(cache_dir)  # once, not per lookup
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{_safe_key(key)}.json"
+
+    def _read(self, key: str, ttl: int) -> Optional[Tuple[Any, float]]:
+        p = self._path(key)
+        try:
+            # A missing file raises here; no separate exists() stat needed.
+            data = json.loads(p.read_text(encoding="utf-8"))
+            cached_at = float(data.get("_cached_at", 0))
+            if (time.time() - cached_at) > ttl:
+                try:
+                    p.unlink(missing_ok=True)
+                except Exception:
+                    pass
+                return None
+            value = data.get("value")
+            return None if value is None else (value, cached_at)
+        except Exception:
+            return None
+
+    def get_entries(self, keys: Iterable[str], ttl: int = DEFAULT_TTL) -> Dict[str, Tuple[Any, float]]:
+        found: Dict[str, Tuple[Any, float]] = {}
+        for key in keys:
+            entry = self._read(key, ttl)
+            if entry is not None:
+                found[key] = entry
+        return found
+
+    def set_many(self, items: Dict[str, Any]) -> int:
+        return sum(1 for key, value in items.items() if self._write(key, value))
+
+    def _write(self, key: str, value: Any) -> bool:
+        p = self._path(key)
+        try:
+            payload = json.dumps({"_cached_at": time.time(), "value": value})
+        except Exception:
+            return False
+        try:
+            p.write_text(payload, encoding="utf-8")
+            return True
+        except FileNotFoundError:
+            # Directory removed behind our back; recreate once and retry.
+            try:
+                ensure_cache_dir(self.cache_dir)
+                p.write_text(payload, encoding="utf-8")
+                return True
+            except Exception:
+                return False
+        except Exception:
+            return False
+
+    def clear(self) -> int:
+        removed = 0
+        for f in ensure_cache_dir(self.cache_dir).glob("*.json"):
             try:
-                p.unlink(missing_ok=True)
+                f.unlink(missing_ok=True)
+                removed += 1
             except Exception:
                 pass
-            return None
-        return data.get("value")
-    except Exception:
+        return removed
+
+    def purge_expired(self, ttl: int = DEFAULT_TTL) -> int:
+        removed = 0
+        cutoff = time.time() - ttl
+        for f in self.cache_dir.glob("*.json"):
+            try:
+                data = json.loads(f.read_text(encoding="utf-8"))
+                if float(data.get("_cached_at", 0)) < cutoff:
+                    f.unlink(missing_ok=True)
+                    removed += 1
+            except Exception:
+                pass
+        return removed
+
+    def count(self) -> int:
+        return sum(1 for _ in self.cache_dir.glob("*.json"))
+
+
+class SQLiteCache(CacheBackend):
+    """Single-file SQLite store (WAL mode) with indexed TTL expiry.
+
+    Each thread (and each process) gets its own connection. WAL lets readers
+    run alongside a writer, and ``busy_timeout`` makes concurrent writers from
+    several analyzer processes wait instead of failing.
+    """
+
+    name = "sqlite"
+    DB_NAME = "cache.sqlite3"
+    BUSY_TIMEOUT_MS = 10_000
+    _MAX_VARS = 500  # stay well under SQLite's bound-parameter limit
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = ensure_cache_dir(cache_dir)
+        self.db_path = self.cache_dir / self.DB_NAME
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " cached_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_cached_at ON cache(cached_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(str(self.db_path), timeout=self.BUSY_TIMEOUT_MS / 1000)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={self.BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get_entries(self, keys: Iterable[str], ttl: int = DEFAULT_TTL) -> Dict[str, Tuple[Any, float]]:
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Tuple[Any, float]] = {}
+        expired: List[Tuple[str, float]] = []
+        now = time.time()
+        try:
+            conn = self._conn()
+            for i in range(0, len(keys), self._MAX_VARS):
+                chunk = keys[i:i + self._MAX_VARS]
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, value, cached_at FROM cache WHERE key IN ({marks})", chunk
+                ).fetchall()
+                for key, value, cached_at in rows:
+                    if (now - cached_at) > ttl:
+                        expired.append((key, cached_at))
+                        continue
+                    try:
+                        found[key] = (json.loads(value), cached_at)
+                    except ValueError:
+                        expired.append((key, cached_at))
+            if expired:
+                # Only the row that was read: another process may have
+                # refreshed the key since the SELECT.
+                with conn:
+                    conn.executemany("DELETE FROM cache WHERE key = ? AND cached_at = ?", expired)
+        except sqlite3.Error:
+            return found
+        return found
+
+    def set_many(self, items: Dict[str, Any]) -> int:
+        now = time.time()
+        rows: List[Tuple[str, str, float]] = []
+        for key, value in items.items():
+            try:
+                rows.append((key, json.dumps(value), now))
+            except (TypeError, ValueError):
+                continue
+        if not rows:
+            return 0
+        try:
+            conn = self._conn()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO cache (key, value, cached_at) VALUES (?, ?, ?)", rows)
+        except sqlite3.Error:
+            return 0
+        return len(rows)
+
+    def clear(self) -> int:
+        try:
+            conn = self._conn()
+            with conn:
+                return conn.execute("DELETE FROM cache").rowcount
+        except sqlite3.Error:
+            return 0
+
+    def purge_expired(self, ttl: int = DEFAULT_TTL) -> int:
+        try:
+            conn = self._conn()
+            with conn:
+                return conn.execute("DELETE FROM cache WHERE cached_at < ?", (time.time() - ttl,)).rowcount
+        except sqlite3.Error:
+            return 0
+
+    def count(self) -> int:
+        try:
+            return self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+
+# =============================================================================
+# IN-MEMORY TIER AND STATISTICS
+# =============================================================================
+
+class CacheStats:
+    """Thread-safe hit/miss/eviction counters and per-operation latency histograms."""
+
+    COUNTERS = ("memory_hits", "disk_hits", "misses", "sets", "evictions", "expirations")
+    OPERATIONS = ("memory_get", "disk_get", "set")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = dict.fromkeys(self.COUNTERS, 0)
+        self.histograms: Dict[str, List[int]] = {
+            op: [0] * (len(LATENCY_BUCKETS_US) + 1) for op in self.OPERATIONS
+        }
+
+    def incr(self, name: str, n: int = 1) -> None:
+        if n:
+            with self._lock:
+                self.counters[name] += n
+
+    def observe(self, operation: str, seconds: float) -> None:
+        """Record one call of *operation* that took *seconds*."""
+        us = seconds * 1_000_000
+        idx = 0
+        for bound in LATENCY_BUCKETS_US:
+            if us <= bound:
+                break
+            idx += 1
+        with self._lock:
+            self.histograms[operation][idx] += 1
+
+    @property
+    def lookups(self) -> int:
+        c = self.counters
+        return c["memory_hits"] + c["disk_hits"] + c["misses"]
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.lookups
+        if not lookups:
+            return 0.0
+        return (self.counters["memory_hits"] + self.counters["disk_hits"]) / lookups
+
+    def merge(self, other: "CacheStats") -> None:
+        with self._lock:
+            for name, n in other.counters.items():
+                self.counters[name] = self.counters.get(name, 0) + n
+            for op, buckets in other.histograms.items():
+                mine = self.histograms.setdefault(op, [0] * len(buckets))
+                for i, n in enumerate(buckets[:len(mine)]):
+                    mine[i] += n
+
+    def reset(self) -> None:
+        with self._lock:
+            for name in self.counters:
+                self.counters[name] = 0
+            for buckets in self.histograms.values():
+                buckets[:] = [0] * len(buckets)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "latency_buckets_us": list(LATENCY_BUCKETS_US),
+                "histograms": {op: list(b) for op, b in self.histograms.items()},
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CacheStats":
+        stats = cls()
+        for name, n in (data.get("counters") or {}).items():
+            if name in stats.counters:
+                stats.counters[name] = int(n)
+        # Histograms recorded with different bucket bounds cannot be merged.
+        if list(data.get("latency_buckets_us") or []) == list(LATENCY_BUCKETS_US):
+            for op, buckets in (data.get("histograms") or {}).items():
+                if op in stats.histograms and len(buckets) == len(stats.histograms[op]):
+                    stats.histograms[op] = [int(n) for n in buckets]
+        return stats
+
+
+class MemoryLRU:
+    """Bounded, thread-safe LRU of ``key -> (value, cached_at)``.
+
+    Entries keep the ``cached_at`` of the disk copy they were promoted from,
+    so the TTL a caller passes is enforced the same way in both tiers.
+    """
+
+    def __init__(self, maxsize: int = MEMORY_CACHE_SIZE, stats: Optional[CacheStats] = None) -> None:
+        self.maxsize = maxsize
+        self.stats = stats or CacheStats()
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str, ttl: int = DEFAULT_TTL, now: Optional[float] = None) -> Optional[Tuple[Any, float]]:
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if (now - entry[1]) <= ttl:
+                self._data.move_to_end(key)
+                return entry
+            del self._data[key]
+        self.stats.incr("expirations")
         return None
 
+    def put(self, key: str, value: Any, cached_at: float) -> None:
+        evicted = 0
+        with self._lock:
+            self._data[key] = (value, cached_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+        self.stats.incr("evictions", evicted)
+
+    def purge_expired(self, ttl: int = DEFAULT_TTL) -> int:
+        cutoff = time.time() - ttl
+        with self._lock:
+            stale = [k for k, (_, cached_at) in self._data.items() if cached_at < cutoff]
+            for k in stale:
+                del self._data[k]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class TieredCache(CacheBackend):
+    """In-memory LRU in front of a disk backend.
+
+    Reads try memory first and fall back to *disk*; disk hits are promoted
+    into memory. Writes go to both tiers. ``memory_size=0`` keeps the stats
+    but disables the memory tier.
+    """
+
+    def __init__(self, disk: CacheBackend, memory_size: int = MEMORY_CACHE_SIZE) -> None:
+        self.disk = disk
+        self.name = disk.name
+        self.stats = CacheStats()
+        self.memory: Optional[MemoryLRU] = MemoryLRU(memory_size, self.stats) if memory_size > 0 else None
+
+    def get_entries(self, keys: Iterable[str], ttl: int = DEFAULT_TTL) -> Dict[str, Tuple[Any, float]]:
+        stats = self.stats
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Tuple[Any, float]] = {}
+        missing = keys
+        if self.memory is not None:
+            start = time.perf_counter()
+            now = time.time()
+            missing = []
+            for key in keys:
+                entry = self.memory.get(key, ttl, now)
+                if entry is None:
+                    missing.append(key)
+                else:
+                    found[key] = entry
+            stats.observe("memory_get", time.perf_counter() - start)
+            stats.incr("memory_hits", len(found))
+        if missing:
+            start = time.perf_counter()
+            from_disk = self.disk.get_entries(missing, ttl)
+            stats.observe("disk_get", time.perf_counter() - start)
+            stats.incr("disk_hits", len(from_disk))
+            stats.incr("misses", len(missing) - len(from_disk))
+            if self.memory is not None:
+                for key, (value, cached_at) in from_disk.items():
+                    self.memory.put(key, value, cached_at)
+            found.update(from_disk)
+        return found
+
+    def set_many(self, items: Dict[str, Any]) -> int:
+        start = time.perf_counter()
+        written = self.disk.set_many(items)
+        self.stats.observe("set", time.perf_counter() - start)
+        self.stats.incr("sets", written)
+        # Only mirror into memory what the disk store accepted, so both tiers
+        # agree on what is cacheable.
+        if self.memory is not None and written == len(items):
+            now = time.time()
+            for key, value in items.items():
+                self.memory.put(key, value, now)
+        return written
+
+    def clear(self) -> int:
+        if self.memory is not None:
+            self.memory.clear()
+        return self.disk.clear()
+
+    def purge_expired(self, ttl: int = DEFAULT_TTL) -> int:
+        if self.memory is not None:
+            self.memory.purge_expired(ttl)
+        return self.disk.purge_expired(ttl)
+
+    def count(self) -> int:
+        return self.disk.count()
+
+
+_BACKEND_CLASSES = {"file": FileCache, "sqlite": SQLiteCache}
+_configured_backend: Optional[str] = None
+_configured_memory_size: Optional[int] = None
+_instances: Dict[Tuple[str, Path], CacheBackend] = {}
+_tiers: Dict[Tuple[str, Path, int], TieredCache] = {}
+_instances_lock = threading.Lock()
+
+
+def configure_cache(backend: Optional[str] = None, memory_size: Optional[int] = None) -> None:
+    """Select the default backend and memory-tier size for this process.
+
+    ``None`` restores the environment/default value for that setting.
+    """
+    global _configured_backend, _configured_memory_size
+    if backend is not None and backend not in BACKENDS:
+        raise ValueError(f"Unknown cache backend: {backend}")
+    if memory_size is not None and memory_size < 0:
+        raise ValueError("memory_size must be >= 0")
+    _configured_backend = backend
+    _configured_memory_size = memory_size
+
+
+def _memory_size() -> int:
+    if _configured_memory_size is not None:
+        return _configured_memory_size
+    env = os.getenv("SECURESIEM_CACHE_MEMORY_SIZE")
+    if env:
+        try:
+            return max(0, int(env))
+        except ValueError:
+            pass
+    return MEMORY_CACHE_SIZE
+
+
+def get_backend(cache_dir: Optional[Path] = None, backend: Optional[str] = None) -> CacheBackend:
+    """Return the (shared) backend instance for *cache_dir*."""
+    name = backend or _configured_backend or os.getenv("SECURESIEM_CACHE_BACKEND") or "file"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown cache backend: {name}")
+    d = cache_dir or _default_cache_dir()
+    key = (name, d)
+    inst = _instances.get(key)
+    if inst is None:
+        with _instances_lock:
+            inst = _instances.get(key)
+            if inst is None:
+                inst = _instances[key] = _BACKEND_CLASSES[name](d)
+    return inst
+
+
+def get_cache(cache_dir: Optional[Path] = None) -> TieredCache:
+    """Return the shared memory+disk cache for *cache_dir*."""
+    disk = get_backend(cache_dir)
+    key = (disk.name, disk.cache_dir, _memory_size())
+    tier = _tiers.get(key)
+    if tier is None:
+        with _instances_lock:
+            tier = _tiers.get(key)
+            if tier is None:
+                tier = _tiers[key] = TieredCache(disk, key[2])
+    return tier
+
+
+def _stats_path(cache_dir: Optional[Path] = None) -> Path:
+    return ensure_cache_dir(cache_dir) / STATS_FILE
+
+
+@contextmanager
+def _stats_lock(cache_dir: Optional[Path] = None) -> Iterator[None]:
+    """Hold an exclusive lock on ``cache.stats.lock`` across processes."""
+    path = _stats_path(cache_dir).with_name(STATS_FILE + ".lock")
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def load_cache_stats(cache_dir: Optional[Path] = None) -> CacheStats:
+    """Return the statistics accumulated by previous runs (empty if none)."""
+    try:
+        return CacheStats.from_dict(json.loads(_stats_path(cache_dir).read_text(encoding="utf-8")))
+    except (OSError, ValueError, TypeError, AttributeError):
+        return CacheStats()
+
+
+def save_cache_stats(cache_dir: Optional[Path] = None) -> CacheStats:
+    """Fold this process's statistics into ``cache.stats`` and return the total.
+
+    The in-process counters are reset afterwards so a second call does not
+    count the same lookups twice.
+    """
+    tier = get_cache(cache_dir)
+    path = _stats_path(cache_dir)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    total = CacheStats()
+    try:
+        # Read-merge-write under the lock so concurrent runs do not drop
+        # each other's counters.
+        with _stats_lock(cache_dir):
+            total = load_cache_stats(cache_dir)
+            total.merge(tier.stats)
+            tmp.write_text(json.dumps(total.to_dict()), encoding="utf-8")
+            os.replace(tmp, path)
+    except OSError:
+        return total  # in-process counters are kept for the next attempt
+    tier.stats.reset()
+    return total
+
+
+def reset_cache_stats(cache_dir: Optional[Path] = None) -> None:
+    """Forget both the persisted and the in-process statistics."""
+    get_cache(cache_dir).stats.reset()
+    try:
+        with _stats_lock(cache_dir):
+            _stats_path(cache_dir).unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+# =============================================================================
+# MODULE-LEVEL API
+# =============================================================================
+
+def cache_get(key: str, ttl: int = DEFAULT_TTL, cache_dir: Optional[Path] = None) -> Optional[Any]:
+    """Return cached value if present and not expired; else None."""
+    return get_cache(cache_dir).get(key, ttl)
+
 
 def cache_set(key: str, value: Any, cache_dir: Optional[Path] = None) -> bool:
     """Store *value* under *key*. Value must be JSON-serializable."""
-    p = get_cache_path(key, cache_dir=cache_dir)
-    try:
-        payload = {"_cached_at": time.time(), "value": value}
-        p.write_text(json.dumps(payload), encoding="utf-8")
-        return True
-    except Exception:
-        return False
+    return get_cache(cache_dir).set(key, value)
+
+
+def cache_get_many(keys: Iterable[str], ttl: int = DEFAULT_TTL, cache_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """Return ``{key: value}`` for every key that is cached and not expired."""
+    return get_cache(cache_dir).get_many(keys, ttl)
+
+
+def cache_set_many(items: Dict[str, Any], cache_dir: Optional[Path] = None) -> int:
+    """Store several values at once. Returns the number written."""
+    return get_cache(cache_dir).set_many(items)
+
+
+def cache_purge_expired(ttl: int = DEFAULT_TTL, cache_dir: Optional[Path] = None) -> int:
+    """Delete entries older than *ttl*. Returns the number removed."""
+    return get_cache(cache_dir).purge_expired(ttl)
 
 
 def cache_clear(cache_dir: Optional[Path] = None) -> int:
-    """Delete all cached files. Returns number of files removed."""
-    d = ensure_cache_dir(cache_dir)
-    removed = 0
-    for f in d.glob("*.json"):
-        try:
-            f.unlink(missing_ok=True)
-            removed += 1
-        except Exception:
-            pass
-    return removed
+    """Delete all cached entries. Returns number of entries removed."""
+    return get_cache(cache_dir).clear()
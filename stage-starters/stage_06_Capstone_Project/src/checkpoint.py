@@ -0,0 +1,203 @@
+"""Checkpointed, incremental analysis for SecureSIEM.
+
+Re-running ``analyze`` on a log that only grew since the last run should not
+re-parse it from byte 0. With checkpoints enabled, each input file gets a
+small JSON record under ``~/.securesiem/checkpoints`` (or
+``SECURESIEM_CHECKPOINT_DIR``) holding:
+
+- the file's inode/device and the byte offset processed so far (always just
+  after a newline, so a half-written last line is picked up next time)
+- a SHA-256 of the first ``HEAD_BYTES`` bytes, which tells a grown file apart
+  from a replaced one even when the inode is reused
+- the serialized :class:`~src.detection.DetectionEngine` state (counters and
+  capped evidence), so new entries merge into the earlier findings
+
+The saved state is discarded, and the file read from the start, when the
+inode or head hash no longer match, the file shrank, or the detection
+settings changed.
+
+Compressed files cannot be resumed mid-stream. They are treated as a unit:
+skipped when unchanged, re-read in full otherwise.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .detection import DetectionEngine
+from .models import LogEntry
+from .log_parser import (
+    DEFAULT_CHUNK_SIZE,
+    _parse_range,
+    _sniff_log_type,
+    compression_of,
+    parse_file,
+    split_file_ranges,
+)
+
+
+CHECKPOINT_VERSION = 1
+HEAD_BYTES = 4096  # bytes hashed to recognise the same file again
+
+
+@dataclass
+class Checkpoint:
+    """Saved progress for one input file."""
+
+    path: str
+    device: int
+    inode: int
+    offset: int
+    head_len: int
+    head_hash: str
+    engine_state: Dict[str, Any]
+    updated_at: str = ""
+    version: int = CHECKPOINT_VERSION
+
+
+def _default_checkpoint_dir() -> Path:
+    env = os.getenv("SECURESIEM_CHECKPOINT_DIR")
+    if env:
+        return Path(env).expanduser()
+    return Path.home() / ".securesiem" / "checkpoints"
+
+
+def checkpoint_path_for(input_path: str, checkpoint_dir: Optional[Path] = None) -> Path:
+    """Checkpoint file used for *input_path* (one per absolute path)."""
+    d = checkpoint_dir or _default_checkpoint_dir()
+    digest = hashlib.sha256(str(Path(input_path).resolve()).encode("utf-8")).hexdigest()[:32]
+    return d / f"{digest}.json"
+
+
+def _head_hash(path: Path, length: int) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read(length)).hexdigest()
+
+
+def _last_line_end(path: Path, start: int, size: int) -> int:
+    """Offset just after the last newline in ``[start, size)`` (*start* if none)."""
+    block = 64 * 1024
+    with open(path, "rb") as f:
+        pos = size
+        while pos > start:
+            lo = max(start, pos - block)
+            f.seek(lo)
+            idx = f.read(pos - lo).rfind(b"\n")
+            if idx != -1:
+                return lo + idx + 1
+            pos = lo
+    return start
+
+
+def load_checkpoint(input_path: str, checkpoint_dir: Optional[Path] = None) -> Optional[Checkpoint]:
+    """Return the saved checkpoint for *input_path*, or None if absent/unreadable."""
+    try:
+        data = json.loads(checkpoint_path_for(input_path, checkpoint_dir).read_text(encoding="utf-8"))
+        if data.get("version") != CHECKPOINT_VERSION:
+            return None
+        return Checkpoint(**data)
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def save_checkpoint(cp: Checkpoint, checkpoint_dir: Optional[Path] = None) -> Path:
+    """Write *cp* atomically and return its path."""
+    path = checkpoint_path_for(cp.path, checkpoint_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cp.updated_at = datetime.now().isoformat(timespec="seconds")
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(asdict(cp)), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def _resume_point(cp: Optional[Checkpoint], path: Path, st: os.stat_result, config: Dict[str, Any]) -> int:
+    """Offset to continue from, or 0 if the checkpoint does not apply."""
+    if cp is None:
+        return 0
+    if (cp.device, cp.inode) != (st.st_dev, st.st_ino) or st.st_size < cp.offset:
+        return 0
+    if cp.engine_state.get("config") != config:
+        return 0
+    if cp.head_len and _head_hash(path, cp.head_len) != cp.head_hash:
+        return 0
+    return cp.offset
+
+
+def read_new_entries(
+    path: Path, st: os.stat_result, start: int, engine: str = "text", chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Tuple[int, int, Iterator[LogEntry]]:
+    """Entries of *path* after byte *start*, as ``(start, end, entries)``.
+
+    *end* is the offset to record for next time (just after the last complete
+    line). A compressed file that changed is re-read whole, in which case the
+    returned *start* is 0.
+    """
+    if compression_of(str(path)) is not None:
+        if start == st.st_size:
+            return start, start, iter(())
+        return 0, st.st_size, parse_file(str(path), engine=engine)
+
+    end = _last_line_end(path, start, st.st_size)
+    if end <= start:
+        return start, start, iter(())
+    log_type = _sniff_log_type(path)
+    year = datetime.now().year
+    ranges = split_file_ranges(str(path), chunk_size, start=start, stop=end)
+    return start, end, chain.from_iterable(_parse_range(str(path), lo, hi, log_type, engine, year) for lo, hi in ranges)
+
+
+def analyze_incremental(
+    filepath: str,
+    brute_force_threshold: int = 5,
+    admin_probe_threshold: int = 3,
+    brute_force_window: Optional[float] = None,
+    engine: str = "text",
+    checkpoint_dir: Optional[Path] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Tuple[DetectionEngine, int, int]:
+    """Run detections over the part of *filepath* not seen by earlier runs.
+
+    Returns ``(detection_engine, new_entries, resumed_from_offset)``. The
+    engine holds the merged state of all runs and is checkpointed again
+    before returning.
+    """
+    path = Path(filepath)
+    st = os.stat(path)
+    config = {
+        "brute_force_threshold": brute_force_threshold,
+        "admin_probe_threshold": admin_probe_threshold,
+        "brute_force_window": brute_force_window,
+    }
+
+    cp = load_checkpoint(filepath, checkpoint_dir)
+    start, end, entries = read_new_entries(path, st, _resume_point(cp, path, st, config), engine, chunk_size)
+    if start and cp is not None:
+        detector = DetectionEngine.from_state(cp.engine_state)
+    else:
+        detector = DetectionEngine(brute_force_threshold, admin_probe_threshold, brute_force_window)
+
+    seen_before = detector.entries_seen
+    detector.feed_all(entries)
+
+    head_len = min(HEAD_BYTES, end)
+    save_checkpoint(
+        Checkpoint(
+            path=str(path.resolve()),
+            device=st.st_dev,
+            inode=st.st_ino,
+            offset=end,
+            head_len=head_len,
+            head_hash=_head_hash(path, head_len),
+            engine_state=detector.state_dict(),
+        ),
+        checkpoint_dir,
+    )
+    return detector, detector.entries_seen - seen_before, start
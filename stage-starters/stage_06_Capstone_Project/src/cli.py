@@ -3,16 +3,40 @@
 Implements subcommands:
 - analyze: analyze a log file, run detections, optionally enrich, output report
 - summary: quick stats about a log file
+- watch: follow a growing log file and alert as detections fire
 - cache-clear: clear local enrichment cache (optional quality-of-life)
+- cache-stats: show enrichment cache hit/miss counters and latencies
+- geodb-build: build the offline geolocation range database from a CSV file
+- ingest: load parsed entries into the local event store (incremental)
+- query: look up stored events by IP, time range, rule or log type
 """
 
 from __future__ import annotations
 
 import argparse
 import sys
+from datetime import datetime
 from pathlib import Path
 
 
+RULE_NAMES = ["brute_force", "sql_injection", "directory_traversal", "admin_probe"]
+
+
+def iso_datetime(value: str) -> datetime:
+    """argparse type for ``2024-12-25`` or ``2024-12-25T10:15:00``.
+
+    Stored timestamps are the log's own wall-clock times, so no UTC offset
+    is accepted.
+    """
+    try:
+        ts = datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not an ISO date/time: {value}") from None
+    if ts.tzinfo is not None:
+        raise argparse.ArgumentTypeError("give the time as written in the logs, without a UTC offset")
+    return ts
+
+
 def create_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="securesiem",
@@ -20,20 +44,235 @@ def create_parser() -> argparse.ArgumentParser:
         epilog="Example: securesiem analyze --input data/sample_apache.log --enrich --output report.json",
     )
 
+    parser.add_argument(
+        "--cache-backend",
+        choices=["file", "sqlite"],
+        help="Enrichment cache store: file (one JSON file per key) or sqlite (single WAL database)",
+    )
+
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
     analyze = subparsers.add_parser("analyze", help="Analyze a log file for threats")
-    analyze.add_argument("--input", "-i", required=True, help="Path to log file to analyze")
+    analyze.add_argument(
+        "--input",
+        "-i",
+        required=True,
+        nargs="+",
+        help="Log file(s) to analyze; quoted glob patterns such as 'logs/*.log*' are expanded. "
+        "Several files are merged into one timestamp-ordered stream",
+    )
     analyze.add_argument("--output", "-o", help="Path to save JSON report (optional)")
+    analyze.add_argument(
+        "--format",
+        choices=["json", "ndjson"],
+        default="json",
+        help="Report format for --output: json (default) or ndjson (one finding per line)",
+    )
+    analyze.add_argument("--evidence", action="store_true", help="Include each finding's evidence entries in the report")
+    analyze.add_argument(
+        "--evidence-cap",
+        type=int,
+        help="Include at most this many evidence entries per finding (implies --evidence)",
+    )
     analyze.add_argument("--enrich", action="store_true", help="Enrich findings with geolocation data")
+    analyze.add_argument(
+        "--enrich-workers",
+        type=int,
+        default=8,
+        help="Concurrent enrichment lookups (default: 8)",
+    )
+    analyze.add_argument(
+        "--enrich-batch",
+        action="store_true",
+        help="Send enrichment lookups to the batch endpoint (up to 100 IPs per request)",
+    )
+    analyze.add_argument(
+        "--rate-limit",
+        type=float,
+        help="Max enrichment API requests per minute (default: 45, or 15 with --enrich-batch; 0 = unlimited)",
+    )
+    analyze.add_argument(
+        "--enrich-timeout",
+        type=float,
+        help="Stop enrichment after this many seconds and keep partial results",
+    )
+    analyze.add_argument(
+        "--geo-mode",
+        choices=["online", "offline", "fallback"],
+        default="online",
+        help="Enrichment source: online API (default), offline range database only, "
+        "or API with the database as fallback",
+    )
+    analyze.add_argument("--geodb", help="Offline geolocation database built with geodb-build")
     analyze.add_argument("--verbose", "-v", action="store_true", help="Show extra progress output")
+    analyze.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="Parse the file (or up to N of several files) in N worker processes (default: 1, single process)",
+    )
+    analyze.add_argument(
+        "--engine",
+        choices=["text", "mmap"],
+        default="text",
+        help="Parser engine: text (default) or mmap (bytes regexes over a memory-mapped file)",
+    )
+    analyze.add_argument(
+        "--stream",
+        action="store_true",
+        help="Feed parsed entries straight into detection without keeping them all in memory",
+    )
+    analyze.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Resume from the last run's byte offset and detector state, then save a new checkpoint",
+    )
+    analyze.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Run parse, detect, enrich and report concurrently, printing alerts as findings fire",
+    )
+    analyze.add_argument(
+        "--mixed",
+        action="store_true",
+        help="Detect the format of every line (for aggregates mixing syslog, AUTH and Apache lines)",
+    )
+    analyze.add_argument(
+        "--checkpoint-dir",
+        help="Where checkpoints are kept (default: ~/.securesiem/checkpoints)",
+    )
+    analyze.add_argument(
+        "--bf-threshold",
+        type=int,
+        default=5,
+        help="Failed logins from one IP that count as brute force (default: 5)",
+    )
+    analyze.add_argument(
+        "--bf-window",
+        type=float,
+        help="Only count failures that fall within this many seconds (sliding window)",
+    )
+    analyze.add_argument(
+        "--sql-signatures",
+        metavar="FILE",
+        help="Extra SQL injection signatures, one per line (# starts a comment)",
+    )
+    analyze.add_argument(
+        "--traversal-signatures",
+        metavar="FILE",
+        help="Extra directory traversal signatures, one per line",
+    )
+    analyze.add_argument(
+        "--admin-paths",
+        metavar="FILE",
+        help="Extra admin paths for probe detection, one per line",
+    )
+
+    watch = subparsers.add_parser("watch", help="Follow a log file (like tail -F) and alert on new findings")
+    watch.add_argument("--input", "-i", required=True, help="Path to the log file to follow")
+    watch.add_argument("--from-start", action="store_true", help="Process existing content before following")
+    watch.add_argument(
+        "--interval",
+        type=float,
+        default=2.0,
+        help="Longest wait between polls while the file is idle, in seconds (default: 2)",
+    )
+    watch.add_argument("--json", action="store_true", help="Emit each alert as one JSON object per line")
+    watch.add_argument(
+        "--bf-threshold",
+        type=int,
+        default=5,
+        help="Failed logins from one IP that count as brute force (default: 5)",
+    )
+    watch.add_argument(
+        "--bf-window",
+        type=float,
+        help="Only count failures that fall within this many seconds (sliding window)",
+    )
+    watch.add_argument(
+        "--sql-signatures",
+        metavar="FILE",
+        help="Extra SQL injection signatures, one per line (# starts a comment)",
+    )
+    watch.add_argument(
+        "--traversal-signatures",
+        metavar="FILE",
+        help="Extra directory traversal signatures, one per line",
+    )
+    watch.add_argument(
+        "--admin-paths",
+        metavar="FILE",
+        help="Extra admin paths for probe detection, one per line",
+    )
 
     summary = subparsers.add_parser("summary", help="Show a quick summary of a log file")
     summary.add_argument("--input", "-i", required=True, help="Path to log file")
+    summary.add_argument(
+        "--engine",
+        choices=["text", "mmap"],
+        default="text",
+        help="Parser engine: text (default) or mmap",
+    )
+
+    for sub in (analyze, summary):
+        sub.add_argument(
+            "--profile",
+            action="store_true",
+            help="Print wall/CPU time, throughput and peak memory per stage (also saved in the JSON report)",
+        )
+        sub.add_argument("--profile-dump", help="Also write cProfile data to this file (implies --profile)")
 
     cache_clear = subparsers.add_parser("cache-clear", help="Clear local enrichment cache")
     cache_clear.add_argument("--yes", action="store_true", help="Skip confirmation prompt")
 
+    cache_stats = subparsers.add_parser("cache-stats", help="Show enrichment cache hit/miss statistics")
+    cache_stats.add_argument("--json", action="store_true", help="Print the raw statistics as JSON")
+    cache_stats.add_argument("--reset", action="store_true", help="Reset the accumulated statistics")
+
+    geodb_build = subparsers.add_parser("geodb-build", help="Build the offline geolocation database from CSV")
+    geodb_build.add_argument("--csv", required=True, help="CSV with start_ip,end_ip (or network) and location columns")
+    geodb_build.add_argument("--output", "-o", required=True, help="Path of the database file to write")
+
+    ingest = subparsers.add_parser("ingest", help="Load parsed log entries into the local event store")
+    ingest.add_argument(
+        "--input",
+        "-i",
+        required=True,
+        nargs="+",
+        help="Log file(s) to ingest; quoted glob patterns are expanded. Only new lines are read on re-runs",
+    )
+    ingest.add_argument(
+        "--engine",
+        choices=["text", "mmap"],
+        default="text",
+        help="Parser engine: text (default) or mmap",
+    )
+    ingest.add_argument(
+        "--bf-threshold",
+        type=int,
+        default=5,
+        help="Failed logins from one IP that count as brute force (default: 5)",
+    )
+    ingest.add_argument(
+        "--bf-window",
+        type=float,
+        help="Only count failures that fall within this many seconds (sliding window)",
+    )
+
+    query = subparsers.add_parser("query", help="Search the local event store")
+    query.add_argument("--ip", help="Only events from this source IP")
+    query.add_argument("--since", type=iso_datetime, help="Only events at or after this time (ISO 8601)")
+    query.add_argument("--until", type=iso_datetime, help="Only events before this time (ISO 8601)")
+    query.add_argument("--rule", choices=RULE_NAMES, help="Only events from IPs with a finding for this rule")
+    query.add_argument("--log-type", choices=["apache", "ssh", "auth"], help="Only events of this log type")
+    query.add_argument("--limit", type=int, default=100, help="Maximum events to print (default: 100, 0 = all)")
+    query.add_argument("--count", action="store_true", help="Print only the number of matching events")
+    query.add_argument("--json", action="store_true", help="Emit each event as one JSON object per line")
+
+    for sub in (ingest, query):
+        sub.add_argument("--store", help="Event store database (default: ~/.securesiem/events.sqlite3)")
+
     return parser
 
 
@@ -56,4 +295,50 @@ def parse_args(args=None) -> argparse.Namespace:
         parser.print_help()
         raise SystemExit(0)
 
+    if getattr(parsed, "workers", 1) < 1:
+        parser.error("--workers must be at least 1")
+    if getattr(parsed, "enrich_workers", 1) < 1:
+        parser.error("--enrich-workers must be at least 1")
+    if getattr(parsed, "rate_limit", None) is not None and parsed.rate_limit < 0:
+        parser.error("--rate-limit must not be negative")
+    if getattr(parsed, "bf_threshold", 1) < 1:
+        parser.error("--bf-threshold must be at least 1")
+    if getattr(parsed, "bf_window", None) is not None and parsed.bf_window <= 0:
+        parser.error("--bf-window must be greater than 0")
+    if getattr(parsed, "evidence_cap", None) is not None:
+        if parsed.evidence_cap < 0:
+            parser.error("--evidence-cap must not be negative")
+        parsed.evidence = True
+    if getattr(parsed, "profile_dump", None):
+        parsed.profile = True
+    if parsed.command in ("analyze", "ingest"):
+        from .log_parser import expand_inputs
+
+        try:
+            parsed.input = expand_inputs(parsed.input)
+        except FileNotFoundError as e:
+            parser.error(str(e))
+    if parsed.command == "query":
+        if parsed.limit < 0:
+            parser.error("--limit must not be negative")
+        if parsed.since and parsed.until and parsed.since >= parsed.until:
+            parser.error("--since must be earlier than --until")
+    if parsed.command == "analyze":
+        if parsed.checkpoint and parsed.workers > 1:
+            parser.error("--checkpoint cannot be combined with --workers")
+        if parsed.checkpoint and len(parsed.input) > 1:
+            parser.error("--checkpoint takes a single input file")
+        if parsed.profile and (parsed.pipeline or parsed.checkpoint):
+            parser.error("--profile cannot be combined with --pipeline or --checkpoint")
+        if parsed.pipeline and parsed.checkpoint:
+            parser.error("--pipeline cannot be combined with --checkpoint")
+        if parsed.mixed and (parsed.engine != "text" or parsed.workers > 1):
+            parser.error("--mixed requires the text engine and a single worker")
+        if parsed.mixed and (parsed.checkpoint or len(parsed.input) > 1):
+            parser.error("--mixed takes a single input file and no --checkpoint")
+    if getattr(parsed, "interval", 1.0) < 0.1:
+        parser.error("--interval must be at least 0.1")
+    if getattr(parsed, "geo_mode", "online") != "online" and not parsed.geodb:
+        parser.error(f"--geo-mode {parsed.geo_mode} requires --geodb")
+
     return parsed
@@ -5,17 +5,24 @@ Rules intentionally stay simple and explainable for beginners, while still
 mapping to real SOC workflows.
 
 Rules implemented (course spec):
-- brute_force: repeated authentication failures from same IP
+- brute_force: repeated authentication failures from same IP (optionally
+  within a sliding time window)
 - sql_injection: SQLi indicators in HTTP requests
 - directory_traversal: ../ style traversal in request paths
 - admin_probe: repeated hits on common admin endpoints
+
+Every rule keeps bounded per-IP state (a hit counter plus the first
+``EVIDENCE_LIMIT`` entries), so rules can be fed one entry at a time from a
+generator and memory grows with distinct IPs, not with line count.
 """
 
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import Dict, List
+from bisect import insort
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
+from .matcher import MultiPatternMatcher
 from .models import Finding, LogEntry, LogType, Severity
 
 
@@ -32,27 +39,240 @@ def _is_auth_failure(entry: LogEntry) -> bool:
     return False
 
 
-def detect_brute_force(entries: List[LogEntry], threshold: int = 5) -> List[Finding]:
+EVIDENCE_LIMIT = 10  # entries kept per finding
+
+
+class RuleState:
+    """Incremental per-IP state for one detection rule.
+
+    Only a hit counter and the first ``EVIDENCE_LIMIT`` matching entries are
+    retained for each IP. :meth:`add` reports the moment an IP first reaches
+    the rule's threshold, which lets callers alert while data is still
+    streaming in.
+    """
+
+    def __init__(
+        self,
+        rule_name: str,
+        severity: Severity,
+        describe: Callable[[str, int], str],
+        threshold: int = 1,
+    ) -> None:
+        self.rule_name = rule_name
+        self.severity = severity
+        self.describe = describe
+        self.threshold = threshold
+        self.counts: Dict[str, int] = {}
+        self.evidence: Dict[str, List[LogEntry]] = {}
+
+    def add(self, entry: LogEntry) -> bool:
+        """Record a hit for *entry*; return True if its IP just crossed the threshold."""
+        ip = entry.source_ip
+        count = self.counts.get(ip, 0) + 1
+        self.counts[ip] = count
+        if count == 1:
+            self.evidence[ip] = [entry]
+        elif count <= EVIDENCE_LIMIT:
+            self.evidence[ip].append(entry)
+        return count == self.threshold
+
+    def finding_for(self, ip: str) -> Finding:
+        count = self.counts[ip]
+        return Finding(
+            rule_name=self.rule_name,
+            severity=self.severity,
+            source_ip=ip,
+            description=self.describe(ip, count),
+            evidence=list(self.evidence[ip]),
+        )
+
+    def findings(self) -> List[Finding]:
+        """Findings for every IP at or above the threshold, in first-seen order."""
+        return [self.finding_for(ip) for ip, count in self.counts.items() if count >= self.threshold]
+
+    def state_dict(self) -> Dict[str, Any]:
+        """JSON-serializable counters and evidence (see :meth:`load_state`)."""
+        return {
+            "counts": dict(self.counts),
+            "evidence": {ip: [e.to_dict() for e in entries] for ip, entries in self.evidence.items()},
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        self.counts = {ip: int(n) for ip, n in state["counts"].items()}
+        self.evidence = {
+            ip: [LogEntry.from_dict(e) for e in entries] for ip, entries in state["evidence"].items()
+        }
+
+
+def _brute_force_state(threshold: int) -> RuleState:
+    return RuleState(
+        "brute_force",
+        Severity.HIGH,
+        lambda ip, n: f"Possible brute force: {n} failed attempts from {ip}",
+        threshold,
+    )
+
+
+def _sql_injection_state() -> RuleState:
+    return RuleState(
+        "sql_injection",
+        Severity.CRITICAL,
+        lambda ip, n: f"SQL injection attempt detected from {ip} ({n} suspicious requests)",
+    )
+
+
+def _directory_traversal_state() -> RuleState:
+    return RuleState(
+        "directory_traversal",
+        Severity.HIGH,
+        lambda ip, n: f"Directory traversal attempt from {ip}",
+    )
+
+
+def _admin_probe_state(threshold: int) -> RuleState:
+    return RuleState(
+        "admin_probe",
+        Severity.MEDIUM,
+        lambda ip, n: f"Admin page probing from {ip} ({n} requests)",
+        threshold,
+    )
+
+
+def detect_brute_force(entries: Iterable[LogEntry], threshold: int = 5) -> List[Finding]:
     """Detect multiple failed logins from the same IP."""
-    failures_by_ip: Dict[str, List[LogEntry]] = defaultdict(list)
+    state = _brute_force_state(threshold)
+    for e in entries:
+        if _is_auth_failure(e):
+            state.add(e)
+    return state.findings()
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class SlidingWindowState:
+    """Brute force over a sliding time window with bounded per-IP state.
+
+    An IP fires once it has ``threshold`` failures within ``window_seconds``
+    (measured with :attr:`~src.models.LogEntry.timestamp`). For every active IP
+    only the latest ``threshold`` failure times are kept, in time order, so
+    entries that arrive out of order (merged or relayed syslog) are placed
+    where they belong rather than at the end.
+    IPs with no failure for longer than the window can never complete a burst,
+    so their window state is dropped in periodic sweeps. Evidence is only
+    collected once an IP has fired, and a fired IP's counter and evidence are
+    kept so :meth:`findings` can report it at the end. With *forget_fired*
+    (for endless streams whose alerts are delivered as they fire, such as
+    ``watch``), idle fired IPs are dropped entirely too, so memory stays flat
+    however many IPs attack over time; an IP that attacks again after going
+    quiet fires again. Entries without a timestamp are ignored.
+
+    The interface mirrors :class:`RuleState` so the engine can use either.
+    """
+
+    def __init__(self, threshold: int = 5, window_seconds: float = 60.0, forget_fired: bool = False) -> None:
+        self.rule_name = "brute_force"
+        self.severity = Severity.HIGH
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.forget_fired = forget_fired
+        self.rings: Dict[str, List[float]] = {}  # sorted, at most ``threshold`` long
+        self.counts: Dict[str, int] = {}
+        self.evidence: Dict[str, List[LogEntry]] = {}  # fired IPs only
+        self._now = float("-inf")
+        self._next_sweep = float("-inf")
+
+    def add(self, entry: LogEntry) -> bool:
+        """Record a failure for *entry*; return True if its IP just fired."""
+        if entry.timestamp is None:
+            return False
+        ts = (entry.timestamp - _EPOCH).total_seconds()
+        if ts > self._now:
+            self._now = ts
+        if self._now >= self._next_sweep:
+            self.expire_idle()
+
+        ip = entry.source_ip
+        ring = self.rings.get(ip)
+        if ring is None:
+            ring = self.rings[ip] = []
+        insort(ring, ts)
+        self.counts[ip] = self.counts.get(ip, 0) + 1
+
+        fired = False
+        if ip in self.evidence:
+            if len(self.evidence[ip]) < EVIDENCE_LIMIT:
+                self.evidence[ip].append(entry)
+        else:
+            n = self.threshold
+            fired = any(ring[i + n - 1] - ring[i] <= self.window_seconds for i in range(len(ring) - n + 1))
+            if fired:
+                self.evidence[ip] = [entry]
+        if len(ring) > self.threshold:
+            del ring[0]
+        return fired
 
+    def expire_idle(self) -> int:
+        """Drop state for IPs idle longer than the window; return how many.
+
+        Fired IPs keep their counter and evidence unless *forget_fired* is set.
+        """
+        cutoff = self._now - self.window_seconds
+        idle = [ip for ip, ring in self.rings.items() if ring[-1] < cutoff]
+        for ip in idle:
+            del self.rings[ip]
+            if ip not in self.evidence:
+                del self.counts[ip]
+            elif self.forget_fired:
+                del self.counts[ip]
+                del self.evidence[ip]
+        self._next_sweep = self._now + self.window_seconds
+        return len(idle)
+
+    def finding_for(self, ip: str) -> Finding:
+        return Finding(
+            rule_name=self.rule_name,
+            severity=self.severity,
+            source_ip=ip,
+            description=(
+                f"Possible brute force: {self.threshold}+ failed attempts within "
+                f"{self.window_seconds:g}s from {ip} ({self.counts[ip]} failures seen)"
+            ),
+            evidence=list(self.evidence[ip]),
+        )
+
+    def findings(self) -> List[Finding]:
+        return [self.finding_for(ip) for ip in self.evidence]
+
+    def state_dict(self) -> Dict[str, Any]:
+        """JSON-serializable window state (see :meth:`load_state`)."""
+        return {
+            "rings": {ip: list(ring) for ip, ring in self.rings.items()},
+            "counts": dict(self.counts),
+            "evidence": {ip: [e.to_dict() for e in entries] for ip, entries in self.evidence.items()},
+            "now": self._now if self._now != float("-inf") else None,
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        self.rings = {ip: sorted(ring)[-self.threshold:] for ip, ring in state["rings"].items()}
+        self.counts = {ip: int(n) for ip, n in state["counts"].items()}
+        self.evidence = {
+            ip: [LogEntry.from_dict(e) for e in entries] for ip, entries in state["evidence"].items()
+        }
+        now = state.get("now")
+        self._now = float("-inf") if now is None else float(now)
+        self._next_sweep = float("-inf")
+
+
+def detect_brute_force_window(
+    entries: Iterable[LogEntry], threshold: int = 5, window_seconds: float = 60.0
+) -> List[Finding]:
+    """Detect *threshold* failed logins from one IP within *window_seconds*."""
+    state = SlidingWindowState(threshold, window_seconds)
     for e in entries:
         if _is_auth_failure(e):
-            failures_by_ip[e.source_ip].append(e)
-
-    findings: List[Finding] = []
-    for ip, failed_entries in failures_by_ip.items():
-        if len(failed_entries) >= threshold:
-            findings.append(
-                Finding(
-                    rule_name="brute_force",
-                    severity=Severity.HIGH,
-                    source_ip=ip,
-                    description=f"Possible brute force: {len(failed_entries)} failed attempts from {ip}",
-                    evidence=failed_entries[:10],
-                )
-            )
-    return findings
+            state.add(e)
+    return state.findings()
 
 
 SQL_PATTERNS = [
@@ -74,113 +294,250 @@ SQL_PATTERNS = [
     "BENCHMARK(",
 ]
 
+TRAVERSAL_PATTERNS = ["../", "..\\", "%2e%2e/", "%2e%2e%2f"]
 
-def detect_sql_injection(entries: List[LogEntry]) -> List[Finding]:
-    """Detect SQL injection patterns in Apache request lines."""
-    suspicious_by_ip: Dict[str, List[LogEntry]] = defaultdict(list)
+ADMIN_PATHS = [
+    "/admin",
+    "/wp-admin",
+    "/administrator",
+    "/phpmyadmin",
+    "/manager",
+    "/console",
+    "/.env",
+    "/config",
+]
+
+
+TRAVERSAL_TAG = "directory_traversal"
+ADMIN_TAG = "admin_probe"
+
+# Compiled matchers (case-insensitive). Rebuilt by load_signatures().
+SQL_MATCHER = MultiPatternMatcher(SQL_PATTERNS, ignore_case=True)
+TRAVERSAL_MATCHER = MultiPatternMatcher(TRAVERSAL_PATTERNS, ignore_case=True)
+ADMIN_MATCHER = MultiPatternMatcher(ADMIN_PATHS, ignore_case=True)
+# One automaton over the request action feeding both path-based rules.
+ACTION_MATCHER = MultiPatternMatcher(
+    TRAVERSAL_PATTERNS + ADMIN_PATHS,
+    ignore_case=True,
+    tags=[TRAVERSAL_TAG] * len(TRAVERSAL_PATTERNS) + [ADMIN_TAG] * len(ADMIN_PATHS),
+)
+
+
+def load_signatures(
+    sql_patterns: Optional[List[str]] = None,
+    traversal_patterns: Optional[List[str]] = None,
+    admin_paths: Optional[List[str]] = None,
+) -> None:
+    """Replace one or more signature lists and recompile the matchers.
+
+    Lists that are not given keep their current contents.
+    """
+    global SQL_PATTERNS, TRAVERSAL_PATTERNS, ADMIN_PATHS
+    global SQL_MATCHER, TRAVERSAL_MATCHER, ADMIN_MATCHER, ACTION_MATCHER
+
+    if sql_patterns is not None:
+        SQL_PATTERNS = list(sql_patterns)
+    if traversal_patterns is not None:
+        TRAVERSAL_PATTERNS = list(traversal_patterns)
+    if admin_paths is not None:
+        ADMIN_PATHS = list(admin_paths)
+
+    SQL_MATCHER = MultiPatternMatcher(SQL_PATTERNS, ignore_case=True)
+    TRAVERSAL_MATCHER = MultiPatternMatcher(TRAVERSAL_PATTERNS, ignore_case=True)
+    ADMIN_MATCHER = MultiPatternMatcher(ADMIN_PATHS, ignore_case=True)
+    ACTION_MATCHER = MultiPatternMatcher(
+        TRAVERSAL_PATTERNS + ADMIN_PATHS,
+        ignore_case=True,
+        tags=[TRAVERSAL_TAG] * len(TRAVERSAL_PATTERNS) + [ADMIN_TAG] * len(ADMIN_PATHS),
+    )
+
+
+def load_signature_file(filepath: str) -> List[str]:
+    """Read signatures from a text file (one per line, ``#`` starts a comment)."""
+    signatures: List[str] = []
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.strip() and not line.lstrip().startswith("#"):
+                signatures.append(line)
+    return signatures
 
+
+def _is_sql_injection(e: LogEntry) -> bool:
+    return SQL_MATCHER.search((e.action or "") + " " + e.raw_line)
+
+
+def detect_sql_injection(entries: Iterable[LogEntry]) -> List[Finding]:
+    """Detect SQL injection patterns in Apache request lines."""
+    state = _sql_injection_state()
     for e in entries:
         if e.log_type != LogType.APACHE:
             continue
-        haystack = (e.action or "") + " " + e.raw_line
-        for pat in SQL_PATTERNS:
-            if pat in haystack:
-                suspicious_by_ip[e.source_ip].append(e)
-                break
-
-    findings: List[Finding] = []
-    for ip, sql_entries in suspicious_by_ip.items():
-        findings.append(
-            Finding(
-                rule_name="sql_injection",
-                severity=Severity.CRITICAL,
-                source_ip=ip,
-                description=f"SQL injection attempt detected from {ip} ({len(sql_entries)} suspicious requests)",
-                evidence=sql_entries[:10],
-            )
-        )
-    return findings
+        if _is_sql_injection(e):
+            state.add(e)
+    return state.findings()
 
 
-def detect_directory_traversal(entries: List[LogEntry]) -> List[Finding]:
+def detect_directory_traversal(entries: Iterable[LogEntry]) -> List[Finding]:
     """Detect directory traversal indicators in request paths."""
-    traversal_patterns = ["../", "..\\", "%2e%2e/", "%2e%2e%2f"]
-    suspicious_by_ip: Dict[str, List[LogEntry]] = defaultdict(list)
-
+    state = _directory_traversal_state()
     for e in entries:
         if not e.action:
             continue
-        action_lower = e.action.lower()
-        for pat in traversal_patterns:
-            if pat in action_lower:
-                suspicious_by_ip[e.source_ip].append(e)
-                break
-
-    findings: List[Finding] = []
-    for ip, trav_entries in suspicious_by_ip.items():
-        findings.append(
-            Finding(
-                rule_name="directory_traversal",
-                severity=Severity.HIGH,
-                source_ip=ip,
-                description=f"Directory traversal attempt from {ip}",
-                evidence=trav_entries[:10],
-            )
-        )
-    return findings
+        if TRAVERSAL_MATCHER.search(e.action):
+            state.add(e)
+    return state.findings()
 
 
-def detect_admin_probe(entries: List[LogEntry], threshold: int = 3) -> List[Finding]:
+def detect_admin_probe(entries: Iterable[LogEntry], threshold: int = 3) -> List[Finding]:
     """Detect repeated access to common admin endpoints."""
-    admin_paths = [
-        "/admin",
-        "/wp-admin",
-        "/administrator",
-        "/phpmyadmin",
-        "/manager",
-        "/console",
-        "/.env",
-        "/config",
-    ]
-    admin_by_ip: Dict[str, List[LogEntry]] = defaultdict(list)
-
+    state = _admin_probe_state(threshold)
     for e in entries:
         if not e.action:
             continue
-        action_lower = e.action.lower()
-        for p in admin_paths:
-            if p in action_lower:
-                admin_by_ip[e.source_ip].append(e)
-                break
-
-    findings: List[Finding] = []
-    for ip, admin_entries in admin_by_ip.items():
-        if len(admin_entries) >= threshold:
-            findings.append(
-                Finding(
-                    rule_name="admin_probe",
-                    severity=Severity.MEDIUM,
-                    source_ip=ip,
-                    description=f"Admin page probing from {ip} ({len(admin_entries)} requests)",
-                    evidence=admin_entries[:10],
-                )
-            )
-    return findings
+        if ADMIN_MATCHER.search(e.action):
+            state.add(e)
+    return state.findings()
+
+
+SEVERITY_ORDER = {
+    Severity.CRITICAL: 0,
+    Severity.HIGH: 1,
+    Severity.MEDIUM: 2,
+    Severity.LOW: 3,
+}
 
 
-def run_all_detections(entries: List[LogEntry]) -> List[Finding]:
-    """Run all detection rules and return findings sorted by severity."""
-    findings: List[Finding] = []
-    findings.extend(detect_brute_force(entries))
-    findings.extend(detect_sql_injection(entries))
-    findings.extend(detect_directory_traversal(entries))
-    findings.extend(detect_admin_probe(entries))
-
-    severity_order = {
-        Severity.CRITICAL: 0,
-        Severity.HIGH: 1,
-        Severity.MEDIUM: 2,
-        Severity.LOW: 3,
-    }
-    findings.sort(key=lambda f: severity_order.get(f.severity, 99))
+def sort_findings(findings: List[Finding]) -> List[Finding]:
+    """Sort findings in place by severity (most severe first) and return them."""
+    findings.sort(key=lambda f: SEVERITY_ORDER.get(f.severity, 99))
     return findings
+
+
+class DetectionEngine:
+    """Fused, incremental engine that runs every rule from a single visit.
+
+    Feed entries one at a time (e.g. straight from the ``parse_file``
+    generator) with :meth:`feed`, then call :meth:`findings`. Each entry is
+    classified once: the auth-failure check, the SQLi check and one scan of
+    the action by a combined signature matcher feed all four rules.
+
+    With *brute_force_window* set (seconds), brute force uses
+    :class:`SlidingWindowState` instead of whole-input counting;
+    *forget_fired* is passed on to it. That is a memory policy, not a
+    detection setting, so it is not part of :attr:`config` or the saved state.
+    """
+
+    def __init__(
+        self,
+        brute_force_threshold: int = 5,
+        admin_probe_threshold: int = 3,
+        brute_force_window: Optional[float] = None,
+        forget_fired: bool = False,
+    ) -> None:
+        self.entries_seen = 0
+        self.config: Dict[str, Any] = {
+            "brute_force_threshold": brute_force_threshold,
+            "admin_probe_threshold": admin_probe_threshold,
+            "brute_force_window": brute_force_window,
+        }
+        self.brute_force: Union[RuleState, SlidingWindowState]
+        if brute_force_window is None:
+            self.brute_force = _brute_force_state(brute_force_threshold)
+        else:
+            self.brute_force = SlidingWindowState(brute_force_threshold, brute_force_window, forget_fired)
+        self.sql_injection = _sql_injection_state()
+        self.directory_traversal = _directory_traversal_state()
+        self.admin_probe = _admin_probe_state(admin_probe_threshold)
+        self._checks = [check for _, check in self.steps()]
+
+    @property
+    def rules(self) -> List[Union[RuleState, SlidingWindowState]]:
+        return [self.brute_force, self.sql_injection, self.directory_traversal, self.admin_probe]
+
+    def _check_brute_force(self, e: LogEntry, fired: List[Finding]) -> None:
+        if _is_auth_failure(e) and self.brute_force.add(e):
+            fired.append(self.brute_force.finding_for(e.source_ip))
+
+    def _check_sql_injection(self, e: LogEntry, fired: List[Finding]) -> None:
+        if e.log_type == LogType.APACHE and _is_sql_injection(e) and self.sql_injection.add(e):
+            fired.append(self.sql_injection.finding_for(e.source_ip))
+
+    def _check_paths(self, e: LogEntry, fired: List[Finding]) -> None:
+        # Directory traversal and admin probing share one scan of the action.
+        if e.action:
+            tags = ACTION_MATCHER.tags_in(e.action)
+            if TRAVERSAL_TAG in tags and self.directory_traversal.add(e):
+                fired.append(self.directory_traversal.finding_for(e.source_ip))
+            if ADMIN_TAG in tags and self.admin_probe.add(e):
+                fired.append(self.admin_probe.finding_for(e.source_ip))
+
+    def steps(self) -> List[Tuple[str, Callable[[LogEntry, List[Finding]], None]]]:
+        """The per-entry checks :meth:`feed` runs, in order, as ``(name, check)``."""
+        return [
+            ("brute_force", self._check_brute_force),
+            ("sql_injection", self._check_sql_injection),
+            ("directory_traversal+admin_probe", self._check_paths),
+        ]
+
+    def feed(self, e: LogEntry) -> List[Finding]:
+        """Process one entry; return findings that fired for the first time on it."""
+        self.entries_seen += 1
+        fired: List[Finding] = []
+        for check in self._checks:
+            check(e, fired)
+        return fired
+
+    def feed_all(
+        self, entries: Iterable[LogEntry], on_finding: Optional[Callable[[Finding], Any]] = None
+    ) -> "DetectionEngine":
+        """Feed every entry; *on_finding* is called with each finding as it fires."""
+        feed = self.feed
+        if on_finding is None:
+            for e in entries:
+                feed(e)
+            return self
+        for e in entries:
+            for finding in feed(e):
+                on_finding(finding)
+        return self
+
+    def findings(self) -> List[Finding]:
+        """Current findings for all rules, sorted by severity."""
+        findings: List[Finding] = []
+        for rule in self.rules:
+            findings.extend(rule.findings())
+        return sort_findings(findings)
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Everything needed to continue detection later, as JSON-serializable data."""
+        return {
+            "config": dict(self.config),
+            "entries_seen": self.entries_seen,
+            "rules": {rule.rule_name: rule.state_dict() for rule in self.rules},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "DetectionEngine":
+        """Rebuild an engine saved with :meth:`state_dict`."""
+        engine = cls(**state["config"])
+        engine.entries_seen = int(state["entries_seen"])
+        for rule in engine.rules:
+            rule.load_state(state["rules"][rule.rule_name])
+        return engine
+
+
+def run_all_detections(
+    entries: Iterable[LogEntry],
+    brute_force_threshold: int = 5,
+    admin_probe_threshold: int = 3,
+    brute_force_window: Optional[float] = None,
+) -> List[Finding]:
+    """Run all detection rules and return findings sorted by severity.
+
+    Uses :class:`DetectionEngine`, so *entries* may be any iterable (including
+    a generator) and is visited exactly once. The findings are identical to
+    calling each ``detect_*`` function in turn.
+    """
+    engine = DetectionEngine(brute_force_threshold, admin_probe_threshold, brute_force_window)
+    return engine.feed_all(entries).findings()
@@ -4,90 +4,493 @@ Enrichment adds context to findings by querying an external API.
 Course implementation uses ip-api.com (free, no API key required).
 
 We also:
-- skip private/reserved IPs (no meaningful geolocation)
+- skip private/reserved IPs (no meaningful geolocation) before touching the
+  cache; addresses are classified against the IANA special-purpose ranges
+  (IPv4 and IPv6) with a binary search over precomputed integer ranges
 - cache results locally to reduce network calls and avoid rate limits
+- remember failed lookups (API "fail" answers and timeouts) for a shorter
+  ``NEGATIVE_TTL`` so unreachable IPs are not retried on every run
+- optionally answer from an offline range database (:mod:`src.geodb`),
+  either exclusively (``offline``) or for what the API could not answer
+  (``fallback``)
+- look up many IPs concurrently with a bounded thread pool, while a shared
+  token bucket keeps network requests under the provider's quota
+- optionally group cache misses into batch requests (up to 100 IPs each)
 """
 
 from __future__ import annotations
 
+import ipaddress
 import json
+import threading
+import time
 import urllib.error
 import urllib.request
-from typing import Dict, List, Optional
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 
-from .cache import cache_get, cache_set
-from .models import Finding
+from .cache import cache_get, cache_get_many, cache_set, cache_set_many
+from .geodb import GeoDB, open_geodb
+from .models import Finding, ipv4_to_int
 
 
 API_URL = "http://ip-api.com/json/{ip}?fields=status,country,regionName,city,isp,org"
+BATCH_URL = "http://ip-api.com/batch?fields=status,message,country,regionName,city,isp,org,query"
+BATCH_SIZE = 100  # max IPs per batch request
 TIMEOUT = 5  # seconds
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RATE_LIMIT = 45  # requests per minute (ip-api.com free tier)
+DEFAULT_BATCH_RATE_LIMIT = 15  # batch requests per minute
+NEGATIVE_TTL = 3600  # seconds a failed lookup is remembered (positive TTL is 24h)
+GEO_MODES = ("online", "offline", "fallback")
 
 
-def is_private_ip(ip: str) -> bool:
-    """Return True if *ip* is in a common private/loopback range."""
-    parts = ip.split(".")
-    if len(parts) != 4:
-        return False
+class TokenBucket:
+    """Thread-safe token bucket rate limiter.
+
+    Tokens refill continuously at *rate* per second up to *capacity*; each
+    network request takes one token.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float) -> "TokenBucket":
+        """Bucket for a per-minute quota, evenly paced.
+
+        The burst is a single token, so no 60-second window (including the
+        first one) sees more than *requests_per_minute* requests. A full
+        minute's burst on top of the refill would allow nearly twice the
+        quota in the first minute.
+        """
+        return cls(requests_per_minute / 60.0, capacity=1)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take one token, waiting if needed. Return False if *timeout* expires first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait_for = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_for = min(wait_for, remaining)
+            time.sleep(wait_for)
+
+
+# Special-purpose address blocks (IANA registries). Blocks must not overlap.
+SPECIAL_RANGES_V4: Sequence[Tuple[str, str]] = (
+    ("0.0.0.0/8", "reserved"),  # "this network"
+    ("10.0.0.0/8", "private"),
+    ("100.64.0.0/10", "cgnat"),  # shared address space (RFC 6598)
+    ("127.0.0.0/8", "loopback"),
+    ("169.254.0.0/16", "link-local"),
+    ("172.16.0.0/12", "private"),
+    ("192.0.0.0/24", "reserved"),  # IETF protocol assignments
+    ("192.0.2.0/24", "documentation"),
+    ("192.88.99.0/24", "reserved"),  # deprecated 6to4 relay anycast
+    ("192.168.0.0/16", "private"),
+    ("198.18.0.0/15", "benchmarking"),
+    ("198.51.100.0/24", "documentation"),
+    ("203.0.113.0/24", "documentation"),
+    ("224.0.0.0/4", "multicast"),
+    ("240.0.0.0/4", "reserved"),  # includes 255.255.255.255
+)
+SPECIAL_RANGES_V6: Sequence[Tuple[str, str]] = (
+    ("::/128", "reserved"),  # unspecified
+    ("::1/128", "loopback"),
+    ("100::/64", "reserved"),  # discard-only
+    ("2001::/23", "reserved"),  # IETF protocol assignments
+    ("2001:db8::/32", "documentation"),
+    ("fc00::/7", "private"),  # unique local
+    ("fe80::/10", "link-local"),
+    ("ff00::/8", "multicast"),
+)
+PRIVATE_CLASSES = frozenset({"private", "loopback"})
+
+
+def _build_ranges(table: Sequence[Tuple[str, str]]) -> Tuple[List[int], List[int], List[str]]:
+    """Turn CIDR rows into sorted parallel ``(starts, ends, labels)`` lists."""
+    rows = sorted(
+        (int(net.network_address), int(net.broadcast_address), label)
+        for net, label in ((ipaddress.ip_network(cidr), label) for cidr, label in table)
+    )
+    for (_, prev_end, _), (start, _, _) in zip(rows, rows[1:]):
+        if start <= prev_end:
+            raise ValueError("special-purpose ranges must not overlap")
+    return [r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows]
+
+
+_RANGES_V4 = _build_ranges(SPECIAL_RANGES_V4)
+_RANGES_V6 = _build_ranges(SPECIAL_RANGES_V6)
+
+
+def _lookup_range(n: int, ranges: Tuple[List[int], List[int], List[str]]) -> Optional[str]:
+    starts, ends, labels = ranges
+    i = bisect_right(starts, n) - 1
+    if i >= 0 and n <= ends[i]:
+        return labels[i]
+    return None
+
+
+@lru_cache(maxsize=4096)
+def classify_ip(ip: str) -> Optional[str]:
+    """Return the special-purpose class of *ip*, or None for a global address.
+
+    Classes: ``private``, ``loopback``, ``cgnat``, ``link-local``,
+    ``multicast``, ``documentation``, ``benchmarking``, ``reserved``, and
+    ``invalid`` for strings that are not an IP address at all.
+    """
+    n = ipv4_to_int(ip)
+    if n is not None:
+        return _lookup_range(n, _RANGES_V4)
+    if ":" not in ip:
+        return "invalid"
     try:
-        first = int(parts[0])
-        second = int(parts[1])
+        addr = ipaddress.IPv6Address(ip.split("%", 1)[0])
     except ValueError:
-        return False
+        return "invalid"
+    if addr.ipv4_mapped is not None:
+        return _lookup_range(int(addr.ipv4_mapped), _RANGES_V4)
+    return _lookup_range(int(addr), _RANGES_V6)
 
-    if first == 10:
-        return True
-    if first == 172 and 16 <= second <= 31:
-        return True
-    if first == 192 and second == 168:
-        return True
-    if first == 127:
+
+def is_private_ip(ip: str) -> bool:
+    """Return True if *ip* is in a common private/loopback range."""
+    return classify_ip(ip) in PRIVATE_CLASSES
+
+
+def _special_result(ip_class: str) -> Optional[Dict]:
+    """Geo info for a non-global address (None if it is not an address)."""
+    if ip_class in PRIVATE_CLASSES:
+        return {"status": "private", "country": "Private Network"}
+    if ip_class == "invalid":
+        return None
+    return {"status": "reserved", "country": "Reserved Network", "range": ip_class}
+
+
+def _is_timeout(exc: BaseException) -> bool:
+    if isinstance(exc, TimeoutError):
         return True
-    return False
+    return isinstance(exc, urllib.error.URLError) and isinstance(exc.reason, TimeoutError)
+
+
+def _failure_entry(reason: str) -> Dict:
+    return {"status": "fail", "reason": reason}
 
 
-def get_ip_info(ip: str, use_cache: bool = True) -> Optional[Dict]:
-    """Lookup geolocation/org details for an IP address."""
+def _geo_result(data: Dict) -> Dict:
+    """Map an ip-api.com success payload to our geo_info shape."""
+    return {
+        "country": data.get("country", "Unknown"),
+        "region": data.get("regionName", "Unknown"),
+        "city": data.get("city", "Unknown"),
+        "isp": data.get("isp", "Unknown"),
+        "org": data.get("org", "Unknown"),
+    }
+
+
+def get_ip_info(
+    ip: str,
+    use_cache: bool = True,
+    limiter: Optional[TokenBucket] = None,
+    limiter_timeout: Optional[float] = None,
+) -> Optional[Dict]:
+    """Lookup geolocation/org details for an IP address.
+
+    Private/reserved addresses are answered without any cache I/O. If
+    *limiter* is given, a token is taken before any network request (cache
+    hits and special addresses are free). Returns None if no token was
+    available within *limiter_timeout*, or if the lookup failed now or
+    within the last ``NEGATIVE_TTL`` seconds.
+    """
+    ip_class = classify_ip(ip)
+    if ip_class is not None:
+        return _special_result(ip_class)
+
     if use_cache:
         cached = cache_get(f"geo:{ip}")
         if cached:
             return cached
+        if cache_get(f"geo-miss:{ip}", ttl=NEGATIVE_TTL) is not None:
+            return None
 
-    if is_private_ip(ip):
-        return {"status": "private", "country": "Private Network"}
+    if limiter is not None and not limiter.acquire(timeout=limiter_timeout):
+        return None
 
     try:
         url = API_URL.format(ip=ip)
         with urllib.request.urlopen(url, timeout=TIMEOUT) as resp:
             data = json.loads(resp.read().decode("utf-8", errors="ignore"))
-
-        if data.get("status") == "success":
-            result = {
-                "country": data.get("country", "Unknown"),
-                "region": data.get("regionName", "Unknown"),
-                "city": data.get("city", "Unknown"),
-                "isp": data.get("isp", "Unknown"),
-                "org": data.get("org", "Unknown"),
-            }
-            if use_cache:
-                cache_set(f"geo:{ip}", result)
-            return result
-    except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError, TimeoutError):
+    except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError, TimeoutError, OSError) as exc:
+        if use_cache and _is_timeout(exc):
+            cache_set(f"geo-miss:{ip}", _failure_entry("timeout"))
         return None
 
+    if data.get("status") == "success":
+        result = _geo_result(data)
+        if use_cache:
+            cache_set(f"geo:{ip}", result)
+        return result
+    if use_cache:
+        cache_set(f"geo-miss:{ip}", _failure_entry(str(data.get("message") or "fail")))
     return None
 
 
-def enrich_findings(findings: List[Finding]) -> List[Finding]:
-    """Populate :attr:`~src.models.Finding.geo_info` for each finding."""
-    unique_ips = {f.source_ip for f in findings}
-    ip_info: Dict[str, Dict] = {}
+def _chunks(items: List[str], size: int) -> List[List[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def fetch_batch(
+    ips: List[str],
+    use_cache: bool = True,
+    limiter: Optional[TokenBucket] = None,
+    limiter_timeout: Optional[float] = None,
+) -> Dict[str, Optional[Dict]]:
+    """Look up up to ``BATCH_SIZE`` IPs with one POST to the batch endpoint.
+
+    Every IP gets an entry in the result: its geo info, or None if that IP (or
+    the whole request) failed. Successful results are cached individually;
+    per-IP failures and timeouts go to the negative cache.
+    """
+    failed: Dict[str, Optional[Dict]] = {ip: None for ip in ips}
+    if limiter is not None and not limiter.acquire(timeout=limiter_timeout):
+        return failed
+
+    try:
+        req = urllib.request.Request(
+            BATCH_URL,
+            data=json.dumps(ips).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
+            data = json.loads(resp.read().decode("utf-8", errors="ignore"))
+    except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError, TimeoutError, OSError) as exc:
+        if use_cache and _is_timeout(exc):
+            cache_set_many({f"geo-miss:{ip}": _failure_entry("timeout") for ip in ips})
+        return failed
+
+    results = dict(failed)
+    if not isinstance(data, list):
+        return results
+    to_cache: Dict[str, Dict] = {}
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        ip = item.get("query")
+        if ip not in results:
+            continue
+        if item.get("status") == "success":
+            results[ip] = to_cache[f"geo:{ip}"] = _geo_result(item)
+        else:
+            to_cache[f"geo-miss:{ip}"] = _failure_entry(str(item.get("message") or "fail"))
+    if use_cache and to_cache:
+        cache_set_many(to_cache)
+    return results
+
+
+def get_ip_info_batch(
+    ips: List[str],
+    use_cache: bool = True,
+    limiter: Optional[TokenBucket] = None,
+    limiter_timeout: Optional[float] = None,
+) -> Dict[str, Optional[Dict]]:
+    """Lookup many IPs, grouping cache misses into batch requests.
+
+    Cached, recently failed and private/reserved IPs are answered locally; the
+    rest go out in batches of ``BATCH_SIZE``. Returns ``{ip: info or None}``
+    for every input IP.
+    """
+    results, misses = _resolve_locally(ips, use_cache)
+    for chunk in _chunks(misses, BATCH_SIZE):
+        results.update(fetch_batch(chunk, use_cache, limiter, limiter_timeout))
+    return results
 
-    for ip in unique_ips:
-        info = get_ip_info(ip)
-        if info:
-            ip_info[ip] = info
+
+def _resolve_locally(ips: List[str], use_cache: bool = True) -> Tuple[Dict[str, Optional[Dict]], List[str]]:
+    """Answer what we can without the network; return (results, remaining IPs)."""
+    results: Dict[str, Optional[Dict]] = {}
+    misses: List[str] = []
+    public: List[str] = []
+    for ip in dict.fromkeys(ips):
+        ip_class = classify_ip(ip)
+        if ip_class is None:
+            public.append(ip)
+        else:
+            results[ip] = _special_result(ip_class)
+    if not use_cache or not public:
+        return results, public
+
+    cached_all = cache_get_many(f"geo:{ip}" for ip in public)
+    remaining = [ip for ip in public if not cached_all.get(f"geo:{ip}")]
+    failed_recently = cache_get_many((f"geo-miss:{ip}" for ip in remaining), ttl=NEGATIVE_TTL) if remaining else {}
+    for ip in public:
+        cached = cached_all.get(f"geo:{ip}")
+        if cached:
+            results[ip] = cached
+        elif f"geo-miss:{ip}" in failed_recently:
+            results[ip] = None
+        else:
+            misses.append(ip)
+    return results, misses
+
+
+def enrich_findings(
+    findings: List[Finding],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    rate_limit: Optional[float] = DEFAULT_RATE_LIMIT,
+    timeout: Optional[float] = None,
+    batch: bool = False,
+    geo_mode: str = "online",
+    geodb: Union[GeoDB, str, Path, None] = None,
+) -> List[Finding]:
+    """Populate :attr:`~src.models.Finding.geo_info` for each finding.
+
+    Unique IPs are looked up by up to *max_workers* threads. *rate_limit*
+    (requests per minute, None for unlimited) is enforced by one token bucket
+    shared by all workers. If *timeout* (seconds) expires, lookups still in
+    flight are abandoned and the findings enriched so far are returned. With
+    *batch*, cache misses are sent to the batch endpoint ``BATCH_SIZE`` at a
+    time (pass ``DEFAULT_BATCH_RATE_LIMIT`` as *rate_limit* for its quota).
+
+    *geo_mode* ``offline`` answers only from *geodb* (a :class:`GeoDB` or a
+    path to one) without any network or cache access; ``fallback`` queries
+    the API first and fills in from *geodb* whatever it could not answer.
+    """
+    if geo_mode not in GEO_MODES:
+        raise ValueError(f"Unknown geo mode: {geo_mode}")
+    if geo_mode != "online" and geodb is None:
+        raise ValueError(f"geo mode '{geo_mode}' needs a geo database")
+    if geodb is not None and not isinstance(geodb, GeoDB):
+        geodb = open_geodb(geodb)
+
+    unique_ips = list(dict.fromkeys(f.source_ip for f in findings))
+    if geo_mode == "offline":
+        ip_info = lookup_ips_offline(unique_ips, geodb)
+    else:
+        ip_info = lookup_ips(unique_ips, max_workers=max_workers, rate_limit=rate_limit, timeout=timeout, batch=batch)
+        if geo_mode == "fallback":
+            ip_info.update(lookup_ips_offline([ip for ip in unique_ips if ip not in ip_info], geodb))
 
     for f in findings:
         if f.source_ip in ip_info:
             f.geo_info = ip_info[f.source_ip]
     return findings
+
+
+def lookup_ips(
+    ips: List[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    rate_limit: Optional[float] = DEFAULT_RATE_LIMIT,
+    timeout: Optional[float] = None,
+    batch: bool = False,
+) -> Dict[str, Dict]:
+    """Look up many IPs concurrently; return ``{ip: info}`` for successful lookups."""
+    limiter = TokenBucket.per_minute(rate_limit) if rate_limit else None
+    ip_info: Dict[str, Dict] = {}
+
+    # Each task returns {ip: info or None}.
+    tasks: List[Callable[[Optional[float]], Dict[str, Optional[Dict]]]]
+    if batch:
+        local, misses = _resolve_locally(ips)
+        ip_info.update({ip: info for ip, info in local.items() if info})
+        tasks = [partial(_batch_task, chunk, limiter) for chunk in _chunks(misses, BATCH_SIZE)]
+    else:
+        tasks = [partial(_single_task, ip, limiter) for ip in dict.fromkeys(ips)]
+
+    if max_workers <= 1:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for task in tasks:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            ip_info.update({ip: info for ip, info in task(remaining).items() if info})
+        return ip_info
+
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="securesiem-enrich")
+    try:
+        futures = [pool.submit(task, timeout) for task in tasks]
+        done, _ = wait(futures, timeout=timeout)
+        for fut in done:
+            ip_info.update({ip: info for ip, info in fut.result().items() if info})
+    finally:
+        # Do not block on lookups that missed the deadline.
+        pool.shutdown(wait=False, cancel_futures=True)
+    return ip_info
+
+
+def lookup_ips_offline(ips: List[str], geodb: GeoDB) -> Dict[str, Dict]:
+    """Look up IPs in a local range database; return ``{ip: info}`` for the hits."""
+    ip_info: Dict[str, Dict] = {}
+    for ip in dict.fromkeys(ips):
+        ip_class = classify_ip(ip)
+        info = geodb.lookup(ip) if ip_class is None else _special_result(ip_class)
+        if info:
+            ip_info[ip] = info
+    return ip_info
+
+
+Resolver = Callable[[List[str], Optional[float]], Dict[str, Optional[Dict]]]
+
+
+def make_resolver(
+    rate_limit: Optional[float] = DEFAULT_RATE_LIMIT,
+    batch: bool = False,
+    geo_mode: str = "online",
+    geodb: Union[GeoDB, str, Path, None] = None,
+) -> Resolver:
+    """Return ``resolve(ips, limiter_timeout) -> {ip: info or None}``.
+
+    Same lookup rules as :func:`enrich_findings`, packaged for callers that
+    run their own workers (the analyze pipeline). One token bucket is shared
+    by every call to the returned function, so it is safe to call from many
+    threads at once. With *batch*, each call sends its cache misses as batch
+    requests; otherwise every IP is looked up individually.
+    """
+    if geo_mode not in GEO_MODES:
+        raise ValueError(f"Unknown geo mode: {geo_mode}")
+    if geo_mode != "online" and geodb is None:
+        raise ValueError(f"geo mode '{geo_mode}' needs a geo database")
+    if geodb is not None and not isinstance(geodb, GeoDB):
+        geodb = open_geodb(geodb)
+    limiter = TokenBucket.per_minute(rate_limit) if rate_limit else None
+
+    def resolve(ips: List[str], limiter_timeout: Optional[float] = None) -> Dict[str, Optional[Dict]]:
+        if geo_mode == "offline":
+            found = lookup_ips_offline(ips, geodb)
+            return {ip: found.get(ip) for ip in ips}
+        if batch:
+            results = get_ip_info_batch(ips, True, limiter, limiter_timeout)
+        else:
+            results = {ip: get_ip_info(ip, True, limiter, limiter_timeout) for ip in dict.fromkeys(ips)}
+        if geo_mode == "fallback":
+            results.update(lookup_ips_offline([ip for ip in ips if not results.get(ip)], geodb))
+        return results
+
+    return resolve
+
+
+def _single_task(ip: str, limiter: Optional[TokenBucket], limiter_timeout: Optional[float]) -> Dict[str, Optional[Dict]]:
+    return {ip: get_ip_info(ip, True, limiter, limiter_timeout)}
+
+
+def _batch_task(ips: List[str], limiter: Optional[TokenBucket], limiter_timeout: Optional[float]) -> Dict[str, Optional[Dict]]:
+    return fetch_batch(ips, True, limiter, limiter_timeout)
@@ -0,0 +1,207 @@
+"""Offline IP-range geolocation database for SecureSIEM.
+
+Air-gapped sensors cannot reach ip-api.com, so enrichment can instead answer
+from a local range database built once from a CSV export.
+
+CSV input (header row required), one IPv4 range per row:
+- ``start_ip,end_ip`` (dotted quads or integers, inclusive) or ``network``
+  (CIDR, e.g. ``8.8.8.0/24``)
+- optional ``country,region,city,isp,org`` columns
+
+Binary layout (all integers unsigned 32-bit; the header is little-endian,
+the columns use the writer's native byte order recorded in the header)::
+
+    magic "SSGEODB1" | byteorder "<" or ">" + 3 pad bytes | range count |
+    record count | records JSON length |
+    starts[count] | ends[count] | record_ids[count] | records JSON
+
+Ranges are sorted by start and must not overlap. Identical location records
+are stored once and referenced by id. The file is memory-mapped and the three
+columns are read through ``memoryview`` casts, so opening is O(1) and a lookup
+is a single ``bisect`` over the starts column.
+
+IPv6 is not supported; such addresses simply have no record.
+"""
+
+from __future__ import annotations
+
+import csv
+import ipaddress
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .models import ipv4_to_int
+
+
+MAGIC = b"SSGEODB1"
+_HEADER = struct.Struct("<8s1s3xIII")
+RECORD_FIELDS = ("country", "region", "city", "isp", "org")
+
+PathLike = Union[str, Path]
+
+
+def _parse_ip(value: str) -> int:
+    value = value.strip()
+    if value.isdigit():
+        n = int(value)
+        if n > 0xFFFFFFFF:
+            raise ValueError(f"Not an IPv4 address: {value}")
+        return n
+    n = ipv4_to_int(value)
+    if n is None:
+        raise ValueError(f"Not an IPv4 address: {value}")
+    return n
+
+
+def _row_range(row: Dict[str, str]) -> Tuple[int, int]:
+    network = (row.get("network") or "").strip()
+    if network:
+        net = ipaddress.IPv4Network(network, strict=False)
+        return int(net.network_address), int(net.broadcast_address)
+    start, end = _parse_ip(row["start_ip"]), _parse_ip(row["end_ip"])
+    if end < start:
+        raise ValueError(f"Range end before start: {row['start_ip']} - {row['end_ip']}")
+    return start, end
+
+
+def build_geodb(csv_path: PathLike, out_path: PathLike) -> int:
+    """Build a binary range database from *csv_path*. Returns the range count.
+
+    Raises ValueError on malformed rows or overlapping ranges.
+    """
+    ranges: List[Tuple[int, int, int]] = []
+    records: List[Dict[str, str]] = []
+    record_ids: Dict[Tuple[str, ...], int] = {}
+
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        fields = set(reader.fieldnames or ())
+        if "network" not in fields and not {"start_ip", "end_ip"} <= fields:
+            raise ValueError("CSV needs a 'network' column or 'start_ip' and 'end_ip' columns")
+        for line_no, row in enumerate(reader, start=2):
+            try:
+                start, end = _row_range(row)
+            except (KeyError, ValueError) as e:
+                raise ValueError(f"{csv_path}:{line_no}: {e}") from None
+            key = tuple((row.get(name) or "Unknown").strip() for name in RECORD_FIELDS)
+            rid = record_ids.get(key)
+            if rid is None:
+                rid = record_ids[key] = len(records)
+                records.append(dict(zip(RECORD_FIELDS, key)))
+            ranges.append((start, end, rid))
+
+    ranges.sort()
+    for (_, prev_end, _), (start, _, _) in zip(ranges, ranges[1:]):
+        if start <= prev_end:
+            raise ValueError(f"Overlapping ranges at {ipaddress.IPv4Address(start)}")
+
+    blob = json.dumps(records, separators=(",", ":")).encode("utf-8")
+    header = _HEADER.pack(
+        MAGIC, b"<" if sys.byteorder == "little" else b">", len(ranges), len(records), len(blob)
+    )
+    out = Path(out_path)
+    tmp = out.with_name(out.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(header)
+        for column in range(3):
+            array("I", (r[column] for r in ranges)).tofile(f)
+        f.write(blob)
+    tmp.replace(out)
+    return len(ranges)
+
+
+class GeoDB:
+    """Read-only, memory-mapped view of a database written by :func:`build_geodb`."""
+
+    def __init__(self, path: PathLike) -> None:
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"Not a SecureSIEM geo database: {path}") from None
+
+        try:
+            magic, order, count, n_records, blob_len = _HEADER.unpack_from(self._mm, 0)
+        except struct.error:
+            magic = b""
+        expected = _HEADER.size + 12 * count + blob_len if magic == MAGIC else -1
+        if magic != MAGIC or len(self._mm) != expected:
+            self.close()
+            raise ValueError(f"Not a SecureSIEM geo database: {path}")
+
+        self._count = count
+        self._views: List[memoryview] = []
+        columns: List[Sequence[int]] = []
+        native = order == (b"<" if sys.byteorder == "little" else b">")
+        view = memoryview(self._mm)
+        for i in range(3):
+            raw = view[_HEADER.size + 4 * count * i:_HEADER.size + 4 * count * (i + 1)]
+            if native:
+                col = raw.cast("I")
+                self._views.extend((raw, col))
+                columns.append(col)
+            else:  # built on the other endianness: copy once and swap
+                swapped = array("I", raw.tobytes())
+                swapped.byteswap()
+                raw.release()
+                columns.append(swapped)
+        self._starts, self._ends, self._ids = columns
+        view.release()
+        offset = _HEADER.size + 12 * count
+        self._records: List[Dict[str, str]] = json.loads(self._mm[offset:offset + blob_len])
+        if len(self._records) != n_records:
+            self.close()
+            raise ValueError(f"Corrupt geo database: {path}")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> "GeoDB":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for v in reversed(getattr(self, "_views", [])):
+            v.release()
+        self._views = []
+        mm = getattr(self, "_mm", None)
+        if mm is not None and not mm.closed:
+            mm.close()
+        self._file.close()
+
+    def record_id(self, n: int) -> Optional[int]:
+        """Return the record id covering integer address *n*, or None."""
+        i = bisect_right(self._starts, n) - 1
+        if i >= 0 and n <= self._ends[i]:
+            return self._ids[i]
+        return None
+
+    def lookup(self, ip: str) -> Optional[Dict[str, str]]:
+        """Return geo info for dotted-quad *ip* (same shape as online results)."""
+        n = ipv4_to_int(ip)
+        if n is None:
+            return None
+        rid = self.record_id(n)
+        return None if rid is None else dict(self._records[rid])
+
+
+_open: Dict[Path, GeoDB] = {}
+
+
+def open_geodb(path: PathLike) -> GeoDB:
+    """Return a shared :class:`GeoDB` for *path* (opened once per process)."""
+    key = Path(path).resolve()
+    db = _open.get(key)
+    if db is None:
+        db = _open[key] = GeoDB(key)
+    return db
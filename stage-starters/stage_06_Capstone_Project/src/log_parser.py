@@ -10,16 +10,37 @@ Supported formats:
 Parsing uses regular expressions and conservative error handling:
 - Unparseable lines are skipped (return None)
 - Timestamps that fail to parse become None (still yields entry)
+
+Inputs compressed with gzip, bzip2 or xz (recognised by their magic bytes, so
+rotated names like ``access.log.2.gz`` need no special handling) are
+decompressed on the fly through large read buffers; nothing is written to
+disk.
 """
 
 from __future__ import annotations
 
+import bz2
+import glob
+import gzip
+import heapq
+import io
+import lzma
+import mmap
+import multiprocessing
+import os
+import pickle
+import queue
 import re
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Optional, List, Generator
+from typing import BinaryIO, Deque, Dict, Iterable, Optional, List, Generator, TextIO, Tuple, Union
 
-from .models import LogEntry, LogType
+from .models import LogBatch, LogEntry, LogType
+from .timestamps import decode_apache, decode_auth, decode_ssh
 
 
 # =============================================================================
@@ -56,6 +77,14 @@ AUTH_PATTERN = re.compile(
     r'(?:\s+reason=(?P<reason>\S+))?'
 )
 
+# Bytes twins of the patterns above, used by the mmap engine to match lines
+# without decoding them first.
+APACHE_PATTERN_BYTES = re.compile(APACHE_PATTERN.pattern.encode("ascii"))
+SSH_PATTERN_BYTES = re.compile(SSH_PATTERN.pattern.encode("ascii"))
+AUTH_PATTERN_BYTES = re.compile(AUTH_PATTERN.pattern.encode("ascii"))
+
+ENGINES = ("text", "mmap")
+
 
 # =============================================================================
 # TIMESTAMP PARSING
@@ -63,30 +92,19 @@ AUTH_PATTERN = re.compile(
 
 def parse_apache_timestamp(ts_str: str) -> Optional[datetime]:
     """Parse Apache timestamp (example: '25/Dec/2024:10:15:32 +0000')."""
-    try:
-        ts_clean = ts_str.split()[0] if " " in ts_str else ts_str
-        return datetime.strptime(ts_clean, "%d/%b/%Y:%H:%M:%S")
-    except ValueError:
-        return None
+    return decode_apache(ts_str)
 
 
 def parse_ssh_timestamp(ts_str: str, year: Optional[int] = None) -> Optional[datetime]:
     """Parse SSH log timestamp (no year present in syslog style dates)."""
     if year is None:
         year = datetime.now().year
-    try:
-        dt = datetime.strptime(ts_str, "%b %d %H:%M:%S")
-        return dt.replace(year=year)
-    except ValueError:
-        return None
+    return decode_ssh(ts_str, year)
 
 
 def parse_auth_timestamp(ts_str: str) -> Optional[datetime]:
     """Parse generic auth timestamp (example: '2024-12-25 10:15:32')."""
-    try:
-        return datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S")
-    except ValueError:
-        return None
+    return decode_auth(ts_str)
 
 
 # =============================================================================
@@ -113,21 +131,21 @@ def parse_apache_line(line: str) -> Optional[LogEntry]:
     )
 
 
-def parse_ssh_line(line: str) -> Optional[LogEntry]:
+def parse_ssh_line(line: str, year: Optional[int] = None) -> Optional[LogEntry]:
     match = SSH_PATTERN.search(line.strip())
     if not match:
         return None
 
     g = match.groupdict()
     return LogEntry(
-        timestamp=parse_ssh_timestamp(g["timestamp"]),
+        timestamp=parse_ssh_timestamp(g["timestamp"], year),
         source_ip=g["ip"],
         log_type=LogType.SSH,
         raw_line=line.strip(),
         user=g["user"],
         action="ssh_login",
         status="success" if g["status"] == "Accepted" else "failure",
-        details=f"host={g['host']}",
+        details=sys.intern(f"host={g['host']}"),
     )
 
 
@@ -149,6 +167,13 @@ def parse_auth_line(line: str) -> Optional[LogEntry]:
     )
 
 
+_LINE_PARSERS = {
+    LogType.APACHE: parse_apache_line,
+    LogType.SSH: parse_ssh_line,
+    LogType.AUTH: parse_auth_line,
+}
+
+
 # =============================================================================
 # MAIN PARSER FUNCTIONS
 # =============================================================================
@@ -165,44 +190,775 @@ def detect_log_type(sample_line: str) -> LogType:
     return LogType.UNKNOWN
 
 
-def parse_line(line: str, log_type: Optional[LogType] = None) -> Optional[LogEntry]:
-    """Parse a single line. Auto-detects type if *log_type* is not provided."""
+def parse_line(
+    line: str, log_type: Optional[LogType] = None, year: Optional[int] = None
+) -> Optional[LogEntry]:
+    """Parse a single line. Auto-detects type if *log_type* is not provided.
+
+    *year* is only used for SSH lines, whose timestamps carry no year; file
+    parsers resolve it once per file instead of once per line.
+    """
     if not line or not line.strip():
         return None
 
     if log_type is None:
         log_type = detect_log_type(line)
 
-    parser_map = {
-        LogType.APACHE: parse_apache_line,
-        LogType.SSH: parse_ssh_line,
-        LogType.AUTH: parse_auth_line,
-    }
-    parser = parser_map.get(log_type)
+    if log_type == LogType.SSH:
+        return parse_ssh_line(line, year)
+    parser = _LINE_PARSERS.get(log_type)
     return parser(line) if parser else None
 
 
-def parse_file(filepath: str) -> Generator[LogEntry, None, None]:
-    """Parse a log file yielding entries one at a time (generator)."""
+# =============================================================================
+# FILE ACCESS (PLAIN OR COMPRESSED)
+# =============================================================================
+
+READ_BUFFER_SIZE = 1024 * 1024  # bytes per read from disk / decompressor
+
+_COMPRESSION_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+)
+_DECOMPRESSORS = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+
+
+def compression_of(filepath: str) -> Optional[str]:
+    """Return ``"gzip"``, ``"bz2"`` or ``"xz"`` for compressed files, else None."""
+    with open(filepath, "rb") as f:
+        head = f.read(6)
+    for magic, name in _COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def open_log_binary(filepath: str) -> BinaryIO:
+    """Open *filepath* for reading bytes, decompressing transparently."""
+    kind = compression_of(filepath)
+    if kind is None:
+        return open(filepath, "rb", buffering=READ_BUFFER_SIZE)
+    return io.BufferedReader(_DECOMPRESSORS[kind](filepath, "rb"), buffer_size=READ_BUFFER_SIZE)
+
+
+def open_log_text(filepath: str) -> TextIO:
+    """Open *filepath* as text (UTF-8, bad bytes ignored), decompressing transparently."""
+    return io.TextIOWrapper(open_log_binary(filepath), encoding="utf-8", errors="ignore", newline=None)
+
+
+# =============================================================================
+# MIXED-FORMAT STREAMS
+# =============================================================================
+
+_SYSLOG_MONTHS = frozenset(("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"))
+
+
+def classify_line(line: str) -> LogType:
+    """Route a line to one format by looking only at its first characters.
+
+    - ``YYYY-`` (four digits and a dash): AUTH
+    - any other leading digit: Apache (client IP)
+    - a month abbreviation: syslog, i.e. SSH
+    - anything else: UNKNOWN
+
+    This is a prefilter: the chosen format's regex still has to match.
+    """
+    s = line.lstrip()
+    if not s:
+        return LogType.UNKNOWN
+    c = s[0]
+    if "0" <= c <= "9":
+        if len(s) > 4 and s[4] == "-" and s[:4].isdigit():
+            return LogType.AUTH
+        return LogType.APACHE
+    if s[:3] in _SYSLOG_MONTHS:
+        return LogType.SSH
+    return LogType.UNKNOWN
+
+
+class FormatStats:
+    """Per-format line counts collected while parsing a mixed stream.
+
+    ``routed[t]`` counts lines the prefix classifier sent to format *t* and
+    ``parsed[t]`` those the format's regex accepted; the difference is
+    rejected lines. ``unrouted`` counts non-blank lines with no candidate
+    format.
+    """
+
+    FORMATS = (LogType.APACHE, LogType.SSH, LogType.AUTH)
+
+    def __init__(self) -> None:
+        self.routed: Dict[LogType, int] = dict.fromkeys(self.FORMATS, 0)
+        self.parsed: Dict[LogType, int] = dict.fromkeys(self.FORMATS, 0)
+        self.unrouted = 0
+
+    @property
+    def total_lines(self) -> int:
+        return sum(self.routed.values()) + self.unrouted
+
+    def rejected(self, log_type: LogType) -> int:
+        return self.routed[log_type] - self.parsed[log_type]
+
+    def rejection_rate(self, log_type: LogType) -> float:
+        routed = self.routed[log_type]
+        return self.rejected(log_type) / routed if routed else 0.0
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        out: Dict[str, Dict[str, float]] = {
+            t.value: {
+                "routed": self.routed[t],
+                "parsed": self.parsed[t],
+                "rejected": self.rejected(t),
+                "rejection_rate": round(self.rejection_rate(t), 4),
+            }
+            for t in self.FORMATS
+        }
+        out["unknown"] = {
+            "routed": self.unrouted,
+            "parsed": 0,
+            "rejected": self.unrouted,
+            "rejection_rate": 1.0 if self.unrouted else 0.0,
+        }
+        return out
+
+
+def iter_mixed_entries(
+    lines: Iterable[str], year: Optional[int] = None, stats: Optional[FormatStats] = None
+) -> Generator[LogEntry, None, None]:
+    """Parse lines of any supported format, one regex per line.
+
+    :func:`classify_line` picks the format; blank lines are skipped silently.
+    Counts are accumulated into *stats* if given.
+    """
+    stats = stats if stats is not None else FormatStats()
+    year = year if year is not None else datetime.now().year
+    routed, parsed = stats.routed, stats.parsed
+    apache, ssh, auth = LogType.APACHE, LogType.SSH, LogType.AUTH
+    for line in lines:
+        log_type = classify_line(line)
+        if log_type is LogType.UNKNOWN:
+            if line.strip():
+                stats.unrouted += 1
+            continue
+        routed[log_type] += 1
+        if log_type is ssh:
+            entry = parse_ssh_line(line, year)
+        elif log_type is apache:
+            entry = parse_apache_line(line)
+        else:
+            entry = parse_auth_line(line)
+        if entry is not None:
+            parsed[log_type] += 1
+            yield entry
+
+
+def _sniff_log_type(path: Path) -> Optional[LogType]:
+    """Detect file type from the first non-empty line of *path*."""
+    with open_log_text(str(path)) as f:
+        for line in f:
+            if line.strip():
+                return detect_log_type(line)
+    return None
+
+
+def parse_file(
+    filepath: str,
+    engine: str = "text",
+    lazy_raw: bool = False,
+    mixed: bool = False,
+    stats: Optional[FormatStats] = None,
+) -> Generator[LogEntry, None, None]:
+    """Parse a log file yielding entries one at a time (generator).
+
+    *engine* selects the implementation: ``"text"`` decodes and parses line by
+    line, ``"mmap"`` matches bytes regexes directly over a memory-mapped file
+    (see :func:`parse_file_mmap`). *lazy_raw* keeps ``raw_line`` as a file
+    offset and requires the mmap engine.
+
+    By default the format is sniffed once from the first non-empty line. With
+    *mixed* (text engine only) every line is routed to its own format by
+    :func:`classify_line`, and per-format counts go into *stats*.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown parser engine: {engine}")
+    if lazy_raw and engine != "mmap":
+        raise ValueError("lazy_raw requires the mmap engine")
+    if mixed and engine != "text":
+        raise ValueError("mixed-format parsing requires the text engine")
+
     path = Path(filepath)
     if not path.exists():
         raise FileNotFoundError(f"Log file not found: {filepath}")
 
-    # Detect file type from first non-empty line.
-    log_type: Optional[LogType] = None
-    with path.open("r", encoding="utf-8", errors="ignore") as f:
-        for line in f:
-            if line.strip():
-                log_type = detect_log_type(line)
-                break
+    if engine == "mmap":
+        yield from parse_file_mmap(filepath, lazy_raw=lazy_raw)
+        return
 
-    with path.open("r", encoding="utf-8", errors="ignore") as f:
+    year = datetime.now().year
+    if mixed:
+        with open_log_text(str(path)) as f:
+            yield from iter_mixed_entries(f, year, stats)
+        return
+
+    log_type = _sniff_log_type(path)
+    with open_log_text(str(path)) as f:
         for line in f:
-            entry = parse_line(line, log_type)
+            entry = parse_line(line, log_type, year)
             if entry:
                 yield entry
 
 
-def parse_file_to_list(filepath: str) -> List[LogEntry]:
+def parse_file_to_list(filepath: str, engine: str = "text", lazy_raw: bool = False) -> List[LogEntry]:
     """Parse a log file and return all entries as a list."""
-    return list(parse_file(filepath))
+    return list(parse_file(filepath, engine=engine, lazy_raw=lazy_raw))
+
+
+def _keep(s: str) -> str:
+    return s
+
+
+def _apache_row(match, dec, year: int) -> Tuple[str, Optional[datetime], str, str]:
+    ip, ts, method, path, status = match.group("ip", "timestamp", "method", "path", "status")
+    return dec(ip), parse_apache_timestamp(dec(ts)), dec(status), f"{dec(method)} {dec(path)}"
+
+
+def _ssh_row(match, dec, year: int) -> Tuple[str, Optional[datetime], str, str]:
+    ts, status, ip = match.group("timestamp", "status", "ip")
+    return (
+        dec(ip),
+        parse_ssh_timestamp(dec(ts), year),
+        "success" if dec(status) == "Accepted" else "failure",
+        "ssh_login",
+    )
+
+
+def _auth_row(match, dec, year: int) -> Tuple[str, Optional[datetime], str, str]:
+    ts, status, ip = match.group("timestamp", "status", "ip")
+    return dec(ip), parse_auth_timestamp(dec(ts)), "success" if dec(status) == "SUCCESS" else "failure", "auth"
+
+
+# (text pattern, bytes pattern, row builder); SSH lines are searched, the others matched.
+_BATCH_FORMATS = {
+    LogType.APACHE: (APACHE_PATTERN, APACHE_PATTERN_BYTES, _apache_row),
+    LogType.SSH: (SSH_PATTERN, SSH_PATTERN_BYTES, _ssh_row),
+    LogType.AUTH: (AUTH_PATTERN, AUTH_PATTERN_BYTES, _auth_row),
+}
+
+
+def _binary_lines(path: Path) -> Generator[bytes, None, None]:
+    """Lines of *path* as bytes: memory-mapped if plain, streamed if compressed."""
+    if compression_of(str(path)):
+        with open_log_binary(str(path)) as stream:
+            yield from stream
+        return
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return  # empty files cannot be memory-mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield from iter(buf.readline, b"")
+
+
+def parse_file_to_batch(filepath: str, engine: str = "text") -> LogBatch:
+    """Parse a log file straight into a columnar :class:`~src.models.LogBatch`.
+
+    Columns are appended from the regex match of each line; no
+    :class:`~src.models.LogEntry` is built and only the captured groups the
+    batch stores are decoded. Rows are identical to ``parse_file`` output.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown parser engine: {engine}")
+    path = Path(filepath)
+    if not path.exists():
+        raise FileNotFoundError(f"Log file not found: {filepath}")
+
+    batch = LogBatch()
+    log_type = _sniff_log_type(path)
+    if log_type not in _BATCH_FORMATS:
+        return batch
+    text_pattern, bytes_pattern, row = _BATCH_FORMATS[log_type]
+    year = datetime.now().year
+    append = batch.append_row
+
+    if engine == "mmap":
+        find = bytes_pattern.search if log_type == LogType.SSH else bytes_pattern.match
+        for line in _binary_lines(path):
+            match = find(line.strip())
+            if match:
+                ip, ts, status, action = row(match, _decode, year)
+                append(ip, ts, log_type, status, action)
+        return batch
+
+    find = text_pattern.search if log_type == LogType.SSH else text_pattern.match
+    with open_log_text(str(path)) as f:
+        for line in f:
+            match = find(line.strip())
+            if match:
+                ip, ts, status, action = row(match, _keep, year)
+                append(ip, ts, log_type, status, action)
+    return batch
+
+
+# =============================================================================
+# MMAP (BYTES) ENGINE
+# =============================================================================
+
+def _decode(b: Optional[bytes]) -> Optional[str]:
+    return None if b is None else b.decode("utf-8", errors="ignore")
+
+
+def _parse_apache_bytes(line: bytes, source: Optional[str] = None, offset: int = 0) -> Optional[LogEntry]:
+    match = APACHE_PATTERN_BYTES.match(line)
+    if not match:
+        return None
+
+    ip, user, ts, method, path, status, size = match.group(
+        "ip", "user", "timestamp", "method", "path", "status", "size"
+    )
+    return LogEntry(
+        timestamp=parse_apache_timestamp(ts.decode("ascii", errors="ignore")),
+        source_ip=ip.decode("ascii"),
+        log_type=LogType.APACHE,
+        raw_line=None if source else _decode(line),
+        user=None if user == b"-" else _decode(user),
+        action=f"{_decode(method)} {_decode(path)}",
+        status=status.decode("ascii"),
+        details=f"size={size.decode('ascii')}",
+        raw_source=source,
+        raw_offset=offset if source else None,
+    )
+
+
+def _parse_ssh_bytes(
+    line: bytes, source: Optional[str] = None, offset: int = 0, year: Optional[int] = None
+) -> Optional[LogEntry]:
+    match = SSH_PATTERN_BYTES.search(line)
+    if not match:
+        return None
+
+    ts, host, status, user, ip = match.group("timestamp", "host", "status", "user", "ip")
+    return LogEntry(
+        timestamp=parse_ssh_timestamp(ts.decode("ascii", errors="ignore"), year),
+        source_ip=ip.decode("ascii"),
+        log_type=LogType.SSH,
+        raw_line=None if source else _decode(line),
+        user=_decode(user),
+        action="ssh_login",
+        status="success" if status == b"Accepted" else "failure",
+        details=sys.intern(f"host={_decode(host)}"),
+        raw_source=source,
+        raw_offset=offset if source else None,
+    )
+
+
+def _parse_auth_bytes(line: bytes, source: Optional[str] = None, offset: int = 0) -> Optional[LogEntry]:
+    match = AUTH_PATTERN_BYTES.match(line)
+    if not match:
+        return None
+
+    ts, status, user, ip, reason = match.group("timestamp", "status", "user", "ip", "reason")
+    return LogEntry(
+        timestamp=parse_auth_timestamp(ts.decode("ascii", errors="ignore")),
+        source_ip=ip.decode("ascii"),
+        log_type=LogType.AUTH,
+        raw_line=None if source else _decode(line),
+        user=_decode(user),
+        action="auth",
+        status="success" if status == b"SUCCESS" else "failure",
+        details=_decode(reason),
+        raw_source=source,
+        raw_offset=offset if source else None,
+    )
+
+
+_BYTES_PARSERS = {
+    LogType.APACHE: _parse_apache_bytes,
+    LogType.SSH: _parse_ssh_bytes,
+    LogType.AUTH: _parse_auth_bytes,
+}
+
+
+def _iter_mmap_entries(
+    buf: Union[mmap.mmap, BinaryIO],
+    start: int,
+    end: int,
+    log_type: Optional[LogType],
+    year: Optional[int] = None,
+    source: Optional[str] = None,
+) -> Generator[LogEntry, None, None]:
+    """Yield entries for the lines of *buf* between byte offsets *start* and *end*.
+
+    *buf* is usually an mmap, but any seekable binary stream with ``readline``
+    and ``tell`` works.
+
+    If *source* (the file path) is given, entries get a lazy ``raw_line`` that
+    points back into that file instead of a decoded copy.
+    """
+    parser = _BYTES_PARSERS.get(log_type) if log_type else None
+    if parser is None:
+        return
+    if log_type == LogType.SSH:
+        parser = partial(_parse_ssh_bytes, year=year if year is not None else datetime.now().year)
+
+    buf.seek(start)
+    readline = buf.readline
+    tell = buf.tell
+    while True:
+        offset = tell()
+        if offset >= end:
+            break
+        line = readline()
+        if not line:
+            break  # EOF (streams may end before *end*)
+        line = line.strip()
+        if not line:
+            continue
+        entry = parser(line, source, offset)
+        if entry:
+            yield entry
+
+
+def parse_file_mmap(filepath: str, lazy_raw: bool = False) -> Generator[LogEntry, None, None]:
+    """Parse a log file by matching bytes regexes over a memory-mapped buffer.
+
+    Only matching lines are decoded, and only the captured groups that end up
+    in the :class:`~src.models.LogEntry`. For valid UTF-8 input the result is
+    identical to the text engine.
+
+    With *lazy_raw*, entries store the byte offset of their line instead of a
+    decoded ``raw_line`` copy (read back from the file on access).
+
+    Compressed files cannot be mapped; their decompressed stream is run
+    through the same bytes parsers instead (*lazy_raw* is ignored, since
+    offsets into a compressed file cannot be read back).
+    """
+    path = Path(filepath)
+    if not path.exists():
+        raise FileNotFoundError(f"Log file not found: {filepath}")
+
+    log_type = _sniff_log_type(path)
+    year = datetime.now().year
+    if compression_of(str(path)):
+        with open_log_binary(str(path)) as stream:
+            yield from _iter_mmap_entries(stream, 0, sys.maxsize, log_type, year)
+        return
+    with path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return  # empty files cannot be memory-mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            source = str(path) if lazy_raw else None
+            yield from _iter_mmap_entries(buf, 0, size, log_type, year, source)
+
+
+# =============================================================================
+# PARALLEL PARSING
+# =============================================================================
+
+DEFAULT_CHUNK_SIZE = 32 * 1024 * 1024  # bytes per work unit
+
+
+def split_file_ranges(
+    filepath: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> List[Tuple[int, int]]:
+    """Split a file into ``(start, end)`` byte ranges that end on a newline.
+
+    Every range except possibly the last ends just after a ``\\n`` byte, so no
+    line (and no multi-byte UTF-8 character) is ever split between ranges.
+    Only bytes ``[start, stop)`` are covered (default: the whole file); *start*
+    must be at the beginning of a line.
+    """
+    size = os.path.getsize(filepath) if stop is None else stop
+    ranges: List[Tuple[int, int]] = []
+    with open(filepath, "rb") as f:
+        while start < size:
+            end = start + chunk_size
+            if end >= size:
+                ranges.append((start, size))
+                break
+            f.seek(end)
+            f.readline()  # advance to the end of the current line
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _parse_range(
+    filepath: str,
+    start: int,
+    end: int,
+    log_type: Optional[LogType],
+    engine: str = "text",
+    year: Optional[int] = None,
+) -> List[LogEntry]:
+    """Parse the lines inside one byte range (runs in a worker process)."""
+    if engine == "mmap":
+        with open(filepath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return list(_iter_mmap_entries(buf, start, end, log_type, year))
+
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    # newline=None gives the same universal-newline handling as text mode.
+    text = io.StringIO(data.decode("utf-8", errors="ignore"), newline=None)
+    entries: List[LogEntry] = []
+    for line in text:
+        entry = parse_line(line, log_type, year)
+        if entry:
+            entries.append(entry)
+    return entries
+
+
+def parse_file_parallel(
+    filepath: str,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    engine: str = "text",
+) -> Generator[LogEntry, None, None]:
+    """Parse a log file using a pool of worker processes.
+
+    The file is split into newline-aligned byte ranges, each range is parsed
+    in a separate process, and results are yielded in file order. The output
+    is identical to :func:`parse_file` with the same *engine*. Compressed
+    files are parsed whole in a single worker process.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown parser engine: {engine}")
+
+    path = Path(filepath)
+    if not path.exists():
+        raise FileNotFoundError(f"Log file not found: {filepath}")
+
+    if compression_of(str(path)):
+        # A compressed stream cannot be split by byte offset; decompress and
+        # parse it in one worker process so that overlaps with the consumer.
+        yield from parse_files_parallel([str(path)], workers=1, engine=engine)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    log_type = _sniff_log_type(path)
+    year = datetime.now().year  # resolved once so every worker agrees
+    ranges = split_file_ranges(str(path), chunk_size=chunk_size)
+
+    if workers <= 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            yield from _parse_range(str(path), start, end, log_type, engine, year)
+        return
+
+    # Keep only a bounded number of ranges in flight so memory does not grow
+    # with file size when the consumer is slower than the workers.
+    max_in_flight = workers * 2
+    pending: Deque[Future] = deque()
+    todo = iter(ranges)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for start, end in todo:
+            pending.append(pool.submit(_parse_range, str(path), start, end, log_type, engine, year))
+            if len(pending) >= max_in_flight:
+                break
+        while pending:
+            entries = pending.popleft().result()
+            nxt = next(todo, None)
+            if nxt is not None:
+                pending.append(pool.submit(_parse_range, str(path), nxt[0], nxt[1], log_type, engine, year))
+            yield from entries
+
+
+# =============================================================================
+# MULTI-FILE PARSING
+# =============================================================================
+
+PRODUCER_BATCH_SIZE = 10_000  # entries per message from a producer process
+PRODUCER_QUEUE_DEPTH = 2  # batches a producer may buffer ahead of the consumer
+PRODUCER_POLL_INTERVAL = 1.0  # seconds between liveness checks while waiting on a producer
+
+
+def _produce_entries(filepath: str, engine: str, out, batch_size: int) -> None:
+    """Producer process body: parse one file and stream entry batches to *out*.
+
+    The stream ends with None, or with the exception raised on failure
+    (wrapped in RuntimeError only if it cannot be pickled).
+    """
+    try:
+        batch: List[LogEntry] = []
+        for entry in parse_file(filepath, engine=engine):
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                out.put(batch)
+                batch = []
+        if batch:
+            out.put(batch)
+        out.put(None)
+    except Exception as e:  # surfaced in the consumer
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(f"{filepath}: {e!r}")
+        out.put(e)
+
+
+class _FileProducer:
+    """One file being decompressed and parsed in its own process."""
+
+    def __init__(self, ctx, filepath: str, engine: str, batch_size: int) -> None:
+        self.filepath = filepath
+        self.queue = ctx.Queue(maxsize=PRODUCER_QUEUE_DEPTH)
+        self.process = ctx.Process(
+            target=_produce_entries, args=(filepath, engine, self.queue, batch_size), daemon=True
+        )
+        self.process.start()
+
+    def batches(self) -> Generator[List[LogEntry], None, None]:
+        try:
+            while True:
+                item = self._next()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self.close()
+
+    def _next(self):
+        """Next message, raising if the process died without ending its stream."""
+        while True:
+            try:
+                return self.queue.get(timeout=PRODUCER_POLL_INTERVAL)
+            except queue.Empty:
+                if self.process.is_alive():
+                    continue
+            try:
+                # Anything it sent just before exiting is already in the pipe.
+                return self.queue.get(timeout=PRODUCER_POLL_INTERVAL)
+            except queue.Empty:
+                raise RuntimeError(
+                    f"{self.filepath}: parser process exited with code {self.process.exitcode} "
+                    "before finishing"
+                ) from None
+
+    def close(self) -> None:
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.queue.close()
+
+
+def parse_files_parallel(
+    filepaths: Iterable[str],
+    workers: Optional[int] = None,
+    engine: str = "text",
+    batch_size: int = PRODUCER_BATCH_SIZE,
+) -> Generator[LogEntry, None, None]:
+    """Parse several (possibly compressed) files, one worker process per file.
+
+    Up to *workers* files are decompressed and parsed at the same time.
+    Entries are yielded file by file in the order given; files further ahead
+    buffer at most ``PRODUCER_QUEUE_DEPTH`` batches of *batch_size* entries,
+    so memory stays bounded however large the inputs are.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown parser engine: {engine}")
+    paths = [str(p) for p in filepaths]
+    for p in paths:
+        if not Path(p).exists():
+            raise FileNotFoundError(f"Log file not found: {p}")
+
+    workers = workers or os.cpu_count() or 1
+    ctx = multiprocessing.get_context()
+    todo = iter(paths)
+    running: Deque[_FileProducer] = deque()
+    try:
+        for p in todo:
+            running.append(_FileProducer(ctx, p, engine, batch_size))
+            if len(running) >= workers:
+                break
+        while running:
+            current = running[0]
+            for batch in current.batches():
+                yield from batch
+            running.popleft()
+            nxt = next(todo, None)
+            if nxt is not None:
+                running.append(_FileProducer(ctx, nxt, engine, batch_size))
+    finally:
+        for producer in running:
+            producer.close()
+
+
+_NO_TIMESTAMP = datetime.min  # merge key for entries whose timestamp did not parse
+_GLOB_CHARS = re.compile(r"[*?[]")
+
+
+def expand_inputs(patterns: Iterable[str]) -> List[str]:
+    """Expand glob *patterns* (``*``, ``?``, ``[...]``, ``**``) into file paths.
+
+    Paths without wildcards are kept as given. Results are de-duplicated and
+    sorted per pattern; directories are skipped. Raises FileNotFoundError for
+    a pattern that matches no file.
+    """
+    paths: List[str] = []
+    for pattern in patterns:
+        if _GLOB_CHARS.search(pattern):
+            matches = sorted(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+            if not matches:
+                raise FileNotFoundError(f"No log files match: {pattern}")
+            paths.extend(matches)
+        else:
+            paths.append(pattern)
+    return list(dict.fromkeys(paths))
+
+
+def _merge_key(entry: LogEntry) -> datetime:
+    return entry.timestamp or _NO_TIMESTAMP
+
+
+def parse_files_merged(
+    filepaths: Iterable[str],
+    workers: Optional[int] = None,
+    engine: str = "text",
+    batch_size: int = PRODUCER_BATCH_SIZE,
+) -> Generator[LogEntry, None, None]:
+    """Parse several log files into one timestamp-ordered stream.
+
+    Each file is read by its own producer and the per-file streams are
+    combined with a heap-based k-way merge (``heapq.merge``), so entries from
+    different hosts interleave by time. Assuming each file is in time order
+    (as logs are), the output is too; ties keep the order of *filepaths*.
+    Entries without a timestamp are emitted as soon as they are reached.
+
+    The first *workers* files are parsed in worker processes, each buffering
+    at most ``PRODUCER_QUEUE_DEPTH`` batches of *batch_size* entries; any
+    further files are parsed lazily in this process. Memory is bounded by
+    about one buffered chunk per file, whatever the total input size.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown parser engine: {engine}")
+    paths = [str(p) for p in filepaths]
+    for p in paths:
+        if not Path(p).exists():
+            raise FileNotFoundError(f"Log file not found: {p}")
+    if len(paths) == 1:
+        yield from parse_file(paths[0], engine=engine)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    ctx = multiprocessing.get_context()
+    producers: List[_FileProducer] = []
+    streams = []
+    try:
+        for i, p in enumerate(paths):
+            if workers > 1 and i < workers:
+                producer = _FileProducer(ctx, p, engine, batch_size)
+                producers.append(producer)
+                streams.append(entry for batch in producer.batches() for entry in batch)
+            else:
+                streams.append(parse_file(p, engine=engine))
+        yield from heapq.merge(*streams, key=_merge_key)
+    finally:
+        for producer in producers:
+            producer.close()
@@ -10,61 +10,269 @@ Run (from stage_06 folder):
 from __future__ import annotations
 
 import sys
-from datetime import datetime
+from contextlib import nullcontext
+from pathlib import Path
 
 from .cli import parse_args, validate_input_file
-from .detection import run_all_detections
-from .log_parser import parse_file_to_list
-from .models import AnalysisReport
-from .reports import print_findings, print_summary, save_json_report
+from .detection import DetectionEngine
+from .log_parser import FormatStats, parse_file, parse_file_parallel, parse_file_to_batch, parse_files_merged
+from .reports import (
+    format_alert,
+    print_cache_stats,
+    print_findings,
+    print_format_stats,
+    print_profile,
+    print_summary,
+)
+
+
+def _open_geodb(args):
+    if not args.geodb:
+        return None
+    from .geodb import open_geodb
+
+    try:
+        return open_geodb(validate_input_file(args.geodb))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        raise SystemExit(1)
+
+
+def _rate_limit(args):
+    from .enrichment import DEFAULT_BATCH_RATE_LIMIT, DEFAULT_RATE_LIMIT
+
+    rate_limit = args.rate_limit
+    if rate_limit is None:
+        rate_limit = DEFAULT_BATCH_RATE_LIMIT if args.enrich_batch else DEFAULT_RATE_LIMIT
+    return rate_limit or None
+
+
+def _stage(profiler, name: str):
+    return profiler.stage(name) if profiler is not None else nullcontext()
+
+
+def _timestamp_cache_counts() -> dict:
+    from .timestamps import decode_apache, decode_auth, decode_ssh
+
+    counts = {}
+    for fn in (decode_apache, decode_ssh, decode_auth):
+        info = fn.cache_info()
+        counts[fn.__name__] = {"hits": info.hits, "misses": info.misses}
+    return counts
+
+
+def _load_signatures(args) -> None:
+    """Add signatures from --sql-signatures/--traversal-signatures/--admin-paths files."""
+    from . import detection
+
+    extra = {
+        "sql_patterns": (args.sql_signatures, detection.SQL_PATTERNS),
+        "traversal_patterns": (args.traversal_signatures, detection.TRAVERSAL_PATTERNS),
+        "admin_paths": (args.admin_paths, detection.ADMIN_PATHS),
+    }
+    lists = {
+        name: current + detection.load_signature_file(path)
+        for name, (path, current) in extra.items()
+        if path
+    }
+    if lists:
+        detection.load_signatures(**lists)
+
+
+def _run_pipeline(args, entry_stream, writer=None):
+    """Run the staged pipeline; alerts are printed (and written) while parsing continues."""
+    from .enrichment import BATCH_SIZE, make_resolver
+    from .pipeline import AnalysisPipeline
+
+    resolver = None
+    if args.enrich:
+        resolver = make_resolver(
+            rate_limit=_rate_limit(args),
+            batch=args.enrich_batch,
+            geo_mode=args.geo_mode,
+            geodb=_open_geodb(args),
+        )
+
+    def report(finding) -> None:
+        print(format_alert(finding), flush=True)
+        if writer is not None:
+            writer.alert(finding)
+
+    engine = DetectionEngine(brute_force_threshold=args.bf_threshold, brute_force_window=args.bf_window)
+    pipeline = AnalysisPipeline(
+        engine,
+        resolver=resolver,
+        enrich_workers=args.enrich_workers,
+        on_finding=report,
+        timeout=args.enrich_timeout,
+        group_size=BATCH_SIZE if args.enrich_batch else 1,
+    )
+    return engine, pipeline.run(entry_stream)
 
 
 def cmd_analyze(args) -> None:
-    input_path = validate_input_file(args.input)
+    input_paths = [validate_input_file(p) for p in args.input]
+    _load_signatures(args)
+    if not args.output:
+        _analyze(args, input_paths, None)
+        return
+
+    # The report is open before parsing starts: alerts are written as findings
+    # fire, the final findings once analysis ends.
+    from .reports import ReportWriter
+
+    with ReportWriter(args.output, args.format, args.evidence, args.evidence_cap) as writer:
+        _analyze(args, input_paths, writer)
+    print(f"\nReport saved to: {args.output}")
 
-    if args.verbose:
-        print(f"Analyzing: {input_path}")
 
-    entries = parse_file_to_list(str(input_path))
+def _analyze(args, input_paths, writer) -> None:
+    input_path = input_paths[0]
+    on_finding = writer.alert if writer is not None else None
 
     if args.verbose:
-        print(f"Parsed {len(entries)} log entries")
+        print(f"Analyzing: {', '.join(str(p) for p in input_paths)}")
+
+    profiler = None
+    if args.profile:
+        from .profiling import Profiler
+
+        profiler = Profiler()
 
-    findings = run_all_detections(entries)
+    if args.checkpoint:
+        # Only bytes appended since the last checkpointed run are parsed; the
+        # saved detector state carries the earlier counts and evidence.
+        from .checkpoint import analyze_incremental
+
+        engine, new_entries, resumed_from = analyze_incremental(
+            str(input_path),
+            brute_force_threshold=args.bf_threshold,
+            brute_force_window=args.bf_window,
+            engine=args.engine,
+            checkpoint_dir=Path(args.checkpoint_dir) if args.checkpoint_dir else None,
+        )
+        total_entries = engine.entries_seen
+        findings = engine.findings()
+        if args.verbose:
+            if resumed_from:
+                print(f"Resumed at byte {resumed_from}: parsed {new_entries} new log entries ({total_entries} total)")
+            else:
+                print(f"Parsed {total_entries} log entries")
+    else:
+        format_stats = FormatStats() if args.mixed else None
+        if len(input_paths) > 1:
+            entry_stream = parse_files_merged(
+                [str(p) for p in input_paths], workers=args.workers, engine=args.engine
+            )
+        elif args.workers > 1:
+            entry_stream = parse_file_parallel(str(input_path), workers=args.workers, engine=args.engine)
+        else:
+            entry_stream = parse_file(str(input_path), engine=args.engine, mixed=args.mixed, stats=format_stats)
+
+        engine_cls = DetectionEngine
+        if profiler is not None:
+            from .profiling import TimedDetectionEngine
+
+            entry_stream = profiler.timed(entry_stream, "parse")
+            engine_cls = TimedDetectionEngine
+
+        if args.pipeline:
+            engine, findings = _run_pipeline(args, entry_stream, writer)
+            total_entries = engine.entries_seen
+            if args.verbose:
+                print(f"Parsed {total_entries} log entries")
+        elif args.stream:
+            # Detection consumes the parser generator directly; only per-IP
+            # counters and capped evidence are kept.
+            with _stage(profiler, "detect") as st:
+                engine = engine_cls(
+                    brute_force_threshold=args.bf_threshold,
+                    brute_force_window=args.bf_window,
+                ).feed_all(entry_stream, on_finding)
+                findings = engine.findings()
+            total_entries = engine.entries_seen
+            if args.verbose:
+                print(f"Parsed {total_entries} log entries")
+        else:
+            entries = list(entry_stream)
+            total_entries = len(entries)
+            if args.verbose:
+                print(f"Parsed {total_entries} log entries")
+            with _stage(profiler, "detect") as st:
+                engine = engine_cls(
+                    brute_force_threshold=args.bf_threshold,
+                    brute_force_window=args.bf_window,
+                ).feed_all(entries, on_finding)
+                findings = engine.findings()
+        if format_stats is not None and args.verbose:
+            print_format_stats(format_stats.to_dict())
+        if profiler is not None:
+            st.items = total_entries
+            engine.report_to(profiler)
+            if format_stats is not None:
+                profiler.count(
+                    "lines_rejected",
+                    {t.value: format_stats.rejected(t) for t in format_stats.FORMATS} | {"unknown": format_stats.unrouted},
+                )
+            profiler.count("timestamp_cache", _timestamp_cache_counts())
 
     if args.verbose:
         print(f"Found {len(findings)} security findings")
 
-    if args.enrich:
+    if args.enrich and not args.pipeline:
         from .enrichment import enrich_findings
 
-        findings = enrich_findings(findings)
+        with _stage(profiler, "enrich") as st:
+            findings = enrich_findings(
+                findings,
+                max_workers=args.enrich_workers,
+                rate_limit=_rate_limit(args),
+                timeout=args.enrich_timeout,
+                batch=args.enrich_batch,
+                geo_mode=args.geo_mode,
+                geodb=_open_geodb(args),
+            )
+        if profiler is not None:
+            st.items = len({f.source_ip for f in findings})
+    if args.enrich:
+        from .cache import get_cache, save_cache_stats
 
-    summary = {
-        "critical": sum(1 for f in findings if f.severity.value == "critical"),
-        "high": sum(1 for f in findings if f.severity.value == "high"),
-        "medium": sum(1 for f in findings if f.severity.value == "medium"),
-        "low": sum(1 for f in findings if f.severity.value == "low"),
-    }
+        if profiler is not None:
+            profiler.count("cache", get_cache().stats.to_dict()["counters"])
+        save_cache_stats()
 
-    report = AnalysisReport(
-        total_entries=len(entries),
-        findings=findings,
-        summary=summary,
-        analysis_time=datetime.now(),
-    )
+    with _stage(profiler, "report") as st:
+        print_findings(findings)
+    profile = None
+    if profiler is not None:
+        st.items = len(findings)
+        profiler.count("entries", total_entries)
+        profiler.count("findings", len(findings))
+        profile = profiler.to_dict()
 
-    print_findings(findings)
-
-    if args.output:
-        save_json_report(report, args.output)
-        print(f"\nReport saved to: {args.output}")
+    if writer is not None:
+        writer.write_all(findings).close(total_entries, profile=profile)
+    if profile is not None:
+        print_profile(profile)
 
 
 def cmd_summary(args) -> None:
     input_path = validate_input_file(args.input)
-    entries = parse_file_to_list(str(input_path))
-    print_summary(entries)
+    if not args.profile:
+        print_summary(parse_file_to_batch(str(input_path), engine=args.engine))
+        return
+
+    from .profiling import Profiler
+
+    profiler = Profiler()
+    with profiler.stage("parse") as st:
+        batch = parse_file_to_batch(str(input_path), engine=args.engine)
+        st.items = len(batch)
+    with profiler.stage("summarize") as st:
+        print_summary(batch)
+        st.items = len(batch)
+    profiler.count("timestamp_cache", _timestamp_cache_counts())
+    print_profile(profiler.to_dict())
 
 
 def cmd_cache_clear(args) -> None:
@@ -76,18 +284,179 @@ def cmd_cache_clear(args) -> None:
             print("Cancelled.")
             return
     removed = cache_clear()
-    print(f"Cache cleared. Removed {removed} file(s).")
+    print(f"Cache cleared. Removed {removed} entr{'y' if removed == 1 else 'ies'}.")
+
+
+def cmd_watch(args) -> None:
+    import json
+    from pathlib import Path
+
+    from .reports import finding_to_dict
+    from .watch import DEFAULT_MIN_INTERVAL, LogWatcher
+
+    if Path(args.input).exists():
+        validate_input_file(args.input)
+    _load_signatures(args)
+
+    alerts = 0
+
+    def emit(finding) -> None:
+        nonlocal alerts
+        alerts += 1
+        if args.json:
+            print(json.dumps(finding_to_dict(finding)), flush=True)
+        else:
+            print(format_alert(finding), flush=True)
+
+    watcher = LogWatcher(
+        args.input,
+        engine=DetectionEngine(
+            brute_force_threshold=args.bf_threshold, brute_force_window=args.bf_window, forget_fired=True
+        ),
+        on_finding=emit,
+        from_start=args.from_start,
+        min_interval=min(DEFAULT_MIN_INTERVAL, args.interval),
+        max_interval=args.interval,
+    )
+    print(f"Watching {args.input} (Ctrl+C to stop)", file=sys.stderr)
+    engine = watcher.run()
+    print(
+        f"\nStopped. {engine.entries_seen} entries processed, {alerts} alerts.",
+        file=sys.stderr,
+    )
+
+
+def cmd_geodb_build(args) -> None:
+    from .geodb import build_geodb
+
+    csv_path = validate_input_file(args.csv)
+    try:
+        count = build_geodb(csv_path, args.output)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        raise SystemExit(1)
+    print(f"Geo database written to {args.output} ({count} ranges).")
+
+
+def cmd_cache_stats(args) -> None:
+    import json
+
+    from .cache import get_backend, load_cache_stats, reset_cache_stats
+
+    if args.reset:
+        reset_cache_stats()
+        print("Cache statistics reset.")
+        return
+    stats = load_cache_stats().to_dict()
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return
+    backend = get_backend()
+    print_cache_stats(stats, backend.name, backend.count())
+
+
+def cmd_ingest(args) -> None:
+    import time
+
+    from .store import EventStore
+
+    total = 0
+    start = time.perf_counter()
+    with EventStore(args.store and Path(args.store)) as store:
+        for filepath in args.input:
+            validate_input_file(filepath)
+            added, stored = store.ingest(
+                filepath,
+                brute_force_threshold=args.bf_threshold,
+                brute_force_window=args.bf_window,
+                engine=args.engine,
+            )
+            total += added
+            print(f"{filepath}: {added:,} new entries ({stored:,} already stored)")
+        stats = store.stats()
+    print(
+        f"Ingested {total:,} entries in {time.perf_counter() - start:.2f}s. "
+        f"Store: {stats['events']:,} events, {stats['findings']:,} findings, {stats['sources']:,} source files "
+        f"({store.path})"
+    )
+
+
+def cmd_query(args) -> None:
+    import json
+    import time
+
+    from .models import LogType
+    from .store import EventStore, default_store_path
+
+    path = Path(args.store) if args.store else default_store_path()
+    if not path.exists():
+        print(f"Error: No event store at {path} (run 'securesiem ingest' first)", file=sys.stderr)
+        raise SystemExit(1)
+
+    filters = {
+        "ip": args.ip,
+        "since": args.since,
+        "until": args.until,
+        "rule": args.rule,
+        "log_type": LogType(args.log_type) if args.log_type else None,
+    }
+    start = time.perf_counter()
+    with EventStore(path) as store:
+        if args.count:
+            print(store.count(**filters))
+            matched = None
+        else:
+            matched = 0
+            for entry in store.query(**filters, limit=args.limit):
+                print(json.dumps(entry.to_dict()) if args.json else entry.raw_line)
+                matched += 1
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    shown = "" if matched is None else f"{matched} event{'' if matched == 1 else 's'} in "
+    print(f"{shown}{elapsed_ms:.1f} ms", file=sys.stderr)
 
 
 def main() -> None:
     args = parse_args()
 
+    if args.cache_backend:
+        from .cache import configure_cache
+
+        configure_cache(args.cache_backend)
+
+    dump = getattr(args, "profile_dump", None)
+    if not dump:
+        run_command(args)
+        return
+
+    import cProfile
+
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        run_command(args)
+    finally:
+        prof.disable()
+        prof.dump_stats(dump)
+        print(f"cProfile data written to {dump} (inspect with: python -m pstats {dump})", file=sys.stderr)
+
+
+def run_command(args) -> None:
     if args.command == "analyze":
         cmd_analyze(args)
     elif args.command == "summary":
         cmd_summary(args)
+    elif args.command == "watch":
+        cmd_watch(args)
     elif args.command == "cache-clear":
         cmd_cache_clear(args)
+    elif args.command == "cache-stats":
+        cmd_cache_stats(args)
+    elif args.command == "geodb-build":
+        cmd_geodb_build(args)
+    elif args.command == "ingest":
+        cmd_ingest(args)
+    elif args.command == "query":
+        cmd_query(args)
     else:
         print(f"Unknown command: {args.command}", file=sys.stderr)
         raise SystemExit(1)
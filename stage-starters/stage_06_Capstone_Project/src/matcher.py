@@ -0,0 +1,173 @@
+"""Multi-pattern string matching for SecureSIEM detections.
+
+Detection rules look for any of a list of literal signatures inside a request
+line. Testing each signature with ``in`` costs one scan per signature, which
+gets slow once rule sets grow to WAF-style sizes (hundreds or thousands of
+signatures).
+
+:class:`MultiPatternMatcher` compiles the signatures once into an
+Aho-Corasick automaton and then finds every signature in a single left-to-right
+scan of the text, no matter how many signatures there are.
+
+Implementation notes:
+- The trie and failure links are built eagerly in ``__init__``.
+- Transitions are resolved lazily and memoized per state, so the automaton
+  turns into a DFA over the characters that actually appear in the logs.
+- ``ignore_case=True`` lowercases the signatures at build time and the text
+  once per scan.
+- For small signature sets (fewer than ``AUTOMATON_MIN_PATTERNS``) a pure
+  Python automaton loses to a handful of C-level ``in`` checks, so the matcher
+  uses those instead. Results are the same either way.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+AUTOMATON_MIN_PATTERNS = 64
+
+
+class MultiPatternMatcher:
+    """Aho-Corasick automaton over a fixed set of literal patterns.
+
+    *tags* optionally labels each pattern (same length as *patterns*) so that a
+    single automaton can serve several rules; see :meth:`tags_in`.
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[str],
+        ignore_case: bool = False,
+        tags: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.patterns: List[str] = list(patterns)
+        self.ignore_case = ignore_case
+        if tags is not None and len(tags) != len(self.patterns):
+            raise ValueError("tags must have the same length as patterns")
+        self.tags: List[Optional[str]] = list(tags) if tags is not None else [None] * len(self.patterns)
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        # (pattern, tag) pairs for the small-set path, deduplicated after
+        # case folding.
+        self._literals: List[Tuple[str, Optional[str]]] = []
+        seen: Set[Tuple[str, Optional[str]]] = set()
+        self._all_tags: Set[str] = {t for t in self.tags if t is not None}
+        self.use_automaton = len(self.patterns) >= AUTOMATON_MIN_PATTERNS
+
+        for idx, pat in enumerate(self.patterns):
+            if ignore_case:
+                pat = pat.lower()
+            if not pat:
+                raise ValueError("patterns must be non-empty")
+            if (pat, self.tags[idx]) not in seen:
+                seen.add((pat, self.tags[idx]))
+                self._literals.append((pat, self.tags[idx]))
+            state = 0
+            for ch in pat:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state] += (idx,)
+
+        self._build_failure_links()
+        # Memoized full transition table (starts as a copy of the trie).
+        self._delta: List[Dict[str, int]] = [dict(g) for g in self._goto]
+
+    def _build_failure_links(self) -> None:
+        queue: Deque[int] = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                if state == 0:
+                    continue  # depth-1 nodes fail to the root
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._goto[f].get(ch, 0)
+                self._out[child] += self._out[self._fail[child]]
+
+    def _resolve(self, state: int, ch: str) -> int:
+        s = state
+        while s and ch not in self._goto[s]:
+            s = self._fail[s]
+        nxt = self._goto[s].get(ch, 0)
+        self._delta[state][ch] = nxt
+        return nxt
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def search(self, text: str) -> bool:
+        """Return True if any pattern occurs in *text* (stops at the first hit)."""
+        if self.ignore_case:
+            text = text.lower()
+        if not self.use_automaton:
+            for pat, _ in self._literals:
+                if pat in text:
+                    return True
+            return False
+        delta = self._delta
+        out = self._out
+        state = 0
+        for ch in text:
+            nxt = delta[state].get(ch)
+            state = self._resolve(state, ch) if nxt is None else nxt
+            if out[state]:
+                return True
+        return False
+
+    def find_all(self, text: str) -> List[Tuple[int, str]]:
+        """Return ``(start_index, pattern)`` for every occurrence in *text*."""
+        if self.ignore_case:
+            text = text.lower()
+        delta = self._delta
+        out = self._out
+        state = 0
+        hits: List[Tuple[int, str]] = []
+        for i, ch in enumerate(text):
+            nxt = delta[state].get(ch)
+            state = self._resolve(state, ch) if nxt is None else nxt
+            for idx in out[state]:
+                pat = self.patterns[idx]
+                hits.append((i - len(pat) + 1, pat))
+        return hits
+
+    def tags_in(self, text: str) -> Set[str]:
+        """Return the set of tags whose patterns occur in *text*.
+
+        Scanning stops early once every tag has been seen.
+        """
+        if self.ignore_case:
+            text = text.lower()
+        tags = self.tags
+        all_tags = self._all_tags
+        found: Set[str] = set()
+        if not self.use_automaton:
+            for pat, tag in self._literals:
+                if tag is not None and tag not in found and pat in text:
+                    found.add(tag)
+            return found
+        delta = self._delta
+        out = self._out
+        state = 0
+        for ch in text:
+            nxt = delta[state].get(ch)
+            state = self._resolve(state, ch) if nxt is None else nxt
+            for idx in out[state]:
+                tag = tags[idx]
+                if tag is not None:
+                    found.add(tag)
+            if out[state] and found == all_tags:
+                break
+        return found
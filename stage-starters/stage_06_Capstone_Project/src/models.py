@@ -2,15 +2,41 @@
 
 This module defines the core data structures used throughout SecureSIEM.
 
-We use dataclasses for clarity and to reduce boilerplate.
+We use dataclasses for clarity and to reduce boilerplate. The one exception is
+:class:`LogEntry`, which can exist tens of millions of times per run and is
+therefore a hand-written slotted class (see its docstring).
 """
 
 from __future__ import annotations
 
+import sys
+from array import array
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+
+def ipv4_to_int(ip: str) -> Optional[int]:
+    """Pack a dotted-quad IPv4 string into an int (None if not valid IPv4)."""
+    parts = ip.split(".")
+    if len(parts) != 4:
+        return None
+    n = 0
+    for part in parts:
+        if not (part.isascii() and part.isdigit()):
+            return None
+        value = int(part)
+        if value > 255:
+            return None
+        n = (n << 8) | value
+    return n
+
+
+def int_to_ipv4(n: int) -> str:
+    """Unpack an int produced by :func:`ipv4_to_int` back into dotted-quad form."""
+    return f"{(n >> 24) & 255}.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
 
 
 class LogType(Enum):
@@ -31,18 +57,141 @@ class Severity(Enum):
     CRITICAL = "critical"
 
 
-@dataclass
 class LogEntry:
-    """Represents a single parsed log entry."""
+    """Represents a single parsed log entry.
 
-    timestamp: Optional[datetime]
-    source_ip: str
-    log_type: LogType
-    raw_line: str
-    user: Optional[str] = None
-    action: Optional[str] = None
-    status: Optional[str] = None
-    details: Optional[str] = None
+    Behaves like a plain dataclass (same constructor, attributes, equality and
+    repr) but is built to stay small at tens of millions of instances:
+
+    - ``__slots__`` instead of a per-instance ``__dict__``
+    - ``source_ip``, ``user`` and ``status`` are interned, so repeated values
+      share one string object
+    - ``raw_line`` can be lazy: pass ``raw_line=None`` with ``raw_source`` (file
+      path) and ``raw_offset`` (byte offset of the line) and the line is read
+      back from disk only when accessed. Lazy lines are not cached, so use
+      them for workloads that rarely touch ``raw_line``.
+
+    The packed IPv4 form of ``source_ip`` is available as :attr:`ip_int`.
+    """
+
+    __slots__ = (
+        "timestamp",
+        "source_ip",
+        "log_type",
+        "_raw_line",
+        "user",
+        "action",
+        "status",
+        "details",
+        "raw_source",
+        "raw_offset",
+    )
+
+    def __init__(
+        self,
+        timestamp: Optional[datetime],
+        source_ip: str,
+        log_type: LogType,
+        raw_line: Optional[str],
+        user: Optional[str] = None,
+        action: Optional[str] = None,
+        status: Optional[str] = None,
+        details: Optional[str] = None,
+        raw_source: Optional[str] = None,
+        raw_offset: Optional[int] = None,
+    ) -> None:
+        self.timestamp = timestamp
+        self.source_ip = sys.intern(source_ip)
+        self.log_type = log_type
+        self._raw_line = raw_line
+        self.user = None if user is None else sys.intern(user)
+        self.action = action
+        self.status = None if status is None else sys.intern(status)
+        self.details = details
+        self.raw_source = raw_source
+        self.raw_offset = raw_offset
+
+    @property
+    def raw_line(self) -> str:
+        if self._raw_line is not None or self.raw_source is None:
+            return self._raw_line or ""
+        with open(self.raw_source, "rb") as f:
+            f.seek(self.raw_offset or 0)
+            return f.readline().strip().decode("utf-8", errors="ignore")
+
+    @raw_line.setter
+    def raw_line(self, value: str) -> None:
+        self._raw_line = value
+
+    @property
+    def ip_int(self) -> Optional[int]:
+        """``source_ip`` packed into an int (None if it is not valid IPv4)."""
+        return ipv4_to_int(self.source_ip)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form (lazy raw lines are read in)."""
+        return {
+            "timestamp": self.timestamp.isoformat() if self.timestamp else None,
+            "source_ip": self.source_ip,
+            "log_type": self.log_type.value,
+            "raw_line": self.raw_line,
+            "user": self.user,
+            "action": self.action,
+            "status": self.status,
+            "details": self.details,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LogEntry":
+        """Inverse of :meth:`to_dict`."""
+        ts = data.get("timestamp")
+        return cls(
+            timestamp=datetime.fromisoformat(ts) if ts else None,
+            source_ip=data["source_ip"],
+            log_type=LogType(data["log_type"]),
+            raw_line=data.get("raw_line", ""),
+            user=data.get("user"),
+            action=data.get("action"),
+            status=data.get("status"),
+            details=data.get("details"),
+        )
+
+    def _key(self) -> Tuple[Any, ...]:
+        return (
+            self.timestamp,
+            self.source_ip,
+            self.log_type,
+            self.raw_line,
+            self.user,
+            self.action,
+            self.status,
+            self.details,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._key() == other._key()  # type: ignore[attr-defined]
+
+    __hash__ = None  # mutable, like a non-frozen dataclass
+
+    def __reduce__(self):
+        # Positional constructor args pickle far faster than the generic
+        # slots protocol, which matters when worker processes ship entries.
+        return (
+            LogEntry,
+            (
+                self.timestamp, self.source_ip, self.log_type, self._raw_line, self.user,
+                self.action, self.status, self.details, self.raw_source, self.raw_offset,
+            ),
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"LogEntry(timestamp={self.timestamp!r}, source_ip={self.source_ip!r}, "
+            f"log_type={self.log_type!r}, raw_line={self.raw_line!r}, user={self.user!r}, "
+            f"action={self.action!r}, status={self.status!r}, details={self.details!r})"
+        )
 
 
 @dataclass
@@ -65,3 +214,119 @@ class AnalysisReport:
     findings: List[Finding]
     summary: Dict[str, int]
     analysis_time: datetime = field(default_factory=datetime.now)
+    profile: Optional[Dict[str, Any]] = None  # see src.profiling.Profiler.to_dict
+
+
+INVALID_IPV4 = 0xFFFFFFFF  # stored for source IPs that are not valid IPv4
+NO_TIMESTAMP = -(2**63)  # stored for entries whose timestamp failed to parse
+_EPOCH = datetime(1970, 1, 1)
+_LOG_TYPES: List[LogType] = list(LogType)
+_LOG_TYPE_CODES: Dict[LogType, int] = {t: i for i, t in enumerate(_LOG_TYPES)}
+
+
+class LogBatch:
+    """Columnar, array-backed store for the fields most passes actually need.
+
+    Each entry becomes one row across parallel ``array`` columns:
+
+    - ``ips``: uint32 packed IPv4 (``INVALID_IPV4`` otherwise; the original
+      strings of those rows are counted in :attr:`other_ips`, so per-IP
+      counts match counting the source strings)
+    - ``timestamps``: int64 epoch seconds (``NO_TIMESTAMP`` if missing)
+    - ``log_types``: small-int code into ``list(LogType)``
+    - ``statuses`` / ``actions``: dictionary-encoded codes into
+      :attr:`status_values` / :attr:`action_values`
+
+    Counting over these columns runs in C (``Counter``/``set`` over arrays)
+    instead of a Python loop over objects. Raw lines are not stored.
+    """
+
+    def __init__(self) -> None:
+        self.ips = array("I")
+        self.timestamps = array("q")
+        self.log_types = array("B")
+        self.statuses = array("I")
+        self.actions = array("I")
+        self.other_ips: Dict[str, int] = {}
+        self.status_values: List[Optional[str]] = []
+        self.action_values: List[Optional[str]] = []
+        self._status_codes: Dict[Optional[str], int] = {}
+        self._action_codes: Dict[Optional[str], int] = {}
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[LogEntry]) -> "LogBatch":
+        batch = cls()
+        batch.extend(entries)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.log_types)
+
+    @staticmethod
+    def _encode(value: Optional[str], codes: Dict[Optional[str], int], values: List[Optional[str]]) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def append(self, entry: LogEntry) -> None:
+        self.append_row(entry.source_ip, entry.timestamp, entry.log_type, entry.status, entry.action)
+
+    def append_row(
+        self,
+        source_ip: str,
+        timestamp: Optional[datetime],
+        log_type: LogType,
+        status: Optional[str],
+        action: Optional[str],
+    ) -> None:
+        """Append one row from its field values, without building a LogEntry."""
+        ip = ipv4_to_int(source_ip)
+        if ip is None or int_to_ipv4(ip) != source_ip:
+            # Not IPv4, or not in canonical form ("010.0.0.1"): packing would
+            # lose the string, so keep it aside.
+            self.other_ips[source_ip] = self.other_ips.get(source_ip, 0) + 1
+            ip = INVALID_IPV4
+        self.ips.append(ip)
+        self.timestamps.append(NO_TIMESTAMP if timestamp is None else int((timestamp - _EPOCH).total_seconds()))
+        self.log_types.append(_LOG_TYPE_CODES[log_type])
+        self.statuses.append(self._encode(status, self._status_codes, self.status_values))
+        self.actions.append(self._encode(action, self._action_codes, self.action_values))
+
+    def extend(self, entries: Iterable[LogEntry]) -> None:
+        append = self.append
+        for e in entries:
+            append(e)
+
+    def count_by_log_type(self) -> Dict[LogType, int]:
+        return {_LOG_TYPES[code]: n for code, n in Counter(self.log_types).items()}
+
+    def count_by_status(self) -> Dict[Optional[str], int]:
+        return {self.status_values[code]: n for code, n in Counter(self.statuses).items()}
+
+    def count_by_ip(self) -> Dict[str, int]:
+        counts = Counter(self.ips)
+        if self.other_ips:
+            counts[INVALID_IPV4] -= sum(self.other_ips.values())
+        out = {int_to_ipv4(ip): n for ip, n in counts.items() if n}
+        out.update(self.other_ips)
+        return out
+
+    def unique_ip_count(self) -> int:
+        unique = len(set(self.ips))
+        if self.other_ips:
+            # INVALID_IPV4 is also a real address (255.255.255.255); drop it
+            # only if every row holding it was a stand-in.
+            if self.ips.count(INVALID_IPV4) == sum(self.other_ips.values()):
+                unique -= 1
+            unique += len(self.other_ips)
+        return unique
+
+    @staticmethod
+    def log_type_code(log_type: LogType) -> int:
+        return _LOG_TYPE_CODES[log_type]
+
+    def status_code(self, status: Optional[str]) -> Optional[int]:
+        """Dictionary code for *status*, or None if it never occurs."""
+        return self._status_codes.get(status)
@@ -0,0 +1,272 @@
+"""Staged analyze pipeline for SecureSIEM (``analyze --pipeline``).
+
+Parsing, detection, enrichment and reporting run at the same time and hand
+work on through bounded queues, so a slow stage applies backpressure instead
+of letting the others buffer without limit::
+
+    parse (thread) -> detect (caller) -> enrich (worker threads) -> report (thread)
+
+- the parser thread drains any entry stream (including ones fed by producer
+  processes) and queues batches of up to ``ENTRY_BATCH_SIZE`` entries (a
+  partial batch is sent after ``FLUSH_INTERVAL`` when input is slow)
+- detection feeds a :class:`DetectionEngine`; a finding moves downstream the
+  moment its threshold is crossed, not when the input ends
+- enrichment workers look up each finding's IP while parsing continues, so
+  network waits overlap with parsing; every IP is resolved once however many
+  findings share it, and queued findings are taken in groups so batch
+  lookups stay full
+- the reporter passes each enriched finding to a callback (e.g. to print an
+  alert) as soon as it is ready
+
+Wall time therefore approaches that of the slowest stage rather than the sum
+of all of them. The findings returned at the end come from the engine once
+the input is exhausted, so their counts and evidence cover the whole input;
+their geo info was resolved along the way.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .detection import DetectionEngine
+from .enrichment import BATCH_SIZE, DEFAULT_MAX_WORKERS, Resolver
+from .models import Finding, LogEntry
+
+
+ENTRY_BATCH_SIZE = 1000  # entries per message from the parser thread
+FLUSH_INTERVAL = 0.05  # seconds a partial batch may wait while input trickles in
+QUEUE_DEPTH = 64  # messages each inter-stage queue may hold
+_POLL = 0.1  # seconds between checks for a failed stage while blocked
+
+_DONE = object()  # end-of-stream marker
+
+
+class AnalysisPipeline:
+    """Run parse, detect, enrich and report as concurrent stages.
+
+    *resolver* (see :func:`~src.enrichment.make_resolver`) enables the
+    enrichment stage with *enrich_workers* threads; *group_size* findings at
+    most are resolved per call (use ``BATCH_SIZE`` with a batch resolver).
+    *timeout* (seconds from the start of :meth:`run`) stops further lookups;
+    findings are still reported, without geo info. *on_finding* is called
+    from the reporter thread with every finding as it fires.
+
+    If any stage raises, the other stages stop and :meth:`run` re-raises the
+    first error.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[DetectionEngine] = None,
+        resolver: Optional[Resolver] = None,
+        enrich_workers: int = DEFAULT_MAX_WORKERS,
+        on_finding: Optional[Callable[[Finding], Any]] = None,
+        timeout: Optional[float] = None,
+        group_size: int = 1,
+        queue_depth: int = QUEUE_DEPTH,
+        batch_size: int = ENTRY_BATCH_SIZE,
+    ) -> None:
+        if enrich_workers < 1 or group_size < 1 or queue_depth < 1 or batch_size < 1:
+            raise ValueError("workers, group size, queue depth and batch size must be at least 1")
+        self.engine = engine or DetectionEngine()
+        self.resolver = resolver
+        self.enrich_workers = enrich_workers
+        self.on_finding = on_finding
+        self.timeout = timeout
+        self.group_size = min(group_size, BATCH_SIZE) if resolver is not None else group_size
+        self.queue_depth = queue_depth
+        self.batch_size = batch_size
+
+        self.ip_info: Dict[str, Optional[Dict]] = {}
+        self.alerts = 0
+        self._pending: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._deadline: Optional[float] = None
+
+    # -- queue helpers ------------------------------------------------------
+
+    def _fail(self, exc: BaseException) -> None:
+        self._errors.append(exc)
+        self._stop.set()
+
+    def _put(self, q: "queue.Queue[Any]", item: Any) -> bool:
+        """Blocking put that gives up (returns False) once a stage has failed."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: "queue.Queue[Any]") -> Any:
+        """Blocking get that returns ``_DONE`` once a stage has failed."""
+        while True:
+            try:
+                return q.get(timeout=_POLL)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return _DONE
+
+    def _take(self, q: "queue.Queue[Any]") -> Tuple[List[Finding], bool]:
+        """Wait for one finding, then grab whatever else is queued (up to group_size)."""
+        first = self._get(q)
+        if first is _DONE:
+            return [], True
+        group = [first]
+        while len(group) < self.group_size:
+            try:
+                item = q.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return group, True
+            group.append(item)
+        return group, False
+
+    # -- stages -------------------------------------------------------------
+
+    def _parse(self, entries: Iterable[LogEntry], out_q: "queue.Queue[Any]") -> None:
+        try:
+            batch: List[LogEntry] = []
+            monotonic = time.monotonic
+            flush_at = monotonic() + FLUSH_INTERVAL
+            for e in entries:
+                batch.append(e)
+                if len(batch) >= self.batch_size or monotonic() >= flush_at:
+                    if not self._put(out_q, batch):
+                        return
+                    batch = []
+                    flush_at = monotonic() + FLUSH_INTERVAL
+            if batch:
+                self._put(out_q, batch)
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            close = getattr(entries, "close", None)
+            if close is not None:
+                close()  # stop producer processes if we ended early
+            self._put(out_q, _DONE)
+
+    def _detect(self, in_q: "queue.Queue[Any]", out_q: Optional["queue.Queue[Any]"]) -> None:
+        feed = self.engine.feed
+        while True:
+            batch = self._get(in_q)
+            if batch is _DONE:
+                return
+            for e in batch:
+                for finding in feed(e):
+                    self.alerts += 1
+                    if out_q is not None and not self._put(out_q, finding):
+                        return
+
+    def _resolve(self, ips: List[str]) -> None:
+        """Resolve *ips* into ``ip_info``; IPs already in flight are waited for."""
+        owned: List[str] = []
+        waiting: List[threading.Event] = []
+        with self._lock:
+            for ip in dict.fromkeys(ips):
+                if ip in self.ip_info:
+                    continue
+                event = self._pending.get(ip)
+                if event is None:
+                    self._pending[ip] = threading.Event()
+                    owned.append(ip)
+                else:
+                    waiting.append(event)
+
+        if owned:
+            results: Dict[str, Optional[Dict]] = {}
+            try:
+                remaining = None if self._deadline is None else self._deadline - time.monotonic()
+                if remaining is None or remaining > 0:
+                    results = self.resolver(owned, remaining)
+            finally:
+                with self._lock:
+                    for ip in owned:
+                        self.ip_info[ip] = results.get(ip)
+                        self._pending.pop(ip).set()
+        for event in waiting:
+            event.wait()
+
+    def _enrich(self, in_q: "queue.Queue[Any]", out_q: Optional["queue.Queue[Any]"]) -> None:
+        try:
+            done = False
+            while not done:
+                group, done = self._take(in_q)
+                if not group:
+                    continue
+                self._resolve([f.source_ip for f in group])
+                for f in group:
+                    info = self.ip_info.get(f.source_ip)
+                    if info:
+                        f.geo_info = info
+                    if out_q is not None and not self._put(out_q, f):
+                        return
+        except BaseException as exc:
+            self._fail(exc)
+
+    def _report(self, in_q: "queue.Queue[Any]") -> None:
+        try:
+            while True:
+                finding = self._get(in_q)
+                if finding is _DONE:
+                    return
+                self.on_finding(finding)
+        except BaseException as exc:
+            self._fail(exc)
+
+    # -- driver -------------------------------------------------------------
+
+    def run(self, entries: Iterable[LogEntry]) -> List[Finding]:
+        """Process *entries* through every stage; return the final findings."""
+        self._deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        entry_q: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_depth)
+        enrich_q: Optional["queue.Queue[Any]"] = None
+        report_q: Optional["queue.Queue[Any]"] = None
+        if self.on_finding is not None:
+            report_q = queue.Queue(maxsize=self.queue_depth)
+        if self.resolver is not None:
+            enrich_q = queue.Queue(maxsize=self.queue_depth)
+
+        def start(target: Callable[..., None], *args: Any, name: str) -> threading.Thread:
+            t = threading.Thread(target=target, args=args, name=f"securesiem-{name}", daemon=True)
+            t.start()
+            return t
+
+        reporter = start(self._report, report_q, name="report") if report_q is not None else None
+        enrichers = [
+            start(self._enrich, enrich_q, report_q, name=f"enrich-{i}")
+            for i in range(self.enrich_workers if enrich_q is not None else 0)
+        ]
+        parser = start(self._parse, entries, entry_q, name="parse")
+
+        try:
+            self._detect(entry_q, enrich_q if enrich_q is not None else report_q)
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            parser.join()
+            # Downstream stages drain their queues, then stop at the marker.
+            for _ in enrichers:
+                self._put(enrich_q, _DONE)
+            for t in enrichers:
+                t.join()
+            if reporter is not None:
+                self._put(report_q, _DONE)
+                reporter.join()
+        if self._errors:
+            raise self._errors[0]
+
+        findings = self.engine.findings()
+        if self.resolver is not None:
+            for f in findings:
+                info = self.ip_info.get(f.source_ip)
+                if info:
+                    f.geo_info = info
+        return findings
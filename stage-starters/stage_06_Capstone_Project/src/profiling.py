@@ -0,0 +1,183 @@
+"""Per-stage profiling for SecureSIEM (``--profile``).
+
+A :class:`Profiler` records, for each stage of a run (parse, detect, enrich,
+report, ...):
+
+- wall-clock and CPU time (``time.perf_counter`` / ``time.process_time``)
+- items handled and the resulting rate (entries per second)
+- peak resident set size of this process when the stage ended
+
+Stage times are exclusive: when parsing happens lazily inside detection
+(``--stream``), the time spent pulling entries out of the parser is charged
+to ``parse`` and taken out of ``detect``. :class:`TimedDetectionEngine`
+additionally splits detection time per rule, and free-form counters (lines
+rejected per format, cache hits, timestamp cache hits) ride along.
+
+CPU time and peak RSS cover this process only; parser worker processes
+(``--workers``) are not included. Peak RSS is unavailable on platforms
+without the :mod:`resource` module (Windows).
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, List, Optional, TypeVar
+
+from .detection import DetectionEngine
+from .models import Finding, LogEntry
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+
+T = TypeVar("T")
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Peak resident set size of this process in KiB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # bytes on macOS
+
+
+@dataclass
+class StageStats:
+    """Timings for one stage (``cpu``/``peak_rss_kb`` are None for breakdown rows)."""
+
+    name: str
+    wall: float = 0.0
+    cpu: Optional[float] = 0.0
+    items: int = 0
+    peak_rss_kb: Optional[int] = None
+
+    @property
+    def rate(self) -> float:
+        return self.items / self.wall if self.wall > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "wall_s": round(self.wall, 6),
+            "cpu_s": None if self.cpu is None else round(self.cpu, 6),
+            "items": self.items,
+            "items_per_s": round(self.rate, 1),
+            "peak_rss_kb": self.peak_rss_kb,
+        }
+
+
+class Profiler:
+    """Collect per-stage timings and counters for one run."""
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Dict[str, Any] = {}
+        self._nested_wall = 0.0
+        self._nested_cpu = 0.0
+
+    def _stage(self, name: str) -> StageStats:
+        st = self.stages.get(name)
+        if st is None:
+            st = self.stages[name] = StageStats(name)
+        return st
+
+    def _charge(self, st: StageStats, wall: float, cpu: float) -> None:
+        st.wall += wall
+        st.cpu += cpu
+        self._nested_wall += wall
+        self._nested_cpu += cpu
+        st.peak_rss_kb = peak_rss_kb()
+
+    @contextmanager
+    def stage(self, name: str, items: int = 0) -> Generator[StageStats, None, None]:
+        """Time the enclosed block as stage *name*; set ``.items`` on the yielded stats."""
+        st = self._stage(name)
+        st.items += items
+        nested_wall, nested_cpu = self._nested_wall, self._nested_cpu
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield st
+        finally:
+            wall = time.perf_counter() - wall0 - (self._nested_wall - nested_wall)
+            cpu = time.process_time() - cpu0 - (self._nested_cpu - nested_cpu)
+            self._charge(st, wall, cpu)
+
+    def timed(self, iterable: Iterable[T], name: str) -> Iterator[T]:
+        """Yield from *iterable*, charging the time spent producing items to *name*."""
+        return self._timed(iter(iterable), self._stage(name))
+
+    def _timed(self, it: Iterator[T], st: StageStats) -> Iterator[T]:
+        perf, proc = time.perf_counter, time.process_time
+        wall = cpu = 0.0
+        try:
+            while True:
+                w0, c0 = perf(), proc()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+                finally:
+                    wall += perf() - w0
+                    cpu += proc() - c0
+                st.items += 1
+                yield item
+        finally:
+            self._charge(st, wall, cpu)
+
+    def add_breakdown(self, name: str, wall: float, items: int = 0) -> None:
+        """Record a sub-timing of another stage (no CPU or RSS sample)."""
+        st = self._stage(name)
+        st.wall += wall
+        st.cpu = None
+        st.items += items
+
+    def count(self, name: str, value: Any) -> None:
+        self.counters[name] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        stages = [st.to_dict() for st in self.stages.values()]
+        return {
+            "stages": stages,
+            "total_wall_s": round(sum(st.wall for st in self.stages.values() if st.cpu is not None), 6),
+            "peak_rss_kb": peak_rss_kb(),
+            "counters": dict(self.counters),
+        }
+
+
+class TimedDetectionEngine(DetectionEngine):
+    """:class:`DetectionEngine` that also accumulates the time spent per rule.
+
+    Each check from :meth:`DetectionEngine.steps` is wrapped with a clock
+    read, so the rules themselves are the engine's own; directory traversal
+    and admin probing share one signature scan, so they are timed together.
+    Only used with ``--profile``.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.rule_time: Dict[str, float] = {}
+        self._checks = [self._timed_check(name, check) for name, check in self.steps()]
+
+    def _timed_check(
+        self, name: str, check: Callable[[LogEntry, List[Finding]], None]
+    ) -> Callable[[LogEntry, List[Finding]], None]:
+        rule_time = self.rule_time
+        rule_time[name] = 0.0
+        perf = time.perf_counter
+
+        def timed(e: LogEntry, fired: List[Finding]) -> None:
+            t0 = perf()
+            check(e, fired)
+            rule_time[name] += perf() - t0
+
+        return timed
+
+    def report_to(self, profiler: Profiler) -> None:
+        """Add one ``detect.<rule>`` breakdown row per timed rule."""
+        for rule, seconds in self.rule_time.items():
+            profiler.add_breakdown(f"detect.{rule}", seconds, self.entries_seen)
@@ -2,16 +2,22 @@
 
 Outputs:
 - Human-readable console report
-- JSON report (machine readable)
+- JSON or NDJSON report (machine readable), written incrementally
 """
 
 from __future__ import annotations
 
 import json
+import time
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, Iterable, List, Optional, Union
 
-from .models import AnalysisReport, Finding, LogEntry
+from .models import AnalysisReport, Finding, LogBatch, LogEntry
+
+
+REPORT_FORMATS = ("json", "ndjson")
+WRITE_BUFFER_SIZE = 1024 * 1024
+FLUSH_INTERVAL = 1.0  # seconds between flushes while findings are written
 
 
 def print_findings(findings: List[Finding]) -> None:
@@ -56,30 +62,114 @@ def print_findings(findings: List[Finding]) -> None:
     print("\n" + "=" * 60)
 
 
-def print_summary(entries: List[LogEntry]) -> None:
-    """Print quick stats about the parsed file."""
+def print_summary(entries: Union[List[LogEntry], LogBatch]) -> None:
+    """Print quick stats about the parsed file.
+
+    Accepts a list of entries or a columnar :class:`~src.models.LogBatch`
+    (counting is done over the batch columns either way).
+    """
+    batch = entries if isinstance(entries, LogBatch) else LogBatch.from_entries(entries)
+
     print("\n" + "=" * 40)
     print("LOG FILE SUMMARY")
     print("=" * 40)
-    print(f"Total Entries: {len(entries)}")
+    print(f"Total Entries: {len(batch)}")
 
-    type_counts = {}
-    for e in entries:
-        t = e.log_type.value
-        type_counts[t] = type_counts.get(t, 0) + 1
+    type_counts = {t.value: c for t, c in batch.count_by_log_type().items()}
 
     print("\nBy Log Type:")
     for t, c in sorted(type_counts.items(), key=lambda kv: kv[0]):
         print(f"  {t}: {c}")
 
-    unique_ips = {e.source_ip for e in entries}
-    print(f"\nUnique IPs: {len(unique_ips)}")
+    print(f"\nUnique IPs: {batch.unique_ip_count()}")
+    print("=" * 40)
+
+
+def print_cache_stats(stats: Dict[str, Any], backend: str, entries: int) -> None:
+    """Print enrichment cache counters and latency histograms.
+
+    *stats* is the ``to_dict()`` form of :class:`~src.cache.CacheStats`.
+    """
+    c = stats["counters"]
+    hits = c["memory_hits"] + c["disk_hits"]
+    lookups = hits + c["misses"]
+
+    print("\n" + "=" * 40)
+    print("CACHE STATISTICS")
+    print("=" * 40)
+    print(f"Backend: {backend} ({entries} entries on disk)")
+    print(f"Lookups: {lookups}")
+    if lookups:
+        print(f"  memory hits: {c['memory_hits']} ({c['memory_hits'] / lookups:.1%})")
+        print(f"  disk hits:   {c['disk_hits']} ({c['disk_hits'] / lookups:.1%})")
+        print(f"  misses:      {c['misses']} ({c['misses'] / lookups:.1%})")
+        print(f"Hit rate: {hits / lookups:.1%}")
+    print(f"Writes: {c['sets']}")
+    print(f"Memory evictions: {c['evictions']}  expirations: {c['expirations']}")
+
+    bounds = stats["latency_buckets_us"]
+    labels = [f"<={b}us" for b in bounds] + [f">{bounds[-1]}us"]
+    for op, buckets in stats["histograms"].items():
+        total = sum(buckets)
+        if not total:
+            continue
+        print(f"\nLatency ({op}, {total} calls):")
+        for label, n in zip(labels, buckets):
+            if n:
+                print(f"  {label:>10}: {n}")
+    print("=" * 40)
+
+
+def print_format_stats(stats: Dict[str, Dict[str, Any]]) -> None:
+    """Print per-format line counts from a mixed-format parse.
+
+    *stats* is the ``to_dict()`` form of :class:`~src.log_parser.FormatStats`.
+    """
+    print("\n" + "=" * 40)
+    print("FORMAT BREAKDOWN")
+    print("=" * 40)
+    print(f"{'format':<8} {'routed':>9} {'parsed':>9} {'rejected':>9} {'rate':>7}")
+    for name, row in stats.items():
+        print(
+            f"{name:<8} {row['routed']:>9} {row['parsed']:>9} {row['rejected']:>9} {row['rejection_rate']:>7.1%}"
+        )
     print("=" * 40)
 
 
-def finding_to_dict(f: Finding) -> dict:
-    """Convert a Finding to a JSON-serializable dict."""
-    return {
+def print_profile(profile: Dict[str, Any]) -> None:
+    """Print per-stage timings from :meth:`~src.profiling.Profiler.to_dict`."""
+    print("\n" + "=" * 80)
+    print("PROFILE")
+    print("=" * 80)
+    print(f"{'stage':<44} {'wall s':>8} {'cpu s':>8} {'items':>9} {'items/s':>10}")
+    for st in profile["stages"]:
+        cpu = "" if st["cpu_s"] is None else f"{st['cpu_s']:.3f}"
+        name = st["name"] if st["cpu_s"] is not None else f"  {st['name']}"
+        print(f"{name:<44} {st['wall_s']:>8.3f} {cpu:>8} {st['items']:>9} {st['items_per_s']:>10.0f}")
+    print(f"{'total':<44} {profile['total_wall_s']:>8.3f}")
+    if profile["peak_rss_kb"] is not None:
+        print(f"Peak RSS: {profile['peak_rss_kb'] / 1024:.1f} MiB")
+    for name, value in profile["counters"].items():
+        print(f"{name}: {value}")
+    print("=" * 80)
+
+
+def format_alert(finding: Finding) -> str:
+    """One-line alert for a finding that just fired (watch and pipeline modes)."""
+    stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    line = f"[{stamp}] [{finding.severity.value.upper()}] {finding.rule_name} {finding.source_ip}: {finding.description}"
+    if finding.geo_info:
+        line += f" ({finding.geo_info.get('country', 'Unknown')})"
+    return line
+
+
+def finding_to_dict(f: Finding, include_evidence: bool = False, evidence_cap: Optional[int] = None) -> dict:
+    """Convert a Finding to a JSON-serializable dict.
+
+    With *include_evidence*, the evidence entries are serialized too (at most
+    *evidence_cap* of them if given).
+    """
+    d = {
         "rule_name": f.rule_name,
         "severity": f.severity.value,
         "source_ip": f.source_ip,
@@ -87,15 +177,130 @@ def finding_to_dict(f: Finding) -> dict:
         "evidence_count": len(f.evidence),
         "geo_info": f.geo_info,
     }
+    if include_evidence:
+        evidence = f.evidence if evidence_cap is None else f.evidence[:evidence_cap]
+        d["evidence"] = [e.to_dict() for e in evidence]
+    return d
 
 
-def save_json_report(report: AnalysisReport, filepath: str) -> None:
-    """Write analysis report to JSON."""
-    payload = {
-        "generated_at": report.analysis_time.isoformat(),
-        "total_entries_analyzed": report.total_entries,
-        "summary": report.summary,
-        "findings": [finding_to_dict(f) for f in report.findings],
-    }
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2)
+class ReportWriter:
+    """Write a report incrementally, one finding at a time.
+
+    ``json`` produces the same object as before (``generated_at``,
+    ``findings``, ``total_entries_analyzed``, ``summary``, optional
+    ``profile``), but the findings array is streamed one finding per line
+    and the totals follow it. ``ndjson`` writes one ``{"record": "finding",
+    ...}`` object per line and ends with a ``{"record": "summary", ...}``
+    line.
+
+    ``analyze --output`` opens the writer before parsing. In ``ndjson``,
+    :meth:`alert` adds a ``{"record": "alert", ...}`` line the moment a
+    finding fires, so readers tailing the file see attacks while the run
+    continues (an alert's description carries the count at that moment). The
+    final findings, with full counts, evidence and geo info, are written with
+    :meth:`write_all` once analysis ends. Output goes through a
+    ``WRITE_BUFFER_SIZE`` buffer and is flushed at most every
+    ``FLUSH_INTERVAL`` seconds, and no finding is kept once written. The
+    severity summary is counted as findings are written.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        fmt: str = "json",
+        include_evidence: bool = False,
+        evidence_cap: Optional[int] = None,
+        generated_at: Optional[datetime] = None,
+    ) -> None:
+        if fmt not in REPORT_FORMATS:
+            raise ValueError(f"Unknown report format: {fmt}")
+        self.fmt = fmt
+        self.include_evidence = include_evidence
+        self.evidence_cap = evidence_cap
+        self.count = 0
+        self.summary: Dict[str, int] = dict.fromkeys(("critical", "high", "medium", "low"), 0)
+        self._encode = json.JSONEncoder(separators=(",", ":") if fmt == "ndjson" else (", ", ": ")).encode
+        self._file = open(filepath, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
+        self._flushed_at = time.monotonic()
+        stamp = (generated_at or datetime.now()).isoformat()
+        if fmt == "json":
+            self._file.write(f'{{\n  "generated_at": {self._encode(stamp)},\n  "findings": [')
+        self._generated_at = stamp
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def _emit(self, text: str) -> None:
+        self._file.write(text)
+        now = time.monotonic()
+        if now - self._flushed_at >= FLUSH_INTERVAL:
+            self._file.flush()
+            self._flushed_at = now
+
+    def alert(self, finding: Finding) -> None:
+        """Record that *finding* just fired (``ndjson`` only; ``json`` ignores alerts)."""
+        if self.fmt != "ndjson":
+            return
+        d = {
+            "record": "alert",
+            "rule_name": finding.rule_name,
+            "severity": finding.severity.value,
+            "source_ip": finding.source_ip,
+            "description": finding.description,
+        }
+        self._emit(self._encode(d) + "\n")
+
+    def write(self, finding: Finding) -> None:
+        d = finding_to_dict(finding, self.include_evidence, self.evidence_cap)
+        if self.fmt == "ndjson":
+            self._emit('{"record":"finding",' + self._encode(d)[1:] + "\n")
+        else:
+            self._emit(("\n    " if self.count == 0 else ",\n    ") + self._encode(d))
+        self.count += 1
+        sev = finding.severity.value
+        self.summary[sev] = self.summary.get(sev, 0) + 1
+
+    def write_all(self, findings: Iterable[Finding]) -> "ReportWriter":
+        for f in findings:
+            self.write(f)
+        return self
+
+    def close(
+        self,
+        total_entries: int,
+        summary: Optional[Dict[str, int]] = None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Write the totals and close the file (*summary* defaults to the counted one)."""
+        tail: Dict[str, Any] = {
+            "total_entries_analyzed": total_entries,
+            "summary": self.summary if summary is None else summary,
+        }
+        if profile is not None:
+            tail["profile"] = profile
+        if self.fmt == "ndjson":
+            record = {"record": "summary", "generated_at": self._generated_at, "findings": self.count, **tail}
+            self._file.write(self._encode(record) + "\n")
+        else:
+            self._file.write("\n  ]" if self.count else "]")
+            for key, value in tail.items():
+                self._file.write(f",\n  {self._encode(key)}: {self._encode(value)}")
+            self._file.write("\n}\n")
+        self._file.close()
+
+
+def save_json_report(
+    report: AnalysisReport,
+    filepath: str,
+    fmt: str = "json",
+    include_evidence: bool = False,
+    evidence_cap: Optional[int] = None,
+) -> None:
+    """Write analysis report to JSON (or NDJSON) through :class:`ReportWriter`."""
+    with ReportWriter(filepath, fmt, include_evidence, evidence_cap, report.analysis_time) as writer:
+        writer.write_all(report.findings)
+        writer.close(report.total_entries, report.summary, report.profile)
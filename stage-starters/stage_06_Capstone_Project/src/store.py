@@ -0,0 +1,369 @@
+"""Persistent, indexed event store for SecureSIEM (``ingest`` / ``query``).
+
+Parsed entries are loaded into a single SQLite file
+(``~/.securesiem/events.sqlite3`` or ``SECURESIEM_STORE``) so investigations
+can query them without re-parsing raw logs:
+
+- ``events``: one row per entry, with indexes on ``(source_ip, ts)``,
+  ``ts`` and ``(log_type, ts)``. ``ts`` is the entry's wall-clock time as
+  integer epoch seconds (NULL if the timestamp did not parse).
+- ``findings``: detection results per source, rule and IP, used to answer
+  ``query --rule``.
+- ``sources``: one row per log *content* ingested: the file's identity
+  (device, inode, SHA-256 of its first ``HEAD_BYTES`` decompressed bytes),
+  the byte offset reached and the serialized detector state.
+
+Ingest is incremental and never stores a line twice. A file is recognised
+by device and inode, or, failing that, by its head hash, so a log that was
+renamed (``access.log`` -> ``access.log.1``), copied or compressed by
+rotation continues where its earlier name left off. Changing the detection
+settings keeps the offset and only rebuilds the detector by replaying the
+stored events. A file whose content was replaced (truncated, or a new file
+on a reused inode) becomes a new source; the events of the old content are
+kept.
+
+Rows are inserted with ``executemany`` in batches of ``INGEST_BATCH_SIZE``,
+and each file is one transaction covering its events, findings and offset,
+so an interrupted ingest leaves nothing half-written.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .checkpoint import HEAD_BYTES, read_new_entries
+from .detection import DetectionEngine
+from .log_parser import DEFAULT_CHUNK_SIZE, compression_of, open_log_binary
+from .models import _EPOCH, LogEntry, LogType
+
+
+INGEST_BATCH_SIZE = 50_000  # rows per executemany call
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    device INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    compressed INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    head_len INTEGER NOT NULL,
+    head_hash TEXT NOT NULL,
+    engine_state TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sources_inode ON sources(device, inode);
+CREATE INDEX IF NOT EXISTS idx_sources_head ON sources(head_len, head_hash);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL REFERENCES sources(id),
+    ts INTEGER,
+    source_ip TEXT NOT NULL,
+    log_type TEXT NOT NULL,
+    user TEXT,
+    action TEXT,
+    status TEXT,
+    details TEXT,
+    raw_line TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_source ON events(source_id);
+CREATE INDEX IF NOT EXISTS idx_events_ip_ts ON events(source_ip, ts);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);
+CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events(log_type, ts);
+CREATE TABLE IF NOT EXISTS findings (
+    source_id INTEGER NOT NULL REFERENCES sources(id),
+    rule_name TEXT NOT NULL,
+    source_ip TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    description TEXT NOT NULL,
+    evidence_count INTEGER NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (source_id, rule_name, source_ip)
+);
+CREATE INDEX IF NOT EXISTS idx_findings_rule_ip ON findings(rule_name, source_ip);
+"""
+
+_EVENT_COLUMNS = "ts, source_ip, log_type, user, action, status, details, raw_line"
+
+
+def default_store_path() -> Path:
+    env = os.getenv("SECURESIEM_STORE")
+    if env:
+        return Path(env).expanduser()
+    return Path.home() / ".securesiem" / "events.sqlite3"
+
+
+def to_epoch(ts: Optional[datetime]) -> Optional[int]:
+    return None if ts is None else int((ts - _EPOCH).total_seconds())
+
+
+def _read_head(path: Path) -> bytes:
+    """First ``HEAD_BYTES`` bytes of *path*'s content (decompressed)."""
+    with open_log_binary(str(path)) as f:
+        return f.read(HEAD_BYTES)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _row_to_entry(row: tuple) -> LogEntry:
+    ts, source_ip, lt, user, action, status, details, raw_line = row
+    return LogEntry(
+        timestamp=None if ts is None else _EPOCH + timedelta(seconds=ts),
+        source_ip=source_ip,
+        log_type=LogType(lt),
+        raw_line=raw_line,
+        user=user,
+        action=action,
+        status=status,
+        details=details,
+    )
+
+
+@dataclass
+class _Source:
+    """A ``sources`` row."""
+
+    id: int
+    device: int
+    inode: int
+    compressed: bool
+    offset: int
+    head_len: int
+    head_hash: str
+    engine_state: Dict[str, Any]
+
+
+class EventStore:
+    """A SQLite event database; use as a context manager or call :meth:`close`."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path) if path else default_store_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Transactions are managed explicitly (one per ingested file).
+        self.conn = sqlite3.connect(str(self.path), isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # queries keep working during an ingest
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "EventStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # -- ingest -------------------------------------------------------------
+
+    def _sources(self, where: str, params: Iterable[Any]) -> List[_Source]:
+        rows = self.conn.execute(
+            "SELECT id, device, inode, compressed, offset, head_len, head_hash, engine_state FROM sources"
+            f" WHERE {where} ORDER BY id DESC",
+            tuple(params),
+        ).fetchall()
+        return [_Source(r[0], r[1], r[2], bool(r[3]), r[4], r[5], r[6], json.loads(r[7])) for r in rows]
+
+    def _match_source(self, st: os.stat_result, compressed: bool, head: bytes) -> Tuple[Optional[_Source], bool]:
+        """The source *st* continues, and whether it is the same file (not a copy)."""
+        # Same inode: the file itself, possibly renamed, unless its content was replaced.
+        for src in self._sources("device = ? AND inode = ?", (st.st_dev, st.st_ino))[:1]:
+            same_head = src.head_hash == _sha256(head[: src.head_len])
+            if same_head and src.compressed == compressed:
+                if st.st_size == src.offset or (not compressed and st.st_size > src.offset):
+                    return src, True
+        # Otherwise the same content under another inode: a copy or a compressed rotation.
+        lengths = self.conn.execute(
+            "SELECT DISTINCT head_len FROM sources WHERE head_len BETWEEN 1 AND ? ORDER BY head_len DESC",
+            (len(head),),
+        ).fetchall()
+        for (head_len,) in lengths:
+            for src in self._sources("head_len = ? AND head_hash = ?", (head_len, _sha256(head[:head_len]))):
+                if compressed or src.compressed or src.offset <= st.st_size:
+                    return src, False
+        return None, False
+
+    def _replay(self, source_id: int, config: Dict[str, Any]) -> DetectionEngine:
+        """A detector with *config* that has seen every stored event of *source_id*."""
+        detector = DetectionEngine(**config)
+        rows = self.conn.execute(
+            f"SELECT {_EVENT_COLUMNS} FROM events WHERE source_id = ? ORDER BY id", (source_id,)
+        )
+        return detector.feed_all(_row_to_entry(row) for row in rows)
+
+    def ingest(
+        self,
+        filepath: str,
+        brute_force_threshold: int = 5,
+        admin_probe_threshold: int = 3,
+        brute_force_window: Optional[float] = None,
+        engine: str = "text",
+        batch_size: int = INGEST_BATCH_SIZE,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Tuple[int, int]:
+        """Store the entries of *filepath* not ingested before.
+
+        Returns ``(new_entries, already_stored)``, the second being the
+        entries of this content stored by earlier ingests (under any name).
+        """
+        path = Path(filepath)
+        resolved = str(path.resolve())
+        st = os.stat(path)
+        compressed = compression_of(str(path)) is not None
+        config = {
+            "brute_force_threshold": brute_force_threshold,
+            "admin_probe_threshold": admin_probe_threshold,
+            "brute_force_window": brute_force_window,
+        }
+        now = datetime.now().isoformat(timespec="seconds")
+        head = _read_head(path)
+
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            src, same_file = self._match_source(st, compressed, head)
+            if src is None:
+                detector = DetectionEngine(**config)
+                source_id = conn.execute(
+                    "INSERT INTO sources (path, device, inode, compressed, offset, head_len, head_hash,"
+                    " engine_state, updated_at) VALUES (?, ?, ?, ?, 0, 0, '', '{}', ?)",
+                    (resolved, st.st_dev, st.st_ino, compressed, now),
+                ).lastrowid
+            else:
+                source_id = src.id
+                if src.engine_state["config"] == config:
+                    detector = DetectionEngine.from_state(src.engine_state)
+                else:
+                    detector = self._replay(source_id, config)  # new settings, same stored events
+            seen_before = detector.entries_seen
+
+            # Byte offsets carry over between plain files with the same content;
+            # otherwise the entries already stored are skipped by count.
+            if src is not None and not compressed and not src.compressed:
+                _, end, entries = read_new_entries(path, st, src.offset, engine, chunk_size)
+            elif src is not None and same_file:  # an unchanged compressed file
+                end, entries = st.st_size, iter(())
+            else:
+                _, end, entries = read_new_entries(path, st, 0, engine, chunk_size)
+                entries = islice(entries, seen_before, None)
+
+            insert = (
+                "INSERT INTO events (source_id, ts, source_ip, log_type, user, action, status, details, raw_line)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            )
+            feed = detector.feed
+            rows: List[tuple] = []
+            for e in entries:
+                feed(e)
+                rows.append((
+                    source_id, to_epoch(e.timestamp), e.source_ip, e.log_type.value,
+                    e.user, e.action, e.status, e.details, e.raw_line,
+                ))
+                if len(rows) >= batch_size:
+                    conn.executemany(insert, rows)
+                    rows = []
+            if rows:
+                conn.executemany(insert, rows)
+
+            head_len = len(head) if compressed else min(len(head), end)
+            conn.execute(
+                "UPDATE sources SET path = ?, device = ?, inode = ?, compressed = ?, offset = ?, head_len = ?,"
+                " head_hash = ?, engine_state = ?, updated_at = ? WHERE id = ?",
+                (
+                    resolved, st.st_dev, st.st_ino, compressed, end, head_len, _sha256(head[:head_len]),
+                    json.dumps(detector.state_dict()), now, source_id,
+                ),
+            )
+            conn.execute("DELETE FROM findings WHERE source_id = ?", (source_id,))
+            conn.executemany(
+                "INSERT INTO findings (source_id, rule_name, source_ip, severity, description, evidence_count,"
+                " updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (source_id, f.rule_name, f.source_ip, f.severity.value, f.description, len(f.evidence), now)
+                    for f in detector.findings()
+                ],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return detector.entries_seen - seen_before, seen_before
+
+    # -- query --------------------------------------------------------------
+
+    def query(
+        self,
+        ip: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        rule: Optional[str] = None,
+        log_type: Optional[LogType] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[LogEntry]:
+        """Yield stored entries matching every given filter, oldest first.
+
+        *since* is inclusive and *until* exclusive. *rule* keeps events from
+        IPs that have a finding for that rule.
+        """
+        where, params = self._where(ip, since, until, rule, log_type)
+        sql = f"SELECT {_EVENT_COLUMNS} FROM events{where} ORDER BY ts, id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for row in self.conn.execute(sql, params):
+            yield _row_to_entry(row)
+
+    def count(
+        self,
+        ip: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        rule: Optional[str] = None,
+        log_type: Optional[LogType] = None,
+    ) -> int:
+        where, params = self._where(ip, since, until, rule, log_type)
+        return self.conn.execute(f"SELECT COUNT(*) FROM events{where}", params).fetchone()[0]
+
+    @staticmethod
+    def _where(
+        ip: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+        rule: Optional[str],
+        log_type: Optional[LogType],
+    ) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if ip is not None:
+            clauses.append("source_ip = ?")
+            params.append(ip)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(to_epoch(since))
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(to_epoch(until))
+        if log_type is not None:
+            clauses.append("log_type = ?")
+            params.append(log_type.value)
+        if rule is not None:
+            clauses.append("source_ip IN (SELECT source_ip FROM findings WHERE rule_name = ?)")
+            params.append(rule)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def stats(self) -> Dict[str, int]:
+        """Row counts per table."""
+        return {
+            table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("sources", "events", "findings")
+        }
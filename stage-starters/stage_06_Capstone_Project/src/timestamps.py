@@ -0,0 +1,121 @@
+"""Timestamp decoding for SecureSIEM.
+
+``datetime.strptime`` is one of the most expensive calls made per log line,
+yet real logs repeat the same second thousands of times. This module provides
+decoders for the three timestamp layouts SecureSIEM understands:
+
+- Apache:  ``25/Dec/2024:10:15:32 +0000``
+- SSH:     ``Dec 25 10:15:32`` (syslog style, no year)
+- AUTH:    ``2024-12-25 10:15:32``
+
+Each decoder:
+- slices the fixed-width layout by hand instead of calling ``strptime``
+- falls back to ``strptime`` for anything that is not in canonical form,
+  so results are identical to the original parsers
+- is memoized in a bounded LRU cache keyed by the raw timestamp string
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Optional
+
+
+TIMESTAMP_CACHE_SIZE = 4096  # distinct seconds kept per layout
+
+_MONTHS: Dict[str, int] = {
+    "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12,
+}
+
+
+def _digits(s: str) -> bool:
+    return s.isascii() and s.isdigit()
+
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def decode_apache(ts_str: str) -> Optional[datetime]:
+    """Decode an Apache timestamp (example: '25/Dec/2024:10:15:32 +0000')."""
+    ts = ts_str.split()[0] if " " in ts_str else ts_str
+
+    # Fast path: dd/Mon/yyyy:HH:MM:SS
+    if (
+        len(ts) == 20
+        and ts[2] == "/" and ts[6] == "/" and ts[11] == ":" and ts[14] == ":" and ts[17] == ":"
+        and _digits(ts[0:2]) and _digits(ts[7:11])
+        and _digits(ts[12:14]) and _digits(ts[15:17]) and _digits(ts[18:20])
+    ):
+        month = _MONTHS.get(ts[3:6])
+        if month is not None:
+            try:
+                return datetime(
+                    int(ts[7:11]), month, int(ts[0:2]),
+                    int(ts[12:14]), int(ts[15:17]), int(ts[18:20]),
+                )
+            except ValueError:
+                return None
+
+    try:
+        return datetime.strptime(ts, "%d/%b/%Y:%H:%M:%S")
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def decode_ssh(ts_str: str, year: int) -> Optional[datetime]:
+    """Decode a syslog timestamp (example: 'Dec 25 10:15:32') in *year*."""
+    parts = ts_str.split()
+    if len(parts) == 3:
+        month = _MONTHS.get(parts[0])
+        day, hms = parts[1], parts[2]
+        if (
+            month is not None
+            and len(day) <= 2 and _digits(day)
+            and len(hms) == 8 and hms[2] == ":" and hms[5] == ":"
+            and _digits(hms[0:2]) and _digits(hms[3:5]) and _digits(hms[6:8])
+        ):
+            try:
+                # Validate against 1900 first, exactly like strptime without a
+                # year does, so Feb 29 behaves the same as before.
+                dt = datetime(1900, month, int(day), int(hms[0:2]), int(hms[3:5]), int(hms[6:8]))
+                return dt.replace(year=year)
+            except ValueError:
+                return None
+
+    try:
+        dt = datetime.strptime(ts_str, "%b %d %H:%M:%S")
+        return dt.replace(year=year)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def decode_auth(ts_str: str) -> Optional[datetime]:
+    """Decode a generic auth timestamp (example: '2024-12-25 10:15:32')."""
+    ts = ts_str
+    if (
+        len(ts) == 19
+        and ts[4] == "-" and ts[7] == "-" and ts[10] == " " and ts[13] == ":" and ts[16] == ":"
+        and _digits(ts[0:4]) and _digits(ts[5:7]) and _digits(ts[8:10])
+        and _digits(ts[11:13]) and _digits(ts[14:16]) and _digits(ts[17:19])
+    ):
+        try:
+            return datetime(
+                int(ts[0:4]), int(ts[5:7]), int(ts[8:10]),
+                int(ts[11:13]), int(ts[14:16]), int(ts[17:19]),
+            )
+        except ValueError:
+            return None
+
+    try:
+        return datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+
+
+def clear_timestamp_caches() -> None:
+    """Drop all memoized timestamps (mainly for tests and benchmarks)."""
+    decode_apache.cache_clear()
+    decode_ssh.cache_clear()
+    decode_auth.cache_clear()
@@ -0,0 +1,33 @@
+from collections import Counter
+
+from benchmarks.bench_pipeline import compare
+from benchmarks.generate import LogGenerator, write_log
+from src.detection import run_all_detections
+from src.log_parser import parse_file
+
+
+def test_generator_is_deterministic_and_parseable(tmp_path):
+    a = write_log(str(tmp_path / "a.log"), 3000, fmt="mixed", attackers=3, attack_density=0.05, seed=7)
+    b = write_log(str(tmp_path / "b.log"), 3000, fmt="mixed", attackers=3, attack_density=0.05, seed=7)
+    assert open(a, "rb").read() == open(b, "rb").read()
+
+    entries = list(parse_file(a, mixed=True))
+    assert len(entries) == 3000
+    assert len({e.source_ip for e in entries}) > 1000
+
+    rules = Counter(f.rule_name for f in run_all_detections(entries))
+    assert set(rules) == {"brute_force", "sql_injection", "directory_traversal", "admin_probe"}
+
+
+def test_generator_knobs_control_attackers_and_mix():
+    lines = list(LogGenerator(attackers=3, attack_density=1.0, attack_mix={"sqli": 1.0}).lines(50))
+    assert len({line.split()[0] for line in lines}) == 3
+    assert all("1=1" in line or ";--" in line or "/**/" in line or "SLEEP(" in line for line in lines)
+
+
+def test_compare_flags_slowdowns_beyond_tolerance():
+    baseline = [{"case": "parse", "size": 10, "seconds": 1.0}, {"case": "gone", "size": 10, "seconds": 1.0}]
+    results = [{"case": "parse", "size": 10, "seconds": 1.3}, {"case": "new", "size": 10, "seconds": 5.0}]
+    rows = compare(results, baseline, tolerance=0.25)
+    assert [(r["case"], r["ratio"], r["regression"]) for r in rows] == [("parse", 1.3, True)]
+    assert not compare(results, baseline, tolerance=0.5)[0]["regression"]
@@ -2,6 +2,8 @@ import os
 import time
 from pathlib import Path
 
+import pytest
+
 from src.cache import cache_set, cache_get, cache_clear
 
 
@@ -23,3 +25,178 @@ def test_cache_clear(tmp_path, monkeypatch):
     cache_set("geo:1.2.3.4", {"country": "X"})
     removed = cache_clear()
     assert removed >= 1
+
+
+def test_sqlite_backend_roundtrip_and_batch(tmp_path, monkeypatch):
+    from src.cache import SQLiteCache, cache_get_many, cache_set_many, get_backend
+
+    monkeypatch.setenv("SECURESIEM_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("SECURESIEM_CACHE_BACKEND", "sqlite")
+    assert isinstance(get_backend(), SQLiteCache)
+
+    assert cache_set("geo:1.2.3.4", {"country": "X"})
+    assert cache_get("geo:1.2.3.4") == {"country": "X"}
+    assert cache_get("geo:1.2.3.4", ttl=0) is None  # expired rows are dropped
+
+    assert cache_set_many({f"geo:10.0.0.{i}": {"n": i} for i in range(600)}) == 600
+    found = cache_get_many([f"geo:10.0.0.{i}" for i in range(0, 700, 2)])
+    assert len(found) == 300 and found["geo:10.0.0.42"] == {"n": 42}
+    assert list(tmp_path.glob("*.json")) == []
+    assert cache_clear() == 600
+
+
+def test_sqlite_backend_shared_between_processes(tmp_path):
+    import multiprocessing
+
+    from src.cache import SQLiteCache
+
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_write_keys, args=(str(tmp_path), n)) for n in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+        assert p.exitcode == 0
+    assert SQLiteCache(tmp_path).count() == 150
+
+
+def test_sqlite_expiry_keeps_a_row_refreshed_by_another_process(tmp_path, monkeypatch):
+    from src.cache import SQLiteCache
+
+    reader, writer = SQLiteCache(tmp_path), SQLiteCache(tmp_path)
+    writer.set("geo:1.2.3.4", {"v": "old"})
+    conn = reader._conn()
+
+    class RefreshAfterSelect:
+        def execute(self, sql, *params):
+            rows = conn.execute(sql, *params)
+            if sql.startswith("SELECT"):
+                writer.set("geo:1.2.3.4", {"v": "new"})  # lands between the read and the delete
+            return rows
+
+        def executemany(self, sql, seq):
+            return conn.executemany(sql, seq)
+
+        def __enter__(self):
+            return conn.__enter__()
+
+        def __exit__(self, *exc):
+            return conn.__exit__(*exc)
+
+    monkeypatch.setattr(reader, "_conn", RefreshAfterSelect)
+    assert reader.get("geo:1.2.3.4", ttl=-1) is None  # the old row counts as expired
+    assert writer.get("geo:1.2.3.4") == {"v": "new"}
+
+
+def _write_keys(cache_dir, worker):
+    from src.cache import SQLiteCache
+
+    store = SQLiteCache(Path(cache_dir))
+    for i in range(50):
+        assert store.set(f"geo:{worker}.{i}", {"w": worker})
+
+
+def test_purge_expired(tmp_path, monkeypatch):
+    from src.cache import cache_purge_expired
+
+    monkeypatch.setenv("SECURESIEM_CACHE_DIR", str(tmp_path))
+    cache_set("geo:1.2.3.4", {"country": "X"})
+    time.sleep(0.01)
+    assert cache_purge_expired(ttl=0) == 1
+    assert cache_get("geo:1.2.3.4") is None
+
+
+def test_memory_tier_serves_repeat_lookups(tmp_path, monkeypatch):
+    from src.cache import get_cache
+
+    monkeypatch.setenv("SECURESIEM_CACHE_DIR", str(tmp_path))
+    cache_set("geo:1.2.3.4", {"country": "X"})
+    # Remove the disk copy: the memory tier must still answer.
+    for f in tmp_path.glob("*.json"):
+        f.unlink()
+    assert cache_get("geo:1.2.3.4") == {"country": "X"}
+    assert cache_get("geo:1.2.3.4", ttl=0) is None  # TTL applies to memory too
+    assert cache_get("geo:5.6.7.8") is None
+
+    counters = get_cache().stats.counters
+    assert counters["memory_hits"] == 1
+    assert counters["misses"] == 2
+    assert counters["expirations"] == 1
+
+
+def test_backend_interface_requires_batch_methods():
+    from src.cache import CacheBackend
+
+    class NoWrites(CacheBackend):
+        def get_entries(self, keys, ttl=0):
+            return {}
+
+        def clear(self):
+            return 0
+
+        def purge_expired(self, ttl=0):
+            return 0
+
+        def count(self):
+            return 0
+
+    # Neither set nor set_many overridden: refused up front, not a recursion at runtime.
+    with pytest.raises(TypeError, match="set_many"):
+        NoWrites()
+
+
+def test_memory_tier_promotes_disk_hits_and_evicts(tmp_path):
+    from src.cache import FileCache, TieredCache
+
+    disk = FileCache(tmp_path)
+    disk.set_many({f"geo:10.0.0.{i}": {"n": i} for i in range(3)})
+    tier = TieredCache(disk, memory_size=2)
+    assert len(tier.get_many([f"geo:10.0.0.{i}" for i in range(3)])) == 3
+    assert tier.stats.counters["disk_hits"] == 3
+    assert tier.stats.counters["evictions"] == 1
+    assert len(tier.memory) == 2
+
+    assert tier.get("geo:10.0.0.2") == {"n": 2}
+    assert tier.stats.counters["memory_hits"] == 1
+    assert sum(tier.stats.histograms["memory_get"]) == 2
+
+
+def test_cache_stats_persist_across_runs(tmp_path, monkeypatch):
+    from src.cache import get_cache, load_cache_stats, reset_cache_stats, save_cache_stats
+
+    monkeypatch.setenv("SECURESIEM_CACHE_DIR", str(tmp_path))
+    cache_set("geo:1.2.3.4", {"country": "X"})
+    cache_get("geo:1.2.3.4")
+    save_cache_stats()
+    assert get_cache().stats.lookups == 0  # folded into the file
+    cache_get("geo:1.2.3.4")
+    total = save_cache_stats()
+
+    assert total.counters["memory_hits"] == 2
+    assert load_cache_stats().hit_rate == 1.0
+    assert cache_clear() == 1  # the stats file is not a cache entry
+    reset_cache_stats()
+    assert load_cache_stats().lookups == 0
+
+
+def test_concurrent_stats_saves_keep_every_count(tmp_path):
+    import multiprocessing
+
+    from src.cache import load_cache_stats
+
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_save_stats, args=(str(tmp_path),)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+        assert p.exitcode == 0
+    assert load_cache_stats(tmp_path).counters["misses"] == 4 * 25
+
+
+def _save_stats(cache_dir):
+    from src.cache import get_cache, save_cache_stats
+
+    for _ in range(25):
+        get_cache(Path(cache_dir)).stats.incr("misses")
+        save_cache_stats(Path(cache_dir))
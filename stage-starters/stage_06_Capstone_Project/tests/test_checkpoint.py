@@ -0,0 +1,81 @@
+import os
+
+from src.checkpoint import analyze_incremental, checkpoint_path_for, load_checkpoint
+from src.detection import DetectionEngine, run_all_detections
+from src.log_parser import parse_file_to_list
+
+
+SSH_FAIL = "Dec 25 10:15:{:02d} server sshd[1234]: Failed password for root from 198.51.100.{} port 22 ssh2\n"
+
+
+def _append(path, lines):
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(lines)
+
+
+def test_resume_processes_only_new_bytes_and_merges(tmp_path):
+    log = tmp_path / "auth.log"
+    cps = tmp_path / "cps"
+    _append(log, [SSH_FAIL.format(i, 7) for i in range(3)])
+
+    engine, new, resumed = analyze_incremental(str(log), checkpoint_dir=cps)
+    assert (new, resumed) == (3, 0)
+    assert engine.findings() == []
+
+    # A half-written line is left for the next run.
+    _append(log, [SSH_FAIL.format(i, 7) for i in range(3, 5)] + ["Dec 25 10:15:59 server sshd[1"])
+    engine, new, resumed = analyze_incremental(str(log), checkpoint_dir=cps)
+    assert new == 2 and resumed > 0
+    [finding] = engine.findings()
+    assert finding.rule_name == "brute_force" and len(finding.evidence) == 5
+
+    _append(log, ["234]: Failed password for root from 198.51.100.7 port 22 ssh2\n"])
+    engine, new, _ = analyze_incremental(str(log), checkpoint_dir=cps)
+    assert new == 1
+    assert engine.findings() == run_all_detections(parse_file_to_list(str(log)))
+    assert load_checkpoint(str(log), cps).offset == os.path.getsize(log)
+
+
+def test_replaced_or_truncated_file_starts_over(tmp_path):
+    log = tmp_path / "auth.log"
+    cps = tmp_path / "cps"
+    _append(log, [SSH_FAIL.format(i, 1) for i in range(5)])
+    analyze_incremental(str(log), checkpoint_dir=cps)
+
+    # Same size, different content: head hash no longer matches.
+    log.write_text("".join(SSH_FAIL.format(i, 2) for i in range(5)), encoding="utf-8")
+    engine, new, resumed = analyze_incremental(str(log), checkpoint_dir=cps)
+    assert (new, resumed) == (5, 0)
+    assert [f.source_ip for f in engine.findings()] == ["198.51.100.2"]
+
+    log.write_text(SSH_FAIL.format(0, 3), encoding="utf-8")
+    engine, new, resumed = analyze_incremental(str(log), checkpoint_dir=cps)
+    assert (new, resumed, engine.entries_seen) == (1, 0, 1)
+
+    # Changed detection settings also invalidate the saved state.
+    engine, _, resumed = analyze_incremental(str(log), brute_force_threshold=1, checkpoint_dir=cps)
+    assert resumed == 0 and len(engine.findings()) == 1
+
+
+def test_engine_state_roundtrip_with_window():
+    from src.log_parser import parse_line
+
+    engine = DetectionEngine(brute_force_threshold=3, brute_force_window=60)
+    for i in range(4):
+        engine.feed(parse_line(SSH_FAIL.format(i, 9)))
+    clone = DetectionEngine.from_state(engine.state_dict())
+    assert clone.findings() == engine.findings()
+    assert clone.entries_seen == 4
+    assert checkpoint_path_for("a.log") == checkpoint_path_for(os.path.abspath("a.log"))
+
+
+def test_compressed_file_is_checkpointed_as_a_unit(tmp_path):
+    import gzip
+
+    log = tmp_path / "auth.log.1.gz"
+    with gzip.open(log, "wt", encoding="utf-8") as f:
+        f.writelines(SSH_FAIL.format(i, 4) for i in range(5))
+    engine, new, _ = analyze_incremental(str(log), checkpoint_dir=tmp_path)
+    assert new == 5 and len(engine.findings()) == 1
+    engine, new, _ = analyze_incremental(str(log), checkpoint_dir=tmp_path)
+    assert new == 0 and len(engine.findings()) == 1
@@ -67,3 +67,150 @@ def test_run_all_detections_sorting():
     assert findings
     # SQL injection is CRITICAL and should come first
     assert findings[0].severity.value == "critical"
+
+
+def test_run_all_detections_matches_individual_rules():
+    lines = [
+        '203.0.113.50 - - [25/Dec/2024:10:17:00 +0000] "GET /search?q=1 UNION SELECT 1 HTTP/1.1" 200 0',
+        '203.0.113.50 - - [25/Dec/2024:10:17:01 +0000] "GET /../../etc/passwd HTTP/1.1" 400 0',
+        '198.51.100.7 - - [25/Dec/2024:10:17:02 +0000] "GET /wp-admin HTTP/1.1" 403 0',
+        '198.51.100.7 - - [25/Dec/2024:10:17:03 +0000] "GET /ADMIN HTTP/1.1" 401 0',
+        '198.51.100.7 - - [25/Dec/2024:10:17:04 +0000] "GET /.env HTTP/1.1" 403 0',
+        '198.51.100.7 - - [25/Dec/2024:10:17:05 +0000] "GET /config HTTP/1.1" 401 0',
+        '198.51.100.7 - - [25/Dec/2024:10:17:06 +0000] "POST /login HTTP/1.1" 401 0',
+    ]
+    entries = [e for e in (parse_line(l) for l in lines) if e]
+
+    expected = (
+        detect_brute_force(entries)
+        + detect_sql_injection(entries)
+        + detect_directory_traversal(entries)
+        + detect_admin_probe(entries)
+    )
+    order = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+    expected.sort(key=lambda f: order[f.severity.value])
+
+    assert run_all_detections(entries) == expected
+    assert [f.rule_name for f in expected] == ["sql_injection", "brute_force", "directory_traversal", "admin_probe"]
+
+
+def test_sql_injection_is_case_insensitive():
+    line = '203.0.113.51 - - [25/Dec/2024:10:17:00 +0000] "GET /q HTTP/1.1" 200 0 "-" "x; DrOp TaBlE users"'
+    findings = detect_sql_injection([parse_line(line)])
+    assert findings and findings[0].source_ip == "203.0.113.51"
+
+
+def test_detection_engine_streams_and_caps_evidence():
+    from src.detection import EVIDENCE_LIMIT, DetectionEngine
+
+    line = "Dec 25 10:15:{:02d} server sshd[1]: Failed password for root from 198.51.100.9 port 22 ssh2"
+    entries = (parse_line(line.format(i)) for i in range(25))  # generator, never a list
+
+    engine = DetectionEngine(brute_force_threshold=5)
+    fired_at = [i for i, e in enumerate(entries) if engine.feed(e)]
+    assert fired_at == [4]  # alert raised as soon as the threshold is crossed
+
+    findings = engine.findings()
+    assert engine.entries_seen == 25
+    assert len(findings) == 1
+    assert "25 failed attempts" in findings[0].description
+    assert len(findings[0].evidence) == EVIDENCE_LIMIT
+
+
+def test_bruteforce_sliding_window():
+    from src.detection import SlidingWindowState, detect_brute_force_window
+
+    line = "Dec 25 10:{:02d}:{:02d} server sshd[1]: Failed password for root from 198.51.100.9 port 22 ssh2"
+    # One failure per minute never fills a 60 second window...
+    slow = [parse_line(line.format(m, 0)) for m in range(10)]
+    assert detect_brute_force_window(slow, threshold=5, window_seconds=60) == []
+    assert len(detect_brute_force(slow, threshold=5)) == 1
+
+    # ...but five failures in four seconds do.
+    burst = [parse_line(line.format(30, s)) for s in range(5)]
+    findings = detect_brute_force_window(slow + burst, threshold=5, window_seconds=60)
+    assert len(findings) == 1
+    assert findings[0].evidence[0] is burst[-1]
+
+    # Idle IPs are expired once the stream moves past their window.
+    state = SlidingWindowState(threshold=5, window_seconds=60)
+    state.add(slow[0])
+    state.add(parse_line(line.replace("198.51.100.9", "203.0.113.1").format(59, 0)))
+    assert "198.51.100.9" not in state.rings
+
+
+def test_sliding_window_handles_out_of_order_timestamps():
+    from src.detection import SlidingWindowState
+
+    line = "Dec 25 {}:{:02d}:{:02d} server sshd[1]: Failed password for root from 198.51.100.9 port 22 ssh2"
+    state = SlidingWindowState(threshold=3, window_seconds=60)
+    # A straggler an hour older must not make the span negative.
+    assert not state.add(parse_line(line.format(10, 0, 0)))
+    assert not state.add(parse_line(line.format(10, 0, 50)))
+    assert not state.add(parse_line(line.format("09", 0, 0)))
+    # A late entry that belongs inside the window still completes it.
+    assert state.add(parse_line(line.format(10, 0, 20)))
+
+
+def test_sliding_window_forget_fired_keeps_memory_flat():
+    from src.detection import SlidingWindowState
+
+    line = "Dec 25 10:{:02d}:{:02d} server sshd[1]: Failed password for root from 198.51.100.{} port 22 ssh2"
+    kept, forgetting = SlidingWindowState(3, 60), SlidingWindowState(3, 60, forget_fired=True)
+    for minute in range(0, 50, 2):  # a new attacking IP every two minutes
+        for s in range(3):
+            entry = parse_line(line.format(minute, s, minute))
+            kept.add(entry)
+            forgetting.add(entry)
+
+    assert len(kept.findings()) == 25
+    assert len(forgetting.evidence) <= 2 and len(forgetting.counts) <= 2 and len(forgetting.rings) <= 2
+
+
+def test_brute_force_window_correlates_across_merged_files(tmp_path):
+    from src.detection import detect_brute_force_window
+    from src.log_parser import parse_files_merged
+
+    def ssh(sec, host):
+        return f"Dec 25 10:15:{sec:02d} {host} sshd[1]: Failed password for root from 192.0.2.50 port 22 ssh2\n"
+
+    # Three attempts per host: below the threshold on either host alone, and
+    # only inside a 60s window once both hosts are interleaved by time.
+    (tmp_path / "web1.log").write_text(ssh(0, "web1") + ssh(20, "web1") + ssh(40, "web1"), encoding="utf-8")
+    (tmp_path / "web2.log").write_text(ssh(10, "web2") + ssh(30, "web2") + ssh(50, "web2"), encoding="utf-8")
+    paths = [str(tmp_path / "web1.log"), str(tmp_path / "web2.log")]
+
+    assert detect_brute_force_window(parse_files_merged(paths[:1]), threshold=5) == []
+    [finding] = detect_brute_force_window(parse_files_merged(paths), threshold=5, window_seconds=60)
+    assert finding.source_ip == "192.0.2.50"
+
+
+def test_signature_files_extend_the_rules(tmp_path, monkeypatch, capsys):
+    from src import detection
+    from src.cli import parse_args
+    from src.main import cmd_analyze
+
+    for name in ("SQL_PATTERNS", "TRAVERSAL_PATTERNS", "ADMIN_PATHS", "SQL_MATCHER",
+                 "TRAVERSAL_MATCHER", "ADMIN_MATCHER", "ACTION_MATCHER"):
+        monkeypatch.setattr(detection, name, getattr(detection, name))  # restored afterwards
+
+    sigs = tmp_path / "sql.txt"
+    sigs.write_text("# vendor rules\nxp_cmdshell\n\n", encoding="utf-8")
+    admin = tmp_path / "admin.txt"
+    admin.write_text("/jenkins\n", encoding="utf-8")
+    assert detection.load_signature_file(str(sigs)) == ["xp_cmdshell"]
+
+    log = tmp_path / "access.log"
+    log.write_text(
+        '203.0.113.9 - - [25/Dec/2024:10:15:00 +0000] "GET /q?c=EXEC%20XP_CMDSHELL HTTP/1.1" 200 5\n'
+        + "".join(f'203.0.113.8 - - [25/Dec/2024:10:15:0{s} +0000] "GET /jenkins HTTP/1.1" 403 5\n' for s in range(3)),
+        encoding="utf-8",
+    )
+    cmd_analyze(parse_args(["analyze", "--input", str(log)]))
+    assert "No security threats detected" in capsys.readouterr().out
+
+    cmd_analyze(parse_args(["analyze", "--input", str(log), "--sql-signatures", str(sigs), "--admin-paths", str(admin)]))
+    out = capsys.readouterr().out
+    assert "SQL_INJECTION" in out and "ADMIN_PROBE" in out
+    assert "1=1" in detection.SQL_PATTERNS and "/jenkins" in detection.ADMIN_PATHS
+
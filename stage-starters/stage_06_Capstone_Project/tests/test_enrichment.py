@@ -1,6 +1,11 @@
 import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from types import SimpleNamespace
 
+import pytest
+
 from src.enrichment import get_ip_info, is_private_ip
 
 
@@ -25,6 +30,62 @@ def test_is_private_ip():
     assert not is_private_ip("8.8.8.8")
 
 
+def test_classify_ip_special_ranges():
+    from src.enrichment import classify_ip
+
+    assert classify_ip("8.8.8.8") is None
+    assert classify_ip("100.64.1.1") == "cgnat"
+    assert classify_ip("100.128.0.1") is None
+    assert classify_ip("169.254.10.1") == "link-local"
+    assert classify_ip("239.1.2.3") == "multicast"
+    assert classify_ip("255.255.255.255") == "reserved"
+    assert classify_ip("127.0.0.1") == "loopback"
+    assert classify_ip("::1") == "loopback"
+    assert classify_ip("fd12:3456::1") == "private"
+    assert classify_ip("fe80::1%eth0") == "link-local"
+    assert classify_ip("ff02::1") == "multicast"
+    assert classify_ip("::ffff:192.168.0.1") == "private"
+    assert classify_ip("2606:4700::1111") is None
+    assert classify_ip("not-an-ip") == "invalid"
+    assert is_private_ip("::1")
+    assert not is_private_ip("100.64.1.1")
+
+
+def test_special_ips_skip_cache(monkeypatch):
+    import src.enrichment as enrichment
+
+    def boom(*args, **kwargs):
+        raise AssertionError("cache touched for a special-purpose address")
+
+    monkeypatch.setattr(enrichment, "cache_get", boom)
+    monkeypatch.setattr(enrichment, "cache_get_many", boom)
+    assert get_ip_info("10.1.2.3")["status"] == "private"
+    assert get_ip_info("100.64.0.1") == {"status": "reserved", "country": "Reserved Network", "range": "cgnat"}
+    assert enrichment.get_ip_info_batch(["192.168.0.1", "224.0.0.1"])["224.0.0.1"]["range"] == "multicast"
+
+
+def test_failed_lookups_are_negatively_cached(monkeypatch, tmp_path):
+    monkeypatch.setenv("SECURESIEM_CACHE_DIR", str(tmp_path))
+    calls = []
+
+    def fake_urlopen(url, timeout=5):
+        calls.append(url)
+        return DummyResponse({"status": "fail", "message": "quota"})
+
+    import urllib.request
+    monkeypatch.setattr(urllib.request, "urlopen", fake_urlopen)
+
+    assert get_ip_info("8.8.8.8") is None
+    assert get_ip_info("8.8.8.8") is None
+    assert len(calls) == 1
+
+    import src.enrichment as enrichment
+    monkeypatch.setattr(enrichment, "NEGATIVE_TTL", 0)
+    time.sleep(0.01)
+    assert get_ip_info("8.8.8.8") is None
+    assert len(calls) == 2
+
+
 def test_get_ip_info_private(monkeypatch, tmp_path):
     monkeypatch.setenv("SECURESIEM_CACHE_DIR", str(tmp_path))
     info = get_ip_info("192.168.1.2", use_cache=True)
@@ -50,3 +111,201 @@ def test_get_ip_info_success(monkeypatch, tmp_path):
 
     info = get_ip_info("8.8.8.8", use_cache=False)
     assert info["country"] == "Testland"
+
+
+@pytest.fixture
+def geo_server(monkeypatch, tmp_path):
+    """Local stand-in for ip-api.com.
+
+    IPs ending in .99 do not answer until ``release`` is set (or the fixture
+    ends); IPs ending in .13 fail in batch replies.
+    """
+    import src.enrichment as enrichment
+
+    requests = []
+    batches = []
+    answered = []
+    release = threading.Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            ip = self.path.split("/json/", 1)[1].split("?", 1)[0]
+            requests.append(ip)
+            if ip.endswith(".99"):
+                release.wait(30)
+            answered.append(ip)
+            body = json.dumps({"status": "success", "country": f"Country-{ip}", "city": "City"}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            ips = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            batches.append(ips)
+            reply = [
+                {"status": "fail", "message": "reserved range", "query": ip}
+                if ip.endswith(".13")
+                else {"status": "success", "country": f"Country-{ip}", "query": ip}
+                for ip in ips
+            ]
+            body = json.dumps(reply).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("SECURESIEM_CACHE_DIR", str(tmp_path))
+    base = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(enrichment, "API_URL", base + "/json/{ip}?fields=status")
+    monkeypatch.setattr(enrichment, "BATCH_URL", base + "/batch?fields=status,query")
+    yield SimpleNamespace(requests=requests, batches=batches, answered=answered, release=release)
+    release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def test_token_bucket_limits_rate():
+    from src.enrichment import TokenBucket
+
+    bucket = TokenBucket(rate=20, capacity=2)
+    assert bucket.acquire() and bucket.acquire()
+    assert not bucket.acquire(timeout=0.01)
+    start = time.monotonic()
+    assert bucket.acquire(timeout=1)
+    assert time.monotonic() - start >= 0.03
+
+
+def test_per_minute_bucket_never_exceeds_quota_in_first_minute(monkeypatch):
+    from src import enrichment
+
+    quota = enrichment.DEFAULT_RATE_LIMIT
+    clock = SimpleNamespace(now=1000.0)
+    fake_time = SimpleNamespace(
+        monotonic=lambda: clock.now,
+        # Like a real sleep, always lets some time pass (no float-rounding spin).
+        sleep=lambda seconds: setattr(clock, "now", clock.now + max(seconds, 1e-6)),
+    )
+    monkeypatch.setattr(enrichment, "time", fake_time)
+
+    bucket = enrichment.TokenBucket.per_minute(quota)
+    granted = 0
+    while True:
+        bucket.acquire()
+        if clock.now - 1000.0 >= 60:
+            break
+        granted += 1
+    assert granted == quota
+
+
+def test_batch_lookups_stay_within_batch_quota_in_first_minute(geo_server, monkeypatch):
+    from src import enrichment
+
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        enrichment,
+        "time",
+        SimpleNamespace(monotonic=lambda: clock.now, sleep=lambda s: setattr(clock, "now", clock.now + max(s, 1e-6))),
+    )
+    sent_at = []
+    fetch_batch = enrichment.fetch_batch
+
+    def timed_fetch(*args, **kwargs):
+        result = fetch_batch(*args, **kwargs)
+        sent_at.append(clock.now - 1000.0)
+        return result
+
+    monkeypatch.setattr(enrichment, "fetch_batch", timed_fetch)
+
+    ips = [f"8.8.{i // 250}.{i % 250 + 1}" for i in range(2500)]
+    limiter = enrichment.TokenBucket.per_minute(enrichment.DEFAULT_BATCH_RATE_LIMIT)
+    enrichment.get_ip_info_batch(ips, use_cache=False, limiter=limiter)
+
+    assert len(geo_server.batches) == 25
+    assert sum(t < 60 for t in sent_at) == enrichment.DEFAULT_BATCH_RATE_LIMIT
+
+
+def test_enrich_findings_concurrent_with_partial_results(geo_server):
+    from src.enrichment import enrich_findings
+    from src.models import Finding, Severity
+
+    ips = [f"8.8.4.{i}" for i in range(1, 9)] + ["8.8.4.99"]
+    findings = [Finding("sql_injection", Severity.CRITICAL, ip, "x") for ip in ips]
+
+    enrich_findings(findings, max_workers=4, rate_limit=None, timeout=2.0)
+    # Returned at the deadline while the slow lookup was still unanswered.
+    assert "8.8.4.99" in geo_server.requests
+    assert "8.8.4.99" not in geo_server.answered
+
+    by_ip = {f.source_ip: f.geo_info for f in findings}
+    assert by_ip["8.8.4.99"] is None
+    assert all(by_ip[ip]["country"] == f"Country-{ip}" for ip in ips[:-1])
+
+
+def test_batch_lookup_groups_misses_and_handles_partial_failures(geo_server):
+    from src.enrichment import BATCH_SIZE, get_ip_info_batch
+
+    ips = [f"8.8.{i // 200}.{i % 200}" for i in range(250)] + ["10.0.0.1"]
+    results = get_ip_info_batch(ips)
+
+    assert [len(b) for b in geo_server.batches] == [BATCH_SIZE, BATCH_SIZE, 50]
+    assert results["10.0.0.1"]["country"] == "Private Network"
+    assert results["8.8.0.13"] is None
+    assert results["8.8.1.42"]["country"] == "Country-8.8.1.42"
+
+    # Successful answers were fanned back into the cache, and the failure was
+    # remembered in the negative cache, so nothing goes out again.
+    geo_server.batches.clear()
+    again = get_ip_info_batch(["8.8.1.42", "8.8.0.13"])
+    assert again["8.8.1.42"]["country"] == "Country-8.8.1.42"
+    assert again["8.8.0.13"] is None
+    assert geo_server.batches == []
+
+
+def test_enrich_findings_batch_mode(geo_server):
+    from src.enrichment import enrich_findings
+    from src.models import Finding, Severity
+
+    findings = [Finding("brute_force", Severity.HIGH, f"9.9.9.{i}", "x") for i in range(1, 6)]
+    enrich_findings(findings, max_workers=2, rate_limit=None, batch=True)
+    assert len(geo_server.batches) == 1
+    assert geo_server.requests == []
+    assert all(f.geo_info["country"] == f"Country-{f.source_ip}" for f in findings)
+
+
+def test_enrich_findings_offline_and_fallback(geo_server, tmp_path):
+    from src.enrichment import enrich_findings
+    from src.geodb import build_geodb
+    from src.models import Finding, Severity
+
+    csv_path = tmp_path / "geo.csv"
+    csv_path.write_text("network,country,city\n8.8.4.0/24,Offland,Offcity\n", encoding="utf-8")
+    build_geodb(csv_path, tmp_path / "geo.db")
+
+    ips = ["8.8.4.1", "8.8.4.99", "5.5.5.5", "10.0.0.1"]
+    findings = [Finding("sql_injection", Severity.CRITICAL, ip, "x") for ip in ips]
+    enrich_findings(findings, geo_mode="offline", geodb=tmp_path / "geo.db")
+    assert geo_server.requests == []
+    by_ip = {f.source_ip: f.geo_info for f in findings}
+    assert by_ip["8.8.4.1"]["country"] == "Offland"
+    assert by_ip["5.5.5.5"] is None
+    assert by_ip["10.0.0.1"]["status"] == "private"
+
+    # Fallback: the API answers first; the slow IP misses the deadline and
+    # is filled in from the database.
+    findings = [Finding("sql_injection", Severity.CRITICAL, ip, "x") for ip in ips]
+    enrich_findings(findings, max_workers=4, rate_limit=None, timeout=0.5, geo_mode="fallback", geodb=tmp_path / "geo.db")
+    by_ip = {f.source_ip: f.geo_info for f in findings}
+    assert by_ip["8.8.4.1"]["country"] == "Country-8.8.4.1"
+    assert by_ip["8.8.4.99"]["country"] == "Offland"
+
+    with pytest.raises(ValueError):
+        enrich_findings(findings, geo_mode="offline")
@@ -0,0 +1,75 @@
+import struct
+from array import array
+
+import pytest
+
+from src.geodb import GeoDB, build_geodb
+
+
+def _write_csv(path, text):
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_build_and_lookup(tmp_path):
+    csv_path = _write_csv(
+        tmp_path / "geo.csv",
+        "start_ip,end_ip,country,region,city,isp,org\n"
+        "8.8.8.0,8.8.8.255,United States,California,Mountain View,Google,Google LLC\n"
+        "16843008,16843263,Australia,,Sydney,Cloudflare,APNIC\n"
+        "9.9.9.0,9.9.9.9,United States,California,Mountain View,Google,Google LLC\n",
+    )
+    assert build_geodb(csv_path, tmp_path / "geo.db") == 3
+
+    with GeoDB(tmp_path / "geo.db") as db:
+        assert len(db) == 3
+        assert db.lookup("8.8.8.8")["city"] == "Mountain View"
+        assert db.lookup("8.8.8.0")["org"] == "Google LLC"
+        assert db.lookup("1.1.1.255") == {
+            "country": "Australia", "region": "Unknown", "city": "Sydney", "isp": "Cloudflare", "org": "APNIC",
+        }
+        assert db.lookup("9.9.9.10") is None
+        assert db.lookup("0.0.0.0") is None
+        assert db.lookup("::1") is None
+        # Identical locations share one record.
+        assert db.record_id(0x08080808) == db.record_id(0x09090901)
+
+
+def test_cidr_rows(tmp_path):
+    csv_path = _write_csv(tmp_path / "geo.csv", "network,country\n203.0.113.0/24,Testland\n")
+    build_geodb(csv_path, tmp_path / "geo.db")
+    with GeoDB(tmp_path / "geo.db") as db:
+        assert db.lookup("203.0.113.77")["country"] == "Testland"
+        assert db.lookup("203.0.114.0") is None
+
+
+def test_rejects_overlaps_and_bad_files(tmp_path):
+    csv_path = _write_csv(
+        tmp_path / "geo.csv",
+        "network,country\n10.0.0.0/8,A\n10.1.0.0/16,B\n",
+    )
+    with pytest.raises(ValueError, match="Overlapping"):
+        build_geodb(csv_path, tmp_path / "geo.db")
+
+    (tmp_path / "junk.db").write_bytes(b"not a database")
+    with pytest.raises(ValueError):
+        GeoDB(tmp_path / "junk.db")
+
+
+def test_reads_database_built_on_other_endianness(tmp_path):
+    csv_path = _write_csv(tmp_path / "geo.csv", "network,country\n203.0.113.0/24,Testland\n")
+    build_geodb(csv_path, tmp_path / "geo.db")
+
+    # Rewrite the columns in the opposite byte order; the header stays little-endian.
+    data = bytearray((tmp_path / "geo.db").read_bytes())
+    header = struct.Struct("<8s1s3xIII")
+    magic, order, count, n_records, blob_len = header.unpack_from(data)
+    columns = array("I", data[header.size:header.size + 12 * count])
+    columns.byteswap()
+    data[header.size:header.size + 12 * count] = columns.tobytes()
+    data[8:9] = b">" if order == b"<" else b"<"
+    (tmp_path / "swapped.db").write_bytes(bytes(data))
+
+    with GeoDB(tmp_path / "swapped.db") as db:
+        assert db.lookup("203.0.113.77")["country"] == "Testland"
+        assert db.lookup("203.0.114.0") is None
@@ -0,0 +1,29 @@
+import random
+
+from src.matcher import AUTOMATON_MIN_PATTERNS, MultiPatternMatcher
+
+
+def test_find_all_overlapping_matches():
+    m = MultiPatternMatcher(["he", "she", "his", "hers"] * AUTOMATON_MIN_PATTERNS)
+    assert m.use_automaton
+    hits = set(m.find_all("ushers"))
+    assert hits == {(1, "she"), (2, "he"), (2, "hers")}
+
+
+def test_search_matches_naive_scan_for_large_rule_sets():
+    rng = random.Random(7)
+    alphabet = "ab'=-/. "
+    patterns = sorted({"".join(rng.choices(alphabet, k=rng.randint(2, 6))) for _ in range(500)})
+    small = patterns[:10]
+    texts = ["".join(rng.choices(alphabet + "XY", k=40)) for _ in range(200)]
+
+    for pats in (patterns, small):
+        m = MultiPatternMatcher(pats, ignore_case=True)
+        for t in texts:
+            assert m.search(t) == any(p.lower() in t.lower() for p in pats)
+
+
+def test_tags_in_ignore_case():
+    m = MultiPatternMatcher(["../", "/admin"], ignore_case=True, tags=["trav", "admin"])
+    assert m.tags_in("GET /ADMIN/../x") == {"trav", "admin"}
+    assert m.tags_in("GET /index.html") == set()
@@ -0,0 +1,108 @@
+import pickle
+
+import pytest
+
+from src.log_parser import parse_file_to_list, parse_line
+from src.models import LogEntry, LogType, int_to_ipv4, ipv4_to_int
+
+
+def test_log_entry_is_slotted_and_interns_repeating_fields():
+    line = "2024-12-25 10:15:32 AUTH FAILURE user=admin ip=192.168.1.100 reason=invalid_password"
+    a, b = parse_line(line), parse_line(line)
+    assert not hasattr(a, "__dict__")
+    assert a.source_ip is b.source_ip
+    assert a.user is b.user
+    assert a == b
+    assert pickle.loads(pickle.dumps(a)) == a
+
+
+def test_ipv4_packing():
+    assert ipv4_to_int("192.168.1.100") == 0xC0A80164
+    assert int_to_ipv4(0xC0A80164) == "192.168.1.100"
+    assert ipv4_to_int("999.1.1.1") is None
+    entry = LogEntry(timestamp=None, source_ip="10.0.0.1", log_type=LogType.AUTH, raw_line="x")
+    assert entry.ip_int == 0x0A000001
+
+
+def test_lazy_raw_line_reads_from_file(tmp_path):
+    p = tmp_path / "access.log"
+    p.write_text(
+        '203.0.113.50 - - [25/Dec/2024:10:17:00 +0000] "GET /admin HTTP/1.1" 403 287\n'
+        '  198.51.100.7 - - [25/Dec/2024:10:17:01 +0000] "GET / HTTP/1.1" 200 10  \n'
+    )
+    eager = parse_file_to_list(str(p))
+    lazy = parse_file_to_list(str(p), engine="mmap", lazy_raw=True)
+    assert [e.raw_offset for e in lazy] == [0, 76]
+    assert lazy == eager
+    assert lazy[1].raw_line.startswith("198.51.100.7")
+
+
+def test_log_batch_columns_and_counts():
+    from src.models import LogBatch, NO_TIMESTAMP
+
+    lines = [
+        '203.0.113.50 - - [25/Dec/2024:10:17:00 +0000] "GET /admin HTTP/1.1" 403 287',
+        '203.0.113.50 - - [25/Dec/2024:10:17:01 +0000] "GET /admin HTTP/1.1" 403 287',
+        "2024-12-25 10:15:32 AUTH FAILURE user=admin ip=192.168.1.100 reason=invalid_password",
+        "2024-13-25 10:15:32 AUTH SUCCESS user=admin ip=192.168.1.100",
+    ]
+    batch = LogBatch.from_entries(parse_line(l) for l in lines)
+
+    assert len(batch) == 4
+    assert batch.ips[0] == ipv4_to_int("203.0.113.50")
+    assert batch.timestamps[0] == 1735121820
+    assert batch.timestamps[3] == NO_TIMESTAMP
+    assert batch.actions[0] == batch.actions[1]
+    assert batch.action_values[batch.actions[0]] == "GET /admin"
+    assert batch.count_by_log_type() == {LogType.APACHE: 2, LogType.AUTH: 2}
+    assert batch.count_by_status() == {"403": 2, "failure": 1, "success": 1}
+    assert batch.unique_ip_count() == 2
+
+
+def test_log_batch_ip_counts_match_source_strings():
+    from collections import Counter
+
+    from src.models import LogBatch
+
+    ips = ["999.1.1.1", "999.1.1.1", "998.0.0.1", "010.0.0.1", "10.0.0.1", "255.255.255.255", "10.0.0.1"]
+    line = '{} - - [25/Dec/2024:10:17:00 +0000] "GET / HTTP/1.1" 200 1'
+    entries = [parse_line(line.format(ip)) for ip in ips]
+    batch = LogBatch.from_entries(entries)
+
+    assert batch.count_by_ip() == dict(Counter(ips))
+    assert batch.unique_ip_count() == len(set(ips)) == 5
+    # Without a real 255.255.255.255 row the stand-in value is not counted.
+    rest = LogBatch.from_entries(e for e in entries if e.source_ip != "255.255.255.255")
+    assert rest.unique_ip_count() == 4
+    assert "255.255.255.255" not in rest.count_by_ip()
+
+
+@pytest.mark.parametrize("engine", ["text", "mmap"])
+def test_parse_file_to_batch_matches_entry_rows(tmp_path, engine):
+    import gzip
+
+    from src.log_parser import parse_file, parse_file_to_batch
+    from src.models import LogBatch
+
+    logs = {
+        "access.log": '203.0.113.50 - - [25/Dec/2024:10:17:00 +0000] "GET /admin HTTP/1.1" 403 287\n'
+        "garbage\n"
+        '203.0.113.51 - bob [25/Dec/2024:10:17:01 +0000] "POST /login HTTP/1.1" 401 0\n',
+        "auth.log": "Dec 25 10:15:32 server sshd[1]: Failed password for root from 192.168.1.100 port 22 ssh2\n"
+        "Dec 25 10:15:33 server sshd[1]: Accepted password for root from 192.168.1.101 port 22 ssh2\n",
+        "app.log": "2024-12-25 10:15:32 AUTH FAILURE user=admin ip=192.168.1.100 reason=bad\n"
+        "2024-13-25 10:15:32 AUTH SUCCESS user=admin ip=192.168.1.100\n",
+    }
+    for name, text in logs.items():
+        plain = tmp_path / name
+        plain.write_text(text, encoding="utf-8")
+        packed = tmp_path / f"{name}.gz"
+        packed.write_bytes(gzip.compress(text.encode()))
+        for path in (plain, packed):
+            batch = parse_file_to_batch(str(path), engine=engine)
+            expected = LogBatch.from_entries(parse_file(str(path)))
+            assert len(batch) == len(expected) == 2
+            for column in (
+                "ips", "timestamps", "log_types", "statuses", "actions", "status_values", "action_values", "other_ips",
+            ):
+                assert getattr(batch, column) == getattr(expected, column)
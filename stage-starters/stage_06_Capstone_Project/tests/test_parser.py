@@ -1,3 +1,5 @@
+import os
+
 import pytest
 from src.log_parser import detect_log_type, parse_line, parse_file_to_list
 from src.models import LogType
@@ -43,3 +45,161 @@ def test_parse_file_to_list(tmp_path):
     p.write_text("2024-12-25 10:15:32 AUTH FAILURE user=admin ip=192.168.1.100 reason=invalid_password\n")
     entries = parse_file_to_list(str(p))
     assert len(entries) == 1
+
+
+def test_parse_file_parallel_matches_single_process(tmp_path):
+    from src.log_parser import parse_file_parallel, split_file_ranges
+
+    lines = [
+        f'203.0.113.{i % 250} - - [25/Dec/2024:10:{i % 60:02d}:00 +0000] "GET /page{i} HTTP/1.1" 200 {i}'
+        for i in range(300)
+    ]
+    lines.insert(50, "garbage line")
+    lines.insert(120, "")
+    p = tmp_path / "access.log"
+    p.write_text("\n".join(lines) + "\n")
+
+    ranges = split_file_ranges(str(p), chunk_size=1000)
+    assert len(ranges) > 2
+    assert ranges[0][0] == 0 and ranges[-1][1] == p.stat().st_size
+
+    expected = parse_file_to_list(str(p))
+    assert list(parse_file_parallel(str(p), workers=2, chunk_size=1000)) == expected
+
+
+def test_mmap_engine_matches_text_engine(tmp_path):
+    from src.log_parser import parse_file_parallel
+
+    lines = [
+        "Dec 25 10:15:32 server sshd[12345]: Failed password for root from 192.168.1.100 port 22 ssh2",
+        "  Dec 25 10:15:33 server sshd[12346]: Accepted password for alice from 10.0.0.5 port 22 ssh2",
+        "not an ssh line",
+        "",
+        "Dec 25 10:15:34 server sshd[12347]: Failed password for invalid user bob from 203.0.113.9 port 22",
+    ]
+    p = tmp_path / "auth.log"
+    p.write_text("\r\n".join(lines) + "\r\n")
+
+    expected = parse_file_to_list(str(p))
+    assert len(expected) == 3
+    assert parse_file_to_list(str(p), engine="mmap") == expected
+    assert list(parse_file_parallel(str(p), workers=2, chunk_size=64, engine="mmap")) == expected
+
+
+def test_mmap_engine_empty_file(tmp_path):
+    p = tmp_path / "empty.log"
+    p.write_bytes(b"")
+    assert parse_file_to_list(str(p), engine="mmap") == []
+
+
+def test_compressed_inputs_parse_like_plain_text(tmp_path):
+    import bz2
+    import gzip
+    import lzma
+
+    from src.log_parser import compression_of, parse_file_parallel, parse_files_parallel
+
+    text = "".join(
+        f'203.0.113.{i} - - [25/Dec/2024:10:15:{i:02d} +0000] "GET /admin HTTP/1.1" 403 12\n' for i in range(20)
+    )
+    plain = tmp_path / "access.log"
+    plain.write_text(text, encoding="utf-8")
+    expected = parse_file_to_list(str(plain))
+
+    paths = []
+    for name, opener in (("gzip", gzip.open), ("bz2", bz2.open), ("xz", lzma.open)):
+        path = tmp_path / f"access.log.1.{name}"
+        with opener(path, "wt", encoding="utf-8") as f:
+            f.write(text)
+        assert compression_of(str(path)) == name
+        for engine in ("text", "mmap"):
+            assert parse_file_to_list(str(path), engine=engine) == expected
+        assert list(parse_file_parallel(str(path), workers=2)) == expected
+        paths.append(str(path))
+    assert compression_of(str(plain)) is None
+
+    merged = list(parse_files_parallel(paths + [str(plain)], workers=2, batch_size=7))
+    assert merged == expected * 4
+
+
+def test_parse_files_parallel_surfaces_producer_failures(tmp_path, monkeypatch):
+    import gzip
+
+    from src import log_parser
+
+    bad = tmp_path / "access.log.gz"
+    bad.write_bytes(gzip.compress(b"x" * 1000)[:20])  # truncated stream
+    with pytest.raises(EOFError):  # the worker's own exception type
+        list(log_parser.parse_files_parallel([str(bad)], workers=1))
+
+    # A worker that dies without ending its stream fails the read instead of hanging.
+    good = tmp_path / "access.log"
+    good.write_text("", encoding="utf-8")
+    monkeypatch.setattr(log_parser, "_produce_entries", _die)
+    monkeypatch.setattr(log_parser, "PRODUCER_POLL_INTERVAL", 0.05)
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        list(log_parser.parse_files_parallel([str(good)], workers=1))
+
+
+def _die(filepath, engine, out, batch_size):
+    os._exit(3)
+
+
+def test_parse_files_merged_orders_by_timestamp(tmp_path):
+    from src.log_parser import expand_inputs, parse_files_merged
+
+    def ssh(sec, host):
+        return f"Dec 25 10:15:{sec:02d} {host} sshd[1]: Failed password for root from 192.0.2.7 port 22 ssh2\n"
+
+    (tmp_path / "web1.log").write_text("".join(ssh(s, "web1") for s in (1, 4, 4, 9)), encoding="utf-8")
+    (tmp_path / "web2.log").write_text("".join(ssh(s, "web2") for s in (2, 4, 8)), encoding="utf-8")
+    (tmp_path / "web3.log").write_text(ssh(3, "web3"), encoding="utf-8")
+
+    paths = expand_inputs([str(tmp_path / "web*.log")])
+    assert [p.rsplit("/", 1)[1] for p in paths] == ["web1.log", "web2.log", "web3.log"]
+    with pytest.raises(FileNotFoundError):
+        expand_inputs([str(tmp_path / "nothing*.log")])
+
+    for workers in (1, 2):
+        merged = list(parse_files_merged(paths, workers=workers, batch_size=2))
+        order = [(e.timestamp.second, e.details) for e in merged]
+        assert order == [
+            (1, "host=web1"), (2, "host=web2"), (3, "host=web3"), (4, "host=web1"),
+            (4, "host=web1"), (4, "host=web2"), (8, "host=web2"), (9, "host=web1"),
+        ]
+
+
+def test_mixed_mode_routes_each_line_by_prefix(tmp_path):
+    from src.log_parser import FormatStats, classify_line, parse_file
+
+    lines = [
+        '203.0.113.5 - - [25/Dec/2024:10:15:32 +0000] "GET /admin HTTP/1.1" 403 287',
+        "Dec 25 10:15:33 server sshd[1]: Failed password for root from 198.51.100.7 port 22 ssh2",
+        "2024-12-25 10:15:34 AUTH FAILURE user=bob ip=192.0.2.9 reason=bad_password",
+        "Dec 25 10:15:35 server CRON[2]: (root) CMD (run-parts /etc/cron.hourly)",
+        "",
+        "-- garbage --",
+    ]
+    assert [classify_line(line) for line in lines] == [
+        LogType.APACHE, LogType.SSH, LogType.AUTH, LogType.SSH, LogType.UNKNOWN, LogType.UNKNOWN,
+    ]
+
+    log_file = tmp_path / "aggregate.log"
+    log_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    # Sniffing locks onto Apache and loses the other formats.
+    assert [e.log_type for e in parse_file(str(log_file))] == [LogType.APACHE]
+
+    stats = FormatStats()
+    entries = list(parse_file(str(log_file), mixed=True, stats=stats))
+    assert [e.source_ip for e in entries] == ["203.0.113.5", "198.51.100.7", "192.0.2.9"]
+    assert stats.routed == {LogType.APACHE: 1, LogType.SSH: 2, LogType.AUTH: 1}
+    assert stats.rejected(LogType.SSH) == 1
+    assert stats.rejection_rate(LogType.SSH) == 0.5
+    assert stats.unrouted == 1
+    assert stats.to_dict()["auth"]["parsed"] == 1
+    assert stats.to_dict()["unknown"]["rejection_rate"] == 1.0
+    assert FormatStats().to_dict()["unknown"]["rejection_rate"] == 0.0
+
+    with pytest.raises(ValueError):
+        list(parse_file(str(log_file), engine="mmap", mixed=True))
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from src.detection import DetectionEngine, run_all_detections
+from src.log_parser import parse_line
+from src.pipeline import AnalysisPipeline
+
+
+def sqli(ip):
+    return parse_line(f"{ip} - - [25/Dec/2024:10:17:00 +0000] \"GET /search?q=1' OR '1'='1 HTTP/1.1\" 200 0")
+
+
+def ssh_fail(sec, ip="192.0.2.7"):
+    return parse_line(f"Dec 25 10:15:{sec:02d} server sshd[1]: Failed password for root from {ip} port 22 ssh2")
+
+
+def test_pipeline_matches_sequential_detection():
+    entries = [ssh_fail(s) for s in range(12)] + [sqli("203.0.113.50"), sqli("203.0.113.51")]
+    expected = run_all_detections(entries)
+
+    alerts = []
+    findings = AnalysisPipeline(on_finding=alerts.append, batch_size=3, queue_depth=1).run(iter(entries))
+
+    assert [(f.rule_name, f.source_ip, f.description) for f in findings] == [
+        (f.rule_name, f.source_ip, f.description) for f in expected
+    ]
+    assert sorted(f.rule_name for f in alerts) == ["brute_force", "sql_injection", "sql_injection"]
+
+
+def test_pipeline_resolves_each_ip_once_and_attaches_geo():
+    calls = []
+    lock = threading.Lock()
+
+    def resolver(ips, limiter_timeout):
+        with lock:
+            calls.extend(ips)
+        time.sleep(0.01)
+        return {ip: {"country": f"C-{ip}"} for ip in ips}
+
+    # 203.0.113.9 triggers both brute force and SQLi.
+    entries = [ssh_fail(s, "203.0.113.9") for s in range(5)] + [sqli("203.0.113.9"), sqli("198.51.100.4")]
+    alerts = []
+    findings = AnalysisPipeline(resolver=resolver, enrich_workers=4, on_finding=alerts.append).run(entries)
+
+    assert sorted(calls) == ["198.51.100.4", "203.0.113.9"]
+    assert all(f.geo_info == {"country": f"C-{f.source_ip}"} for f in findings)
+    assert len(alerts) == 3 and all(a.geo_info for a in alerts)
+
+
+def test_pipeline_overlaps_enrichment_with_parsing():
+    enriched = threading.Event()
+    overlapped = []
+
+    def entries():
+        yield sqli("203.0.113.1")
+        # Parsing stalls here until the first finding has been enriched; run
+        # back to back, the lookup would only start after the input ended.
+        overlapped.append(enriched.wait(timeout=5))
+        for i in range(2, 20):
+            yield sqli(f"203.0.113.{i}")
+
+    def resolver(ips, limiter_timeout):
+        enriched.set()
+        return {}
+
+    findings = AnalysisPipeline(resolver=resolver, enrich_workers=1, batch_size=1).run(entries())
+
+    assert len(findings) == 19
+    assert overlapped == [True]
+
+
+def test_pipeline_propagates_stage_errors():
+    def broken_resolver(ips, limiter_timeout):
+        raise RuntimeError("lookup exploded")
+
+    entries = [sqli(f"203.0.113.{i}") for i in range(500)]
+    with pytest.raises(RuntimeError, match="lookup exploded"):
+        AnalysisPipeline(DetectionEngine(), resolver=broken_resolver, queue_depth=1, batch_size=1).run(entries)
@@ -0,0 +1,71 @@
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from src.detection import run_all_detections
+from src.log_parser import parse_line
+from src.models import AnalysisReport
+from src.profiling import Profiler, TimedDetectionEngine
+
+
+def test_stage_times_are_exclusive_of_lazy_inner_stages():
+    def slow_source():
+        for i in range(5):
+            time.sleep(0.02)
+            yield i
+
+    profiler = Profiler()
+    start = time.perf_counter()
+    with profiler.stage("detect") as st:
+        for _ in profiler.timed(slow_source(), "parse"):
+            time.sleep(0.01)
+        st.items = 5
+    outer = time.perf_counter() - start
+
+    stats = profiler.stages
+    assert list(stats) == ["detect", "parse"]
+    assert stats["parse"].items == 5 and stats["detect"].items == 5
+    # The parser's time is not counted twice: the two stages add up to the
+    # block's wall time (nested, they would come to about 1.7x of it).
+    assert stats["parse"].wall + stats["detect"].wall == pytest.approx(outer, rel=0.05)
+    assert stats["detect"].wall < stats["parse"].wall
+
+
+def test_timed_engine_matches_fused_engine_and_reports_per_rule():
+    lines = [f"Dec 25 10:15:{s:02d} server sshd[1]: Failed password for root from 192.0.2.7 port 22 ssh2" for s in range(6)]
+    lines.append("203.0.113.50 - - [25/Dec/2024:10:17:00 +0000] \"GET /../../etc/passwd HTTP/1.1\" 400 0")
+    entries = [parse_line(line) for line in lines]
+
+    engine = TimedDetectionEngine().feed_all(entries)
+    assert [(f.rule_name, f.source_ip) for f in engine.findings()] == [
+        (f.rule_name, f.source_ip) for f in run_all_detections(entries)
+    ]
+
+    profiler = Profiler()
+    engine.report_to(profiler)
+    rows = profiler.to_dict()["stages"]
+    assert [r["name"] for r in rows] == [
+        "detect.brute_force", "detect.sql_injection", "detect.directory_traversal+admin_probe",
+    ]
+    assert all(r["cpu_s"] is None and r["items"] == 7 for r in rows)
+
+
+def test_profile_is_embedded_in_json_report(tmp_path):
+    from src.reports import save_json_report
+
+    profiler = Profiler()
+    with profiler.stage("parse", items=10):
+        pass
+    profiler.count("findings", 0)
+    report = AnalysisReport(
+        total_entries=10, findings=[], summary={}, analysis_time=datetime(2025, 1, 1), profile=profiler.to_dict()
+    )
+    out = tmp_path / "report.json"
+    save_json_report(report, str(out))
+
+    profile = json.loads(out.read_text(encoding="utf-8"))["profile"]
+    assert profile["stages"][0]["name"] == "parse"
+    assert profile["stages"][0]["items"] == 10
+    assert profile["counters"] == {"findings": 0}
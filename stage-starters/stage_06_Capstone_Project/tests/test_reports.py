@@ -15,3 +15,111 @@ def test_save_json_report(tmp_path):
     data = json.loads(out.read_text(encoding="utf-8"))
     assert data["total_entries_analyzed"] == 1
     assert data["findings"][0]["rule_name"] == "test"
+
+
+def test_print_summary_accepts_batch(capsys):
+    from src.log_parser import parse_line
+    from src.models import LogBatch
+    from src.reports import print_summary
+
+    entries = [
+        parse_line("2024-12-25 10:15:32 AUTH FAILURE user=admin ip=192.168.1.100 reason=invalid_password"),
+        parse_line("2024-12-25 10:15:33 AUTH SUCCESS user=admin ip=192.168.1.101"),
+    ]
+    print_summary(entries)
+    from_list = capsys.readouterr().out
+    print_summary(LogBatch.from_entries(entries))
+    assert capsys.readouterr().out == from_list
+    assert "auth: 2" in from_list and "Unique IPs: 2" in from_list
+
+
+def _findings_with_evidence():
+    from src.detection import run_all_detections
+    from src.log_parser import parse_line
+
+    lines = [f"Dec 25 10:15:{s:02d} server sshd[1]: Failed password for root from 192.0.2.7 port 22 ssh2" for s in range(6)]
+    return run_all_detections([parse_line(line) for line in lines])
+
+
+def test_ndjson_report_streams_findings_with_capped_evidence(tmp_path):
+    from src.reports import ReportWriter
+
+    out = tmp_path / "report.ndjson"
+    with ReportWriter(str(out), fmt="ndjson", include_evidence=True, evidence_cap=2) as writer:
+        writer.write_all(_findings_with_evidence())
+        writer.close(total_entries=6)
+
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [r["record"] for r in records] == ["finding", "summary"]
+    assert records[0]["evidence_count"] == 6
+    assert [e["timestamp"][-2:] for e in records[0]["evidence"]] == ["00", "01"]
+    assert records[1]["summary"]["high"] == 1 and records[1]["findings"] == 1
+
+
+def test_json_report_is_streamed_but_keeps_its_shape(tmp_path):
+    from src.reports import save_json_report
+
+    report = AnalysisReport(
+        total_entries=6, findings=_findings_with_evidence(), summary={"high": 1}, analysis_time=datetime(2025, 1, 1)
+    )
+    out = tmp_path / "report.json"
+    save_json_report(report, str(out), include_evidence=True)
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert data["generated_at"] == "2025-01-01T00:00:00"
+    assert data["summary"] == {"high": 1}
+    assert len(data["findings"][0]["evidence"]) == 6
+    assert "profile" not in data
+
+    empty = AnalysisReport(total_entries=0, findings=[], summary={}, analysis_time=datetime(2025, 1, 1))
+    save_json_report(empty, str(out))
+    assert json.loads(out.read_text(encoding="utf-8"))["findings"] == []
+
+
+def test_alerts_reach_the_file_while_input_is_still_read(tmp_path, monkeypatch):
+    from src import reports
+    from src.detection import DetectionEngine
+    from src.log_parser import parse_line
+
+    monkeypatch.setattr(reports, "FLUSH_INTERVAL", 0.0)
+    out = tmp_path / "report.ndjson"
+    line = "Dec 25 10:15:{:02d} server sshd[1]: Failed password for root from 192.0.2.7 port 22 ssh2"
+    seen_mid_run = []
+
+    def entries():
+        for s in range(8):
+            yield parse_line(line.format(s))
+        seen_mid_run.extend(out.read_text(encoding="utf-8").splitlines())
+        yield parse_line(line.format(9))
+
+    with reports.ReportWriter(str(out), fmt="ndjson", include_evidence=True) as writer:
+        engine = DetectionEngine().feed_all(entries(), on_finding=writer.alert)
+        writer.write_all(engine.findings()).close(total_entries=9)
+
+    assert [json.loads(r)["record"] for r in seen_mid_run] == ["alert"]
+    records = [json.loads(r) for r in out.read_text(encoding="utf-8").splitlines()]
+    assert [r["record"] for r in records] == ["alert", "finding", "summary"]
+    assert records[1]["evidence_count"] == len(records[1]["evidence"]) == 9
+    assert records[2]["findings"] == 1 and records[2]["summary"]["high"] == 1
+
+
+def test_analyze_report_holds_final_findings(tmp_path):
+    from src.cli import parse_args
+    from src.main import cmd_analyze
+
+    log = tmp_path / "access.log"
+    log.write_text(
+        "".join(
+            f'203.0.113.9 - - [25/Dec/2024:10:15:{s:02d} +0000] "GET /item?id=1=1 HTTP/1.1" 200 5\n'
+            for s in range(4)
+        ),
+        encoding="utf-8",
+    )
+    out = tmp_path / "report.json"
+    cmd_analyze(parse_args(["analyze", "--input", str(log), "--output", str(out), "--evidence"]))
+
+    report = json.loads(out.read_text(encoding="utf-8"))
+    (finding,) = report["findings"]
+    assert finding["rule_name"] == "sql_injection"
+    assert "(4 suspicious requests)" in finding["description"]
+    assert finding["evidence_count"] == len(finding["evidence"]) == 4
+    assert "geo_info" in finding and "alerts" not in report
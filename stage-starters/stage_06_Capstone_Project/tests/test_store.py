@@ -0,0 +1,108 @@
+import gzip
+import os
+from datetime import datetime
+
+from src.models import LogType
+from src.store import EventStore
+
+
+SSH_FAIL = "Dec 25 10:15:{:02d} server sshd[1234]: Failed password for root from 198.51.100.{} port 22 ssh2\n"
+APACHE = '203.0.113.{} - - [25/Dec/2024:10:{:02d}:00 +0000] "GET {} HTTP/1.1" 200 512\n'
+
+
+def _append(path, lines):
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(lines)
+
+
+def test_ingest_is_incremental_and_keeps_detection_state(tmp_path):
+    log = tmp_path / "auth.log"
+    _append(log, [SSH_FAIL.format(i, 7) for i in range(3)])
+
+    with EventStore(tmp_path / "events.db") as store:
+        assert store.ingest(str(log), batch_size=2) == (3, 0)
+        assert store.ingest(str(log)) == (0, 3)  # nothing new
+
+        _append(log, [SSH_FAIL.format(i, 7) for i in range(3, 6)] + ["Dec 25 10:15:59 server sshd[1"])
+        assert store.ingest(str(log)) == (3, 3)
+        assert store.stats() == {"sources": 1, "events": 6, "findings": 1}
+
+        # Brute force fired only once failures from both ingests were counted.
+        assert [e.source_ip for e in store.query(rule="brute_force")] == ["198.51.100.7"] * 6
+
+
+def test_query_filters_by_ip_time_and_type(tmp_path):
+    ssh_log = tmp_path / "auth.log"
+    web_log = tmp_path / "access.log"
+    _append(ssh_log, [SSH_FAIL.format(i, i % 2) for i in range(4)])
+    _append(web_log, [APACHE.format(i, i, "/index.html") for i in range(5)])
+
+    with EventStore(tmp_path / "events.db") as store:
+        store.ingest(str(ssh_log))
+        store.ingest(str(web_log))
+
+        assert store.count() == 9
+        assert store.count(ip="198.51.100.1") == 2
+        assert store.count(log_type=LogType.APACHE) == 5
+
+        hits = list(store.query(since=datetime(2024, 12, 25, 10, 1), until=datetime(2024, 12, 25, 10, 3)))
+        assert [(e.source_ip, e.timestamp.minute) for e in hits] == [("203.0.113.1", 1), ("203.0.113.2", 2)]
+        assert hits[0].raw_line == APACHE.format(1, 1, "/index.html").rstrip("\n")
+
+        assert len(list(store.query(limit=3))) == 3
+        assert store.count(rule="sql_injection") == 0
+
+
+def test_changed_detection_settings_rebuild_state_without_duplicating(tmp_path):
+    log = tmp_path / "auth.log"
+    _append(log, [SSH_FAIL.format(i, 7) for i in range(4)])
+
+    with EventStore(tmp_path / "events.db") as store:
+        store.ingest(str(log))
+        assert store.count(rule="brute_force") == 0
+
+        assert store.ingest(str(log), brute_force_threshold=3) == (0, 4)
+        assert store.stats() == {"sources": 1, "events": 4, "findings": 1}
+        assert store.count(rule="brute_force") == 4
+
+        _append(log, [SSH_FAIL.format(4, 8)])
+        assert store.ingest(str(log), brute_force_threshold=3) == (1, 4)
+        assert store.count() == 5
+
+
+def test_rotated_renamed_and_compressed_logs_are_not_stored_twice(tmp_path):
+    log = tmp_path / "access.log"
+    _append(log, [APACHE.format(i, i, "/index.html") for i in range(5)])
+
+    with EventStore(tmp_path / "events.db") as store:
+        store.ingest(str(log))
+
+        # Rotation by rename, with lines written before the rename not yet ingested.
+        _append(log, [APACHE.format(5, 5, "/admin")])
+        rotated = tmp_path / "access.log.1"
+        os.rename(log, rotated)
+        _append(log, [APACHE.format(9, 9, "/new")])
+        assert store.ingest(str(rotated)) == (1, 5)
+        assert store.ingest(str(log)) == (1, 0)
+
+        # Compression by a later rotation: a new inode with the same content.
+        with open(rotated, "rb") as f, gzip.open(tmp_path / "access.log.2.gz", "wb") as gz:
+            gz.write(f.read() + APACHE.format(6, 6, "/late").encode())
+        rotated.unlink()
+        assert store.ingest(str(tmp_path / "access.log.2.gz")) == (1, 6)
+        assert store.ingest(str(tmp_path / "access.log.2.gz")) == (0, 7)
+
+        assert store.stats()["events"] == 8
+        assert store.count(ip="203.0.113.5") == 1
+
+
+def test_replaced_file_is_a_new_source_and_keeps_old_events(tmp_path):
+    log = tmp_path / "auth.log"
+    _append(log, [SSH_FAIL.format(i, 7) for i in range(3)])
+
+    with EventStore(tmp_path / "events.db") as store:
+        store.ingest(str(log))
+        log.write_text(SSH_FAIL.format(30, 9), encoding="utf-8")  # truncated and rewritten in place
+        assert store.ingest(str(log)) == (1, 0)
+        assert store.stats()["sources"] == 2
+        assert store.count() == 4
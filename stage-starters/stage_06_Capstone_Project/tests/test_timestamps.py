@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from src.timestamps import decode_apache, decode_auth, decode_ssh
+
+
+def _strptime_or_none(ts, fmt):
+    try:
+        return datetime.strptime(ts, fmt)
+    except ValueError:
+        return None
+
+
+def test_decode_apache_matches_strptime():
+    samples = [
+        "25/Dec/2024:10:15:32 +0000",
+        "01/Jan/2025:00:00:00",
+        "31/Feb/2024:10:15:32 +0000",  # invalid day
+        "5/Dec/2024:1:2:3 +0000",  # non canonical, strptime fallback
+        "25/dec/2024:10:15:32 +0000",  # lowercase month, strptime fallback
+        "25/Xyz/2024:10:15:32 +0000",
+        "25/Dec/2024:10:15:60 +0000",
+    ]
+    for ts in samples:
+        expected = _strptime_or_none(ts.split()[0], "%d/%b/%Y:%H:%M:%S")
+        assert decode_apache(ts) == expected, ts
+
+
+def test_decode_ssh_matches_strptime():
+    samples = ["Dec 25 10:15:32", "Dec  5 10:15:32", "Feb 29 10:15:32", "Jan 32 10:15:32", "Foo 1 10:15:32"]
+    for ts in samples:
+        dt = _strptime_or_none(ts, "%b %d %H:%M:%S")
+        expected = dt.replace(year=2024) if dt else None
+        assert decode_ssh(ts, 2024) == expected, ts
+
+
+def test_decode_auth_matches_strptime():
+    samples = ["2024-12-25 10:15:32", "2024-13-25 10:15:32", "2024-12-25  10:15:32", "2024-1-5 1:2:3"]
+    for ts in samples:
+        assert decode_auth(ts) == _strptime_or_none(ts, "%Y-%m-%d %H:%M:%S"), ts
@@ -0,0 +1,92 @@
+import threading
+
+from src.watch import FileFollower, LogWatcher
+
+
+SSH_FAIL = "Dec 25 10:15:{:02d} server sshd[1234]: Failed password for root from 203.0.113.9 port 22 ssh2\n"
+
+
+def test_follower_reads_only_complete_appended_lines(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("old line\n")
+    follower = FileFollower(str(log))
+    assert follower.poll() == []  # starts at the end, like tail -F
+
+    with log.open("a") as f:
+        f.write("first\nsecond-par")
+    assert follower.poll() == ["first"]
+    with log.open("a") as f:
+        f.write("tial\r\n")
+    assert follower.poll() == ["second-partial"]
+    follower.close()
+
+
+def test_follower_handles_rotation_and_truncation(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("a\n")
+    follower = FileFollower(str(log), from_start=True)
+    assert follower.poll() == ["a"]
+
+    # logrotate-style: rename, keep writing to the old file, create a new one.
+    with log.open("a") as f:
+        f.write("b\nunterminated")
+    log.rename(tmp_path / "app.log.1")
+    log.write_text("c\n")
+    assert follower.poll() == ["b", "unterminated", "c"]
+    assert follower.rotations == 1
+
+    # copytruncate-style: same inode, shorter file.
+    with log.open("a") as f:
+        f.write("more\n")
+    assert follower.poll() == ["more"]
+    with log.open("w") as f:
+        f.write("d\n")
+    assert follower.poll() == ["d"]
+    assert follower.truncations == 1
+
+    log.unlink()
+    assert follower.poll() == []
+    log.write_text("e\n")
+    assert follower.poll() == ["e"]
+    follower.close()
+
+
+def test_watcher_emits_findings_as_thresholds_cross(tmp_path):
+    log = tmp_path / "auth.log"
+    log.write_text("")
+    alerts = []
+    watcher = LogWatcher(str(log), on_finding=alerts.append)
+
+    with log.open("a") as f:
+        f.writelines(SSH_FAIL.format(i) for i in range(4))
+    assert watcher.poll_once() == []
+
+    with log.open("a") as f:
+        f.write(SSH_FAIL.format(4))
+    fired = watcher.poll_once()
+    assert [a.rule_name for a in fired] == ["brute_force"]
+    assert alerts == fired
+
+    with log.open("a") as f:
+        f.write(SSH_FAIL.format(5))
+    assert watcher.poll_once() == []  # already reported
+    assert watcher.engine.entries_seen == 6
+
+
+def test_watcher_run_stops_on_event(tmp_path):
+    log = tmp_path / "auth.log"
+    log.write_text("")
+    stop = threading.Event()
+    watcher = LogWatcher(str(log), min_interval=0.01, max_interval=0.05)
+    thread = threading.Thread(target=watcher.run, args=(stop,))
+    thread.start()
+    with log.open("a") as f:
+        f.writelines(SSH_FAIL.format(i) for i in range(5))
+    for _ in range(100):
+        if watcher.engine.findings():
+            break
+        stop.wait(0.02)
+    stop.set()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert len(watcher.engine.findings()) == 1